@@ -2,34 +2,61 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.exception_handlers import http_exception_handler, request_validation_exception_handler
 from fastapi.exceptions import RequestValidationError
 from starlette.responses import Response
 
-from .core.logging import log_error
-from .core.middleware import api_key_middleware, request_id_middleware
+from .clients import line_client
+from .core.logging import configure_logging, log_error, log_warning
+from .core.middleware import ApiKeyMiddleware, IdempotencyMiddleware, RequestIdMiddleware
 from .core.settings import load_settings
 from .features.calendar_events.router_calendar_events import router as calendar_router
+from .features.calendar_events.usecase_calendar_events import async_unsupported_features
 from .features.line_notify_post.router_line_notify_post import router as line_router
+from .features.line_notify_post.usecase_line_notify_post import run_outbox_drainer
 from .features.llm_extract.router_llm_extract import router as llm_router
 from .features.mailparse_post.router_mailparse_post import router as mail_router
 
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # uvicorn ではプロセスの起動・終了時に一度だけ呼ばれる（Lambda では Mangum の lifespan を切る）
+    settings = app.state.settings  # type: ignore[attr-defined]
+    drainer: asyncio.Task[None] | None = None
+    if settings.line_outbox_path and settings.line_outbox_drain_interval_sec > 0:
+        drainer = asyncio.create_task(run_outbox_drainer(settings=settings))
+    yield
+    if drainer is not None:
+        drainer.cancel()
+        with suppress(asyncio.CancelledError):
+            await drainer
+    # プロセス内で共有してきた接続プールを閉じる
+    await line_client.close_async_clients()
+
+
 def create_app() -> FastAPI:
     """コア設定や共通ミドルウェアを組み込んだ FastAPI アプリを返す。"""
 
     settings = load_settings()
     log_level = logging.DEBUG if settings.is_local else logging.INFO
-    logging.basicConfig(level=log_level, format="%(message)s")
-    logging.getLogger("calendar_auto_register").setLevel(log_level)
-    app = FastAPI(title="calendar-auto-register", version="0.1.0")
+    configure_logging(level=log_level, async_enabled=settings.log_async_enabled)
+    ignored = async_unsupported_features(settings)
+    if ignored:
+        # 非同期版では効かない設定が黙って無視されないよう、起動時に一度だけ知らせる
+        log_warning(event="calendar_async_features_ignored", error={"settings": ignored})
+    app = FastAPI(title="calendar-auto-register", version="0.1.0", lifespan=_lifespan)
     app.state.settings = settings  # type: ignore[attr-defined]
-    app.middleware("http")(api_key_middleware)
-    app.middleware("http")(request_id_middleware)
+    # 後から追加したものが外側になる（リクエスト ID の付与 → API キー認証 → 冪等キーの順に通る）
+    app.add_middleware(IdempotencyMiddleware, settings=settings)
+    app.add_middleware(ApiKeyMiddleware, settings=settings)
+    app.add_middleware(RequestIdMiddleware, settings=settings)
 
     @app.exception_handler(HTTPException)
     async def http_exception_logger(request: Request, exc: HTTPException) -> Response:
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 __all__ = [
     "bedrock_client",
+    "bedrock_throttle",
+    "google_async_client",
     "google_client",
     "http_client",
     "line_client",
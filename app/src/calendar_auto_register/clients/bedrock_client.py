@@ -9,6 +9,8 @@ from typing import Any
 import boto3
 from botocore.client import BaseClient
 
+from calendar_auto_register.core.timing import timed
+
 
 @lru_cache(maxsize=None)
 def get_client(region: str) -> BaseClient:
@@ -17,6 +19,7 @@ def get_client(region: str) -> BaseClient:
     return boto3.client("bedrock-runtime", region_name=region)
 
 
+@timed("bedrock.invoke")
 def invoke_model(
     *,
     region: str,
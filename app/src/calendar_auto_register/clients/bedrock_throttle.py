@@ -0,0 +1,214 @@
+"""Bedrock 呼び出しの前段に置く適応型レートリミッタとサーキットブレーカー。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from calendar_auto_register.core import metrics
+from calendar_auto_register.core.rate_limit import AdaptiveRateLimiter
+from calendar_auto_register.core.settings import Settings
+from calendar_auto_register.core.timing import span
+
+# リトライはアプリ側（レートリミッタ経由）で行うため botocore 内部のリトライは無効化する
+BOTO_CONFIG = Config(retries={"mode": "standard", "max_attempts": 1})
+
+# ラップ対象の Bedrock Runtime API
+_THROTTLED_OPERATIONS = frozenset(
+    {"converse", "converse_stream", "invoke_model", "invoke_model_with_response_stream"}
+)
+_THROTTLING_CODES = frozenset({"ThrottlingException", "TooManyRequestsException"})
+# サーキットブレーカーの失敗として数える（= Bedrock 側の劣化を示す）エラーコード
+_TRANSIENT_CODES = _THROTTLING_CODES | {
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+}
+
+
+class BedrockRetryableError(RuntimeError):
+    """スロットリングなど、再試行で回復しうる Bedrock のエラー。"""
+
+    def __init__(self, message: str, code: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class BedrockCircuitOpenError(Exception):
+    """サーキットブレーカーが開いており Bedrock 呼び出しを即時失敗させたことを表す例外。
+
+    再試行しても無駄なため、リトライ対象の RuntimeError は継承しない。
+    """
+
+
+class CircuitBreaker:
+    """連続失敗で開き、一定時間後に1件だけ試行を通す（half-open）サーキットブレーカー。"""
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int,
+        reset_timeout_sec: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_threshold = failure_threshold
+        self._reset_timeout_sec = reset_timeout_sec
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._consecutive_failures = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def before_call(self) -> None:
+        """呼び出し可否を判定し、開いていれば BedrockCircuitOpenError を送出する。"""
+
+        with self._lock:
+            if self._state == "closed":
+                return
+            if (
+                self._state == "open"
+                and self._clock() - self._opened_at >= self._reset_timeout_sec
+            ):
+                self._state = "half_open"
+                return
+            self.rejected += 1
+        raise BedrockCircuitOpenError("Bedrock が劣化しているため呼び出しを停止しています。")
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._consecutive_failures = 0
+
+    def on_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            if (
+                self._state == "half_open"
+                or self._consecutive_failures >= self._failure_threshold
+            ):
+                self._state = "open"
+                self._opened_at = self._clock()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "rejected": self.rejected,
+            }
+
+
+@dataclass(slots=True)
+class BedrockThrottle:
+    """全 Bedrock 呼び出しで共有するレートリミッタとサーキットブレーカーの組。"""
+
+    limiter: AdaptiveRateLimiter
+    breaker: CircuitBreaker
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        レート制限とブレーカーを通して `func` を呼ぶ。
+
+        half-open の試行が戻らないままにならないよう、どの経路で終わってもブレーカーへ結果を
+        伝える。劣化を示さない ClientError（ValidationException など）は Bedrock が応答した
+        ものとして成功扱いにし、それ以外の例外は失敗として数える。
+        """
+
+        self.breaker.before_call()
+        self.limiter.acquire()
+        try:
+            with span("bedrock.invoke"):
+                result = func(*args, **kwargs)
+        except ClientError as exc:
+            code = exc.response.get("Error", {}).get("Code", "")
+            if code in _THROTTLING_CODES:
+                self.limiter.on_throttle()
+                metrics.count("BedrockThrottles")
+            if code not in _TRANSIENT_CODES:
+                self.breaker.on_success()
+                raise
+            self.breaker.on_failure()
+            raise BedrockRetryableError(f"Bedrock 呼び出しが失敗しました ({code})", code) from exc
+        except BaseException:
+            self.breaker.on_failure()
+            raise
+        self.limiter.on_success()
+        self.breaker.on_success()
+        return result
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"limiter": self.limiter.snapshot(), "breaker": self.breaker.snapshot()}
+
+
+class ThrottledBedrockClient:
+    """boto3 の bedrock-runtime クライアントをラップし、推論 API を BedrockThrottle 経由にする。"""
+
+    def __init__(self, client: Any, throttle: BedrockThrottle) -> None:
+        self._client = client
+        self._throttle = throttle
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name not in _THROTTLED_OPERATIONS:
+            return attr
+
+        def _throttled(*args: Any, **kwargs: Any) -> Any:
+            return self._throttle.call(attr, *args, **kwargs)
+
+        return _throttled
+
+
+_REGISTRY_LOCK = threading.Lock()
+_THROTTLES: dict[str, BedrockThrottle] = {}
+
+
+def get_throttle(settings: Settings) -> BedrockThrottle:
+    """リージョンごとに共有される BedrockThrottle を返す。"""
+
+    with _REGISTRY_LOCK:
+        throttle = _THROTTLES.get(settings.region)
+        if throttle is None:
+            throttle = BedrockThrottle(
+                limiter=AdaptiveRateLimiter(
+                    max_rate=settings.bedrock_rate_limit_per_sec,
+                    min_rate=settings.bedrock_rate_limit_min_per_sec,
+                ),
+                breaker=CircuitBreaker(
+                    failure_threshold=settings.bedrock_circuit_failure_threshold,
+                    reset_timeout_sec=settings.bedrock_circuit_reset_sec,
+                ),
+            )
+            _THROTTLES[settings.region] = throttle
+        return throttle
+
+
+def throttled_client(client: Any, *, settings: Settings) -> ThrottledBedrockClient:
+    """bedrock-runtime クライアントを共有スロットル経由で呼び出すようラップする。"""
+
+    return ThrottledBedrockClient(client, get_throttle(settings))
+
+
+def get_throttle_states() -> dict[str, dict[str, Any]]:
+    """リージョンごとのレート・トークン残量・ブレーカー状態を返す。"""
+
+    with _REGISTRY_LOCK:
+        return {region: throttle.snapshot() for region, throttle in _THROTTLES.items()}
+
+
+def reset_throttles() -> None:
+    """共有スロットルを破棄する（テスト用）。"""
+
+    with _REGISTRY_LOCK:
+        _THROTTLES.clear()
@@ -0,0 +1,276 @@
+"""共有 httpx.AsyncClient 上で動く Google Calendar API の非同期クライアント。"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import uuid
+import weakref
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import quote, urlencode
+
+import httplib2
+import httpx
+from google.oauth2.service_account import Credentials
+from google_auth_httplib2 import Request as HttplibAuthRequest
+from googleapiclient.errors import HttpError
+
+from calendar_auto_register.clients import http_client
+from calendar_auto_register.clients.google_client import (
+    build_credentials_from_service_account,
+    stage_name,
+)
+from calendar_auto_register.core import metrics
+from calendar_auto_register.core.settings import Settings
+from calendar_auto_register.core.timing import span
+
+GOOGLE_API_BASE_URL = "https://www.googleapis.com"
+_CALENDAR_PATH = "/calendar/v3"
+_BATCH_PATH = "/batch/calendar/v3"
+# Calendar API のバッチは1リクエストあたり50件までを推奨している
+_MAX_BATCH_SIZE = 50
+# Google API は User-Agent に "gzip" を含むリクエストにだけ gzip 圧縮したレスポンスを返す
+_USER_AGENT = "calendar-auto-register (gzip)"
+
+
+@dataclass(slots=True, frozen=True)
+class BatchRequest:
+    """バッチに含める1件のリクエスト。`path` は `/calendar/v3` 以下のパス。"""
+
+    method: str
+    path: str
+    params: dict[str, Any] = field(default_factory=dict)
+    body: dict[str, Any] | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class BatchResponse:
+    """バッチ内の1件のレスポンス。"""
+
+    status: int
+    body: dict[str, Any]
+
+
+class AsyncCalendarClient:
+    """
+    Google Calendar API（events.list / insert / patch とバッチ）の非同期クライアント。
+
+    エラー応答は同期クライアントと同じく googleapiclient の HttpError として送出するため、
+    呼び出し側のリトライ・エラー変換をそのまま使える。
+    """
+
+    def __init__(
+        self,
+        http: httpx.AsyncClient,
+        credentials: Credentials,
+        *,
+        base_url: str = GOOGLE_API_BASE_URL,
+    ) -> None:
+        self._http = http
+        self._credentials = credentials
+        self._base_url = base_url.rstrip("/")
+        self._refresh_lock = asyncio.Lock()
+
+    async def list_events(self, calendar_id: str, **params: Any) -> dict[str, Any]:
+        return await self._request("GET", _events_path(calendar_id), params=params)
+
+    async def insert_event(
+        self,
+        calendar_id: str,
+        body: dict[str, Any],
+        *,
+        fields: str | None = None,
+    ) -> dict[str, Any]:
+        return await self._request(
+            "POST", _events_path(calendar_id), params=_fields(fields), body=body
+        )
+
+    async def patch_event(
+        self,
+        calendar_id: str,
+        event_id: str,
+        body: dict[str, Any],
+        *,
+        fields: str | None = None,
+    ) -> dict[str, Any]:
+        return await self._request(
+            "PATCH",
+            f"{_events_path(calendar_id)}/{quote(event_id, safe='')}",
+            params=_fields(fields),
+            body=body,
+        )
+
+    async def batch(self, requests: Sequence[BatchRequest]) -> list[BatchResponse]:
+        """複数のリクエストを multipart/mixed のバッチで送り、入力順のレスポンスを返す。"""
+
+        responses: list[BatchResponse] = []
+        for offset in range(0, len(requests), _MAX_BATCH_SIZE):
+            chunk = requests[offset : offset + _MAX_BATCH_SIZE]
+            boundary = f"batch_{uuid.uuid4().hex}"
+            response = await self._send(
+                "POST",
+                _BATCH_PATH,
+                content=encode_batch(chunk, boundary=boundary),
+                headers={"Content-Type": f"multipart/mixed; boundary={boundary}"},
+            )
+            responses.extend(
+                decode_batch(response.headers.get("content-type", ""), response.content)
+            )
+        return responses
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        response = await self._send(method, f"{_CALENDAR_PATH}{path}", params=params, json=body)
+        payload: dict[str, Any] = response.json() if response.content else {}
+        return payload
+
+    async def _send(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        headers = {
+            **kwargs.pop("headers", {}),
+            **await self._auth_headers(),
+            "User-Agent": _USER_AGENT,
+        }
+        with span(stage_name(method, path)):
+            response = await self._http.request(
+                method, f"{self._base_url}{path}", headers=headers, **kwargs
+            )
+        metrics.count("GoogleApiCalls")
+        if response.status_code >= 400:
+            raise _to_http_error(response)
+        return response
+
+    async def _auth_headers(self) -> dict[str, str]:
+        async with self._refresh_lock:
+            if not self._credentials.valid:
+                # google-auth のトークン更新は同期 I/O のためスレッドで実行する
+                await asyncio.to_thread(
+                    self._credentials.refresh, HttplibAuthRequest(httplib2.Http())
+                )
+        return {"Authorization": f"Bearer {self._credentials.token}"}
+
+
+def encode_batch(requests: Sequence[BatchRequest], *, boundary: str) -> bytes:
+    """バッチリクエストの multipart/mixed 本文を組み立てる。"""
+
+    parts: list[str] = []
+    for number, request in enumerate(requests):
+        query = f"?{urlencode(_query_params(request.params))}" if request.params else ""
+        lines = [
+            f"--{boundary}",
+            "Content-Type: application/http",
+            f"Content-ID: <item{number}>",
+            "",
+            f"{request.method} {_CALENDAR_PATH}{request.path}{query} HTTP/1.1",
+        ]
+        if request.body is not None:
+            lines += ["Content-Type: application/json", "", json.dumps(request.body)]
+        else:
+            lines += [""]
+        parts.append("\r\n".join(lines))
+    parts.append(f"--{boundary}--")
+    return ("\r\n".join(parts) + "\r\n").encode("utf-8")
+
+
+def decode_batch(content_type: str, content: bytes) -> list[BatchResponse]:
+    """バッチレスポンスを分解し、Content-ID の順（= リクエスト順）に並べて返す。"""
+
+    boundary = _boundary(content_type)
+    responses: list[tuple[int, BatchResponse]] = []
+    for part in content.decode("utf-8").split(f"--{boundary}"):
+        part = part.strip()
+        if not part or part == "--":
+            continue
+        part_headers, _, http_message = part.partition("\r\n\r\n")
+        number = _content_id_number(part_headers)
+        status_line, _, rest = http_message.partition("\r\n")
+        _, _, body = rest.partition("\r\n\r\n")
+        status = int(status_line.split(" ")[1])
+        responses.append(
+            (number, BatchResponse(status=status, body=json.loads(body) if body.strip() else {}))
+        )
+    responses.sort(key=lambda item: item[0])
+    return [response for _, response in responses]
+
+
+def _boundary(content_type: str) -> str:
+    for param in content_type.split(";"):
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "boundary":
+            return value.strip('"')
+    raise ValueError("バッチレスポンスに boundary がありません。")
+
+
+def _content_id_number(part_headers: str) -> int:
+    for line in part_headers.split("\r\n"):
+        key, _, value = line.partition(":")
+        if key.strip().lower() == "content-id":
+            digits = "".join(char for char in value if char.isdigit())
+            return int(digits) if digits else 0
+    return 0
+
+
+def _query_params(params: dict[str, Any]) -> dict[str, str]:
+    return {
+        key: ("true" if value else "false") if isinstance(value, bool) else str(value)
+        for key, value in params.items()
+        if value is not None
+    }
+
+
+def _events_path(calendar_id: str) -> str:
+    return f"/calendars/{quote(calendar_id, safe='')}/events"
+
+
+def _fields(fields: str | None) -> dict[str, Any]:
+    return {"fields": fields} if fields else {}
+
+
+def _to_http_error(response: httpx.Response) -> HttpError:
+    info = {"status": str(response.status_code), **dict(response.headers)}
+    return HttpError(httplib2.Response(info), response.content, uri=str(response.request.url))
+
+
+_CREDENTIALS_LOCK = threading.Lock()
+_CREDENTIALS: dict[str, Credentials] = {}
+_HTTP_CLIENTS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def client_from_settings(settings: Settings) -> AsyncCalendarClient:
+    """
+    Settings から非同期クライアントを返す。
+
+    httpx.AsyncClient の接続プールはイベントループに紐づくため、ループごとに共有する。
+    """
+    if not settings.google_credentials:
+        raise ValueError("GOOGLE_CREDENTIALS が未設定です。")
+
+    with _CREDENTIALS_LOCK:
+        credentials = _CREDENTIALS.get(settings.google_credentials)
+        if credentials is None:
+            credentials = build_credentials_from_service_account(
+                raw_credentials=settings.google_credentials,
+            )
+            _CREDENTIALS[settings.google_credentials] = credentials
+    return AsyncCalendarClient(shared_http_client(), credentials)
+
+
+def shared_http_client() -> httpx.AsyncClient:
+    """実行中のイベントループで共有する httpx.AsyncClient を返す。"""
+
+    loop = asyncio.get_running_loop()
+    client = _HTTP_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = http_client.create_async_client()
+        _HTTP_CLIENTS[loop] = client
+    return client
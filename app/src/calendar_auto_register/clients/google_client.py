@@ -2,16 +2,128 @@
 
 from __future__ import annotations
 
+import http.client
 import json
+import threading
+import time
 from pathlib import Path
-from typing import Sequence
+from typing import Any, Sequence
+from urllib.parse import urlsplit
 
+import httplib2
 from google.oauth2.service_account import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import Resource, build
+from googleapiclient.http import set_user_agent
 
+from calendar_auto_register.core import metrics
+from calendar_auto_register.core.logging import log_google_api_call
+from calendar_auto_register.core.rate_limit import AdaptiveRateLimiter
 from calendar_auto_register.core.settings import Settings
+from calendar_auto_register.core.timing import span
 
 GOOGLE_CALENDAR_SCOPE = "https://www.googleapis.com/auth/calendar"
+# Google API は User-Agent に "gzip" を含むリクエストにだけ gzip 圧縮したレスポンスを返す
+_USER_AGENT = "calendar-auto-register (gzip)"
+_HTTP_TIMEOUT_SEC = 30
+# Google のクォータ超過時も最低限の進行を保つ下限レート
+_MIN_RATE_PER_SEC = 0.5
+
+_RATE_LIMITERS_LOCK = threading.Lock()
+_RATE_LIMITERS: dict[str, AdaptiveRateLimiter] = {}
+# httplib2 はスレッドセーフではないため、Service（と keep-alive 接続）はスレッドごとに使い回す
+_THREAD_SERVICES = threading.local()
+
+
+class _MeteredResponse(http.client.HTTPResponse):
+    """本文を読んだバイト数（gzip の展開前）を、このスレッドの計測値に加える HTTPResponse。"""
+
+    def read(self, amt: int | None = None) -> bytes:
+        data = super().read(amt)
+        _WIRE_BYTES.count = getattr(_WIRE_BYTES, "count", 0) + len(data)
+        return data
+
+
+class _MeteredHTTPConnection(httplib2.HTTPConnectionWithTimeout):
+    response_class = _MeteredResponse
+
+
+class _MeteredHTTPSConnection(httplib2.HTTPSConnectionWithTimeout):
+    response_class = _MeteredResponse
+
+
+_METERED_CONNECTIONS: dict[str, type[http.client.HTTPConnection]] = {
+    "http": _MeteredHTTPConnection,
+    "https": _MeteredHTTPSConnection,
+}
+# httplib2 は展開後の本文しか返さないため、ソケットから読んだ本文のバイト数はスレッドごとに数える
+_WIRE_BYTES = threading.local()
+
+
+class MeteredHttp(httplib2.Http):
+    """
+    1リクエストごとに転送バイト数（展開前）とレイテンシをログに出す httplib2.Http。
+
+    計測は公開の `request()` だけで行い、`connection_type` 引数で本文の読み取りバイト数を
+    数える接続クラスを渡す。
+    """
+
+    def request(
+        self,
+        uri: str,
+        method: str = "GET",
+        body: Any = None,
+        headers: dict[str, str] | None = None,
+        redirections: int = httplib2.DEFAULT_MAX_REDIRECTS,
+        connection_type: type[http.client.HTTPConnection] | None = None,
+    ) -> tuple[httplib2.Response, bytes]:
+        parts = urlsplit(uri)
+        if connection_type is None:
+            connection_type = _METERED_CONNECTIONS.get(parts.scheme)
+        _WIRE_BYTES.count = 0
+        started = time.perf_counter()
+        with span(stage_name(method, parts.path)):
+            response, content = super().request(
+                uri, method, body, headers, redirections, connection_type
+            )
+        metrics.count("GoogleApiCalls")
+        log_google_api_call(
+            method=method,
+            path=parts.path,
+            status=response.status,
+            latency_ms=int((time.perf_counter() - started) * 1000),
+            request_bytes=_body_length(body),
+            wire_bytes=_WIRE_BYTES.count,
+            decoded_bytes=len(content),
+            content_encoding=response.get("-content-encoding", "identity"),
+        )
+        return response, content
+
+
+def _body_length(body: Any) -> int:
+    """
+    送信したリクエスト本文のバイト数。
+
+    str の本文は http.client が ISO-8859-1 で符号化して送るため、同じ符号化をしてから数える。
+    """
+
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("iso-8859-1", errors="replace"))
+    return len(body)
+
+
+def stage_name(method: str, path: str) -> str:
+    """Google API 呼び出しの計測上の段階名（`google.list` / `google.insert` など）。"""
+
+    if path.startswith("/batch/"):
+        return "google.batch"
+    if path.endswith("/token"):
+        return "google.auth"
+    if method == "GET":
+        return "google.list" if path.endswith("/events") else "google.get"
+    return {"POST": "google.insert", "PATCH": "google.patch"}.get(method, "google.request")
 
 
 def build_credentials_from_service_account(
@@ -36,18 +148,58 @@ def build_credentials_from_service_account(
 
 
 def build_calendar_service(*, credentials: Credentials) -> Resource:
-    """google-api-python-client の Calendar Service を生成する。"""
-
-    return build("calendar", "v3", credentials=credentials, cache_discovery=False)
+    """
+    google-api-python-client の Calendar Service を生成する。
+
+    gzip 応答を受け取れる User-Agent を付け、転送量を計測する httplib2.Http を使う。
+    """
+
+    http = AuthorizedHttp(credentials, http=MeteredHttp(timeout=_HTTP_TIMEOUT_SEC))
+    return build(
+        "calendar",
+        "v3",
+        http=set_user_agent(http, _USER_AGENT),
+        cache_discovery=False,
+    )
 
 
 def service_from_settings(settings: Settings) -> Resource:
-    """Settings から必要情報を取り出して Calendar Service を生成する。"""
+    """
+    Settings から必要情報を取り出して Calendar Service を返す。
+
+    同じスレッド・同じ認証情報なら生成済みの Service を再利用し、接続を keep-alive で使い回す。
+    """
 
     if not settings.google_credentials:
         raise ValueError("GOOGLE_CREDENTIALS が未設定です。")
 
-    credentials = build_credentials_from_service_account(
-        raw_credentials=settings.google_credentials,
-    )
-    return build_calendar_service(credentials=credentials)
+    services: dict[str, Resource] | None = getattr(_THREAD_SERVICES, "services", None)
+    if services is None:
+        services = {}
+        _THREAD_SERVICES.services = services
+    service = services.get(settings.google_credentials)
+    if service is None:
+        credentials = build_credentials_from_service_account(
+            raw_credentials=settings.google_credentials,
+        )
+        service = build_calendar_service(credentials=credentials)
+        services[settings.google_credentials] = service
+    return service
+
+
+def get_rate_limiter(calendar_id: str, *, rate_per_sec: float) -> AdaptiveRateLimiter:
+    """カレンダーごとに共有されるレートリミッタを返す（Google のユーザー単位 QPS 対策）。"""
+
+    with _RATE_LIMITERS_LOCK:
+        limiter = _RATE_LIMITERS.get(calendar_id)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter(max_rate=rate_per_sec, min_rate=_MIN_RATE_PER_SEC)
+            _RATE_LIMITERS[calendar_id] = limiter
+        return limiter
+
+
+def reset_rate_limiters() -> None:
+    """共有レートリミッタを破棄する（テスト用）。"""
+
+    with _RATE_LIMITERS_LOCK:
+        _RATE_LIMITERS.clear()
@@ -2,51 +2,210 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import threading
+import time
+import weakref
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from types import SimpleNamespace
 from typing import Any
 
+import aiohttp
 from linebot.v3.messaging import (
-    ApiClient,
     ApiException,
+    AsyncApiClient,
+    AsyncMessagingApi,
     Configuration,
-    MessagingApi,
     PushMessageRequest,
     TextMessage,
 )
 
+from calendar_auto_register.core import metrics
+from calendar_auto_register.core.logging import log_line_api_call
+from calendar_auto_register.core.timing import timed
+
+# SDK 既定の接続先（テストではローカルのフェイクサーバーを指定する）
+DEFAULT_HOST = "https://api.line.me"
+# Push API は1リクエストにつき最大5件のメッセージオブジェクトを送れる
+MAX_MESSAGES_PER_PUSH = 5
+# テキストメッセージ1件あたりの文字数上限（超えると Push 全体が 400 になる）
+MAX_TEXT_LENGTH = 5000
+
 
 class LineApiError(RuntimeError):
     """LINE API のエラーを表す例外。"""
 
-    def __init__(self, message: str, status_code: int) -> None:
+    def __init__(self, message: str, status_code: int, retry_after: float | None = None) -> None:
         super().__init__(message)
         self.status_code = status_code
+        # 429 などで Retry-After ヘッダーが返った場合の待機秒数
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        """接続エラー（status_code=0）・5xx・408・429 は再試行できる。"""
 
+        return self.status_code == 0 or self.status_code >= 500 or self.status_code in {408, 429}
 
-def push_message(
+
+async def push_message_async(
     *,
     channel_access_token: str,
     user_id: str,
     message: str,
     timeout: float | None = None,
+    host: str = DEFAULT_HOST,
 ) -> None:
-    """LINE Push API でメッセージを送信する。"""
+    """LINE Push API でメッセージを送信する（SDK の非同期 API でイベントループを塞がない）。"""
+
+    await push_messages_async(
+        channel_access_token=channel_access_token,
+        user_id=user_id,
+        messages=[message],
+        timeout=timeout,
+        host=host,
+    )
 
-    configuration = Configuration(access_token=channel_access_token)
-    if timeout is not None:
-        configuration.timeout = timeout
 
-    request = PushMessageRequest(
-        to=user_id,
-        messages=[TextMessage(text=message)],
-    )
+@timed("line.push")
+async def push_messages_async(
+    *,
+    channel_access_token: str,
+    user_id: str,
+    messages: list[str],
+    timeout: float | None = None,
+    host: str = DEFAULT_HOST,
+) -> None:
+    """
+    複数のテキストを、1リクエストあたり最大5件のメッセージオブジェクトにまとめて送信する。
+
+    5件を超える分だけ Push API を複数回呼ぶ。途中で失敗した場合はそれ以降を送らない。
+    共有クライアントの接続プールを使い、新規接続の確立にかかった時間も Push ごとにログに出す。
+    """
+    api = get_async_messaging_api(channel_access_token, host=host)
+    for offset in range(0, len(messages), MAX_MESSAGES_PER_PUSH):
+        request = PushMessageRequest(
+            to=user_id,
+            messages=[
+                TextMessage(text=text) for text in messages[offset : offset + MAX_MESSAGES_PER_PUSH]
+            ],
+        )
+        stats = _ConnectStats()
+        token = _CONNECT_STATS.set(stats)
+        started = time.perf_counter()
+        status = 200
+        metrics.count("LinePushes")
+        try:
+            await api.push_message(request, _request_timeout=timeout)
+        except ApiException as exc:
+            status = exc.status or 0
+            raise LineApiError(_build_error_message(exc), status, _retry_after_sec(exc)) from exc
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            status = 0
+            raise LineApiError(f"LINE API への接続に失敗しました: {exc!r}", status) from exc
+        finally:
+            _CONNECT_STATS.reset(token)
+            log_line_api_call(
+                operation="push_message_async",
+                status=status,
+                latency_ms=int((time.perf_counter() - started) * 1000),
+                connect_ms=int(stats.connect_sec * 1000),
+                new_connections=stats.new_connections,
+            )
+
+
+@dataclass(slots=True)
+class _ConnectStats:
+    """1回の Push で新規に張った接続の数と所要時間。"""
+
+    connect_sec: float = 0.0
+    new_connections: int = 0
+
+
+# 実行中のタスクの Push に対応する計測値（gather で並行に送っても混ざらない）
+_CONNECT_STATS: ContextVar[_ConnectStats | None] = ContextVar("line_connect_stats", default=None)
+
+
+async def _on_connection_create_start(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceConnectionCreateStartParams,
+) -> None:
+    context.connect_started = time.perf_counter()
+
+
+async def _on_connection_create_end(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceConnectionCreateEndParams,
+) -> None:
+    stats = _CONNECT_STATS.get()
+    if stats is not None:
+        stats.connect_sec += time.perf_counter() - context.connect_started
+        stats.new_connections += 1
+
+
+# プールから再利用できず新しい接続（TCP/TLS）を確立したときだけ呼ばれる
+_CONNECT_TRACE = aiohttp.TraceConfig()
+_CONNECT_TRACE.on_connection_create_start.append(_on_connection_create_start)
+_CONNECT_TRACE.on_connection_create_end.append(_on_connection_create_end)
+_CONNECT_TRACE.freeze()
 
+_CLIENTS_LOCK = threading.Lock()
+_ASYNC_CLIENTS: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[tuple[str, str], AsyncApiClient]
+] = weakref.WeakKeyDictionary()
+
+
+def get_async_messaging_api(
+    channel_access_token: str,
+    *,
+    host: str = DEFAULT_HOST,
+) -> AsyncMessagingApi:
+    """
+    実行中のイベントループとチャネルアクセストークンごとに共有する AsyncMessagingApi を返す。
+
+    aiohttp の ClientSession はイベントループに紐づくため、ループごとに持つ。
+    """
+    loop = asyncio.get_running_loop()
+    key = (channel_access_token, host)
+    with _CLIENTS_LOCK:
+        clients = _ASYNC_CLIENTS.setdefault(loop, {})
+        api_client = clients.get(key)
+        if api_client is None:
+            api_client = AsyncApiClient(Configuration(host=host, access_token=channel_access_token))
+            # 接続確立の時間を計測できるよう、SDK が作ったセッションにトレースを足す
+            api_client.rest_client.pool_manager.trace_configs.append(_CONNECT_TRACE)
+            clients[key] = api_client
+    return AsyncMessagingApi(api_client)
+
+
+async def close_async_clients() -> None:
+    """実行中のイベントループで共有している非同期クライアントを閉じる。"""
+
+    with _CLIENTS_LOCK:
+        clients = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), {})
+    for api_client in clients.values():
+        await api_client.close()
+
+
+def _retry_after_sec(exc: ApiException) -> float | None:
+    raw = exc.headers.get("Retry-After") if exc.headers else None
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
     try:
-        with ApiClient(configuration) as api_client:
-            MessagingApi(api_client).push_message(request)
-    except ApiException as exc:
-        status_code = exc.status or 0
-        raise LineApiError(_build_error_message(exc), status_code) from exc
+        retry_at = parsedate_to_datetime(raw)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
 
 
 def _build_error_message(exc: ApiException) -> str:
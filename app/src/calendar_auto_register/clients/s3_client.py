@@ -8,6 +8,8 @@ from typing import Any
 import boto3
 from botocore.client import BaseClient
 
+from calendar_auto_register.core.timing import timed
+
 
 @lru_cache(maxsize=None)
 def get_client(region: str) -> BaseClient:
@@ -16,8 +18,25 @@ def get_client(region: str) -> BaseClient:
     return boto3.client("s3", region_name=region)
 
 
+@timed("s3.get")
 def get_object(bucket: str, key: str, *, region: str) -> dict[str, Any]:
     """S3 からオブジェクトを取得するヘルパー。"""
 
     client = get_client(region)
     return client.get_object(Bucket=bucket, Key=key)
+
+
+@timed("s3.head")
+def head_object(bucket: str, key: str, *, region: str) -> dict[str, Any]:
+    """S3 オブジェクトのメタデータ（ETag など）だけを取得するヘルパー。"""
+
+    client = get_client(region)
+    return client.head_object(Bucket=bucket, Key=key)
+
+
+@timed("s3.put")
+def put_object(bucket: str, key: str, body: bytes, *, region: str) -> None:
+    """S3 へオブジェクトを書き込むヘルパー。"""
+
+    client = get_client(region)
+    client.put_object(Bucket=bucket, Key=key, Body=body)
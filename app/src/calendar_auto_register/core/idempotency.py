@@ -0,0 +1,237 @@
+"""冪等キーごとの完了済みレスポンスの保存（Step Functions の再試行で処理を繰り返さない）。"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Protocol
+
+from calendar_auto_register.core.settings import Settings
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        status INTEGER,
+        headers TEXT,
+        body BLOB,
+        expires_at REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)",
+)
+
+
+@dataclass(slots=True, frozen=True)
+class StoredResponse:
+    """保存した完了済みレスポンス（ヘッダーは latin-1 でデコードした名前と値の組）。"""
+
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
+
+
+class IdempotencyStore(Protocol):
+    """
+    冪等キーのストア。
+
+    `acquire` は実行中の印を `lease_sec` の間だけ置き、同じキーの同時リクエストが
+    二重に実行されないようにする（完了済み・実行中なら False）。処理が長引く間は `extend` で
+    印の期限を延ばす（印がもうなければ False）。完了したら `complete` でレスポンスを
+    `ttl_sec` の間保存し、保存しない結果なら `release` で印を外す。
+    """
+
+    def get(self, key: str) -> StoredResponse | None: ...
+
+    def acquire(self, key: str, *, lease_sec: float) -> bool: ...
+
+    def extend(self, key: str, *, lease_sec: float) -> bool: ...
+
+    def complete(self, key: str, response: StoredResponse, *, ttl_sec: float) -> None: ...
+
+    def release(self, key: str) -> None: ...
+
+
+class InMemoryIdempotencyStore:
+    """
+    プロセス内の LRU によるストア（ウォームな Lambda 実行環境の間だけ有効）。
+
+    実行中の印も同じ実行環境の中でしか見えないため、別の実行環境に届いた再試行の
+    二重実行は防げない。`max_entries` を超えたら最も古く使われたキーから捨てる。
+    """
+
+    def __init__(self, *, max_entries: int, clock: Callable[[], float] = time.time) -> None:
+        self._max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[StoredResponse | None, float]] = OrderedDict()
+
+    def get(self, key: str) -> StoredResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] is None:
+                return None
+            if entry[1] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def acquire(self, key: str, *, lease_sec: float) -> bool:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                return False
+            self._store(key, (None, now + lease_sec))
+            return True
+
+    def extend(self, key: str, *, lease_sec: float) -> bool:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] is not None:
+                return False
+            self._store(key, (None, now + lease_sec))
+            return True
+
+    def complete(self, key: str, response: StoredResponse, *, ttl_sec: float) -> None:
+        with self._lock:
+            self._store(key, (response, self._clock() + ttl_sec))
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is None:
+                del self._entries[key]
+
+    def _store(self, key: str, entry: tuple[StoredResponse | None, float]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+class SqliteIdempotencyStore:
+    """
+    SQLite によるストア（Lambda の `/tmp`、または EFS 上のファイル）。
+
+    EFS 上に置けば、別の実行環境に届いた重複リクエストも実行中の印で待たせられる。
+    期限切れの行はレスポンスを保存するたびに削除する。
+    """
+
+    def __init__(self, path: str | Path, *, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    def get(self, key: str) -> StoredResponse | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body FROM responses"
+                " WHERE key = ? AND status IS NOT NULL AND expires_at > ?",
+                (key, self._clock()),
+            ).fetchone()
+        if row is None:
+            return None
+        headers = [(name, value) for name, value in json.loads(row[1])]
+        return StoredResponse(status=row[0], headers=headers, body=bytes(row[2]))
+
+    def acquire(self, key: str, *, lease_sec: float) -> bool:
+        now = self._clock()
+        with self._lock, self._conn:
+            # BEGIN IMMEDIATE で書き込みロックを取り、他プロセスと同時に印を置かない
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                "SELECT 1 FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is not None:
+                return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, status, headers, body, expires_at)"
+                " VALUES (?, NULL, NULL, NULL, ?)",
+                (key, now + lease_sec),
+            )
+        return True
+
+    def extend(self, key: str, *, lease_sec: float) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE responses SET expires_at = ? WHERE key = ? AND status IS NULL",
+                (self._clock() + lease_sec, key),
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, key: str, response: StoredResponse, *, ttl_sec: float) -> None:
+        now = self._clock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, status, headers, body, expires_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, response.status, json.dumps(response.headers), response.body, now + ttl_sec),
+            )
+            self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+
+    def release(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE key = ? AND status IS NULL", (key,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_STORES_LOCK = threading.Lock()
+_STORES: dict[str, IdempotencyStore] = {}
+
+
+def idempotency_store_from_settings(settings: Settings) -> IdempotencyStore | None:
+    """
+    設定に応じた共有のストアを返す（無効なら None）。
+
+    `IDEMPOTENCY_PATH` があれば SQLite、なければプロセス内の LRU を使う。
+    """
+
+    if not settings.idempotency_enabled:
+        return None
+    key = settings.idempotency_path or ""
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = (
+                SqliteIdempotencyStore(settings.idempotency_path)
+                if settings.idempotency_path
+                else InMemoryIdempotencyStore(max_entries=settings.idempotency_max_entries)
+            )
+            _STORES[key] = store
+        return store
+
+
+def register_idempotency_store(path: str, store: IdempotencyStore) -> None:
+    """
+    `IDEMPOTENCY_PATH` に対応するストアを差し替える（リモートのバックエンドやテスト用）。
+
+    空文字列はプロセス内の LRU の代わりになる。
+    """
+
+    with _STORES_LOCK:
+        _STORES[path] = store
+
+
+def reset_idempotency_stores() -> None:
+    """共有のストアを破棄する（テスト用）。"""
+
+    with _STORES_LOCK:
+        _STORES.clear()
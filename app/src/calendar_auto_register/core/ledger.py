@@ -0,0 +1,219 @@
+"""処理済みメールの台帳（S3 の重複配信・同一メールの再アップロードを安価にスキップする）。"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Literal, Protocol
+
+from calendar_auto_register.core.settings import Settings
+
+LedgerStage = Literal["mail_parse", "llm_extract", "calendar_events", "line_notify"]
+
+# 記録のたびに compaction を走らせないよう、プロセスごとに間隔を空ける
+_COMPACT_INTERVAL_SEC = 3600.0
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS deliveries (
+        s3_key TEXT NOT NULL,
+        etag TEXT NOT NULL,
+        mail_id TEXT NOT NULL,
+        seen_at REAL NOT NULL,
+        PRIMARY KEY (s3_key, etag)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS deliveries_seen_at ON deliveries (seen_at)",
+    """
+    CREATE TABLE IF NOT EXISTS stages (
+        mail_id TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        output TEXT NOT NULL,
+        completed_at REAL NOT NULL,
+        PRIMARY KEY (mail_id, stage)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS stages_completed_at ON stages (completed_at)",
+)
+
+
+class MailLedger(Protocol):
+    """
+    台帳のバックエンド。
+
+    `mail_id` は RAW メール本文の SHA-256。S3 キー + ETag から `mail_id` を引き、
+    `mail_id` + ステージごとに完了時の出力（レスポンス JSON など）を記録する。
+    """
+
+    def lookup_delivery(self, s3_key: str, etag: str) -> str | None: ...
+
+    def record_delivery(self, s3_key: str, etag: str, mail_id: str) -> None: ...
+
+    def stage_output(self, mail_id: str, stage: LedgerStage) -> str | None: ...
+
+    def record_stage(self, mail_id: str, stage: LedgerStage, output: str) -> None: ...
+
+    def compact(self) -> int: ...
+
+
+class SqliteMailLedger:
+    """
+    SQLite による台帳（Lambda の `/tmp`、または EFS 上のファイル）。
+
+    `retention_sec` を過ぎた記録と、`max_entries` を超えた古い配信記録を compaction で削除する。
+    compaction は生成時と、その後は記録時に1時間おきに行う。
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        retention_sec: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._retention_sec = retention_sec
+        self._max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # EFS（NFS）では WAL が使えないため、既定のロールバックジャーナルのまま使う
+        self._conn = sqlite3.connect(str(path), timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+        self._compacted_at = 0.0
+        self.compact()
+
+    def lookup_delivery(self, s3_key: str, etag: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mail_id FROM deliveries WHERE s3_key = ? AND etag = ?",
+                (s3_key, etag),
+            ).fetchone()
+        return row[0] if row else None
+
+    def record_delivery(self, s3_key: str, etag: str, mail_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO deliveries (s3_key, etag, mail_id, seen_at)"
+                " VALUES (?, ?, ?, ?)",
+                (s3_key, etag, mail_id, self._clock()),
+            )
+        self._maybe_compact()
+
+    def stage_output(self, mail_id: str, stage: LedgerStage) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output FROM stages WHERE mail_id = ? AND stage = ?",
+                (mail_id, stage),
+            ).fetchone()
+        return row[0] if row else None
+
+    def record_stage(self, mail_id: str, stage: LedgerStage, output: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stages (mail_id, stage, output, completed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (mail_id, stage, output, self._clock()),
+            )
+        self._maybe_compact()
+
+    def compact(self) -> int:
+        """保持期間切れ・上限超過の記録を削除し、削除した行数を返す。"""
+
+        now = self._clock()
+        cutoff = now - self._retention_sec
+        with self._lock, self._conn:
+            deleted = self._conn.execute(
+                "DELETE FROM deliveries WHERE seen_at < ?", (cutoff,)
+            ).rowcount
+            deleted += self._conn.execute(
+                """
+                DELETE FROM deliveries WHERE (s3_key, etag) IN (
+                    SELECT s3_key, etag FROM deliveries
+                    ORDER BY seen_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self._max_entries,),
+            ).rowcount
+            deleted += self._conn.execute(
+                """
+                DELETE FROM stages WHERE completed_at < ?
+                   OR mail_id NOT IN (SELECT mail_id FROM deliveries)
+                """,
+                (cutoff,),
+            ).rowcount
+            self._compacted_at = now
+        return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _maybe_compact(self) -> None:
+        if self._clock() - self._compacted_at >= _COMPACT_INTERVAL_SEC:
+            self.compact()
+
+
+def recorded_output(settings: Settings, mail_id: str | None, stage: LedgerStage) -> str | None:
+    """台帳が有効で `mail_id` のステージが完了済みなら、記録した出力を返す。"""
+
+    ledger = ledger_from_settings(settings)
+    if ledger is None or not mail_id:
+        return None
+    return ledger.stage_output(mail_id, stage)
+
+
+def record_output(
+    settings: Settings,
+    mail_id: str | None,
+    stage: LedgerStage,
+    output: str,
+) -> None:
+    """台帳が有効なら `mail_id` のステージ完了と出力を記録する。"""
+
+    ledger = ledger_from_settings(settings)
+    if ledger is None or not mail_id:
+        return
+    ledger.record_stage(mail_id, stage, output)
+
+
+_LEDGERS_LOCK = threading.Lock()
+_LEDGERS: dict[str, MailLedger] = {}
+
+
+def ledger_from_settings(settings: Settings) -> MailLedger | None:
+    """設定に応じた共有の台帳を返す（`MAIL_LEDGER_PATH` が未設定なら None）。"""
+
+    if not settings.mail_ledger_path:
+        return None
+    with _LEDGERS_LOCK:
+        ledger = _LEDGERS.get(settings.mail_ledger_path)
+        if ledger is None:
+            ledger = SqliteMailLedger(
+                settings.mail_ledger_path,
+                retention_sec=settings.mail_ledger_retention_sec,
+                max_entries=settings.mail_ledger_max_entries,
+            )
+            _LEDGERS[settings.mail_ledger_path] = ledger
+        return ledger
+
+
+def register_ledger(path: str, ledger: MailLedger) -> None:
+    """`MAIL_LEDGER_PATH` に対応する台帳を差し替える（リモートのバックエンドやテスト用）。"""
+
+    with _LEDGERS_LOCK:
+        _LEDGERS[path] = ledger
+
+
+def reset_ledgers() -> None:
+    """共有の台帳を破棄する（テスト用）。"""
+
+    with _LEDGERS_LOCK:
+        _LEDGERS.clear()
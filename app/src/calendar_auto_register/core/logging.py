@@ -1,24 +1,183 @@
-"""JSONロギングの共通ヘルパー。"""
+"""
+JSONロギングの共通ヘルパー。
+
+各関数は payload の dict を組み立てて渡すだけで、JSON へのシリアライズ（とトレースバックの
+整形）はハンドラーが書き出すときに行う。`configure_logging(async_enabled=True)` では書き出しを
+`QueueListener` のスレッドに任せ、リクエスト処理の経路では行わない。
+"""
 
 from __future__ import annotations
 
+import atexit
 import json
 import logging
+import queue
+import sys
+import threading
+import time
 import traceback
-from typing import Any
+from logging.handlers import QueueHandler, QueueListener
+from types import TracebackType
+from typing import Any, TextIO
 
 _LOGGER = logging.getLogger("calendar_auto_register")
 
+_LISTENER_LOCK = threading.Lock()
+_QUEUE: queue.Queue[logging.LogRecord] | None = None
+_LISTENER: QueueListener | None = None
+_QUEUE_HANDLER: QueueHandler | None = None
 
-def log_request(*, path: str, status: int, request_id: str, latency_ms: int) -> None:
-    payload = {
+
+class _JsonMessage:
+    """`LogRecord.msg` に載せる payload。文字列化（`getMessage`）されたときに初めて JSON にする。"""
+
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        self.payload = payload
+
+    def __str__(self) -> str:
+        return json.dumps(self.payload, ensure_ascii=False, default=_render_deferred)
+
+
+class _ErrorJson:
+    """`error_json` の値。エラー内容の JSON 文字列化を書き出し時まで遅らせる。"""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: Any) -> None:
+        self.error = error
+
+
+class _Traceback:
+    """捕捉中だった例外。トレースバックの整形を書き出し時まで遅らせる。"""
+
+    __slots__ = ("exc_type", "exc", "tb")
+
+    def __init__(
+        self, exc_type: type[BaseException], exc: BaseException, tb: TracebackType | None
+    ) -> None:
+        self.exc_type = exc_type
+        self.exc = exc
+        self.tb = tb
+
+
+def _render_deferred(value: Any) -> Any:
+    if isinstance(value, _ErrorJson):
+        return _to_error_json(value.error)
+    if isinstance(value, _Traceback):
+        return "".join(traceback.format_exception(value.exc_type, value.exc, value.tb))
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    レコードを整形せずにそのままキューへ入れる `QueueHandler`。
+
+    標準の `prepare` は呼び出し元のスレッドで `format` してしまうため、同一プロセス内の
+    キューであることを前提にレコードをそのまま渡す。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _StderrHandler(logging.StreamHandler):
+    """書き出しのたびに現在の `sys.stderr` を使う（差し替えられた stderr にも追従する）。"""
+
+    def __init__(self) -> None:
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self) -> TextIO:
+        return sys.stderr
+
+
+def configure_logging(*, level: int, async_enabled: bool) -> None:
+    """
+    ログレベルと書き出し方を設定する。何度呼んでもよい（リスナーは1つだけ動かす）。
+
+    `async_enabled` なら、このパッケージのログは `QueueHandler` でキューへ入れ、
+    `QueueListener` のスレッドが JSON 化して標準エラー出力へ書く。無効なら従来どおり
+    ルートロガーのハンドラーが呼び出し元のスレッドで書く。
+    """
+
+    global _QUEUE, _LISTENER, _QUEUE_HANDLER
+
+    logging.basicConfig(level=level, format="%(message)s")
+    _LOGGER.setLevel(level)
+    with _LISTENER_LOCK:
+        if async_enabled and _LISTENER is None:
+            _QUEUE = queue.Queue()
+            handler = _StderrHandler()
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _LISTENER = QueueListener(_QUEUE, handler)
+            _LISTENER.start()
+            _QUEUE_HANDLER = _DeferredQueueHandler(_QUEUE)
+            _LOGGER.addHandler(_QUEUE_HANDLER)
+            _LOGGER.propagate = False
+        elif not async_enabled and _LISTENER is not None:
+            _stop_listener()
+
+
+def flush_logs(timeout: float = 2.0) -> None:
+    """
+    キューに入ったログがすべて書き出されるまで待つ（最大 `timeout` 秒）。
+
+    Lambda は応答を返すと実行環境を凍結するため、呼び出しの最後に呼んで取りこぼしを防ぐ。
+    """
+
+    log_queue = _QUEUE
+    if log_queue is None:
+        return
+    deadline = time.monotonic() + timeout
+    with log_queue.all_tasks_done:
+        while log_queue.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            log_queue.all_tasks_done.wait(remaining)
+    sys.stderr.flush()
+
+
+def _stop_listener() -> None:
+    global _QUEUE, _LISTENER, _QUEUE_HANDLER
+
+    if _QUEUE_HANDLER is not None:
+        _LOGGER.removeHandler(_QUEUE_HANDLER)
+        _LOGGER.propagate = True
+    if _LISTENER is not None:
+        # 停止時はキューに残ったレコードを書き切ってからスレッドを終える
+        _LISTENER.stop()
+    _QUEUE = None
+    _LISTENER = None
+    _QUEUE_HANDLER = None
+
+
+@atexit.register
+def _shutdown() -> None:
+    with _LISTENER_LOCK:
+        _stop_listener()
+
+
+def log_request(
+    *,
+    path: str,
+    status: int,
+    request_id: str,
+    latency_ms: int,
+    stages: dict[str, float] | None = None,
+) -> None:
+    payload: dict[str, Any] = {
         "level": "INFO",
         "path": path,
         "status": status,
         "request_id": request_id,
         "latency_ms": latency_ms,
     }
-    _LOGGER.info(json.dumps(payload, ensure_ascii=False))
+    if stages is not None:
+        payload["stages"] = stages
+    _LOGGER.info(_JsonMessage(payload))
 
 
 def log_error(
@@ -35,10 +194,105 @@ def log_error(
         "status": status,
         "request_id": request_id,
         "latency_ms": latency_ms,
-        "error_json": _to_error_json(error),
-        "traceback": traceback.format_exc(),
+        "error_json": _ErrorJson(error),
+        "traceback": _current_traceback(),
+    }
+    _LOGGER.error(_JsonMessage(payload))
+
+
+def log_llm_usage(
+    *,
+    model_id: str,
+    tier: int,
+    accepted: bool,
+    latency_ms: int,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int,
+    cache_write_tokens: int,
+) -> None:
+    payload = {
+        "level": "INFO",
+        "event": "llm_usage",
+        "model_id": model_id,
+        "tier": tier,
+        "accepted": accepted,
+        "latency_ms": latency_ms,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cache_read_tokens": cache_read_tokens,
+        "cache_write_tokens": cache_write_tokens,
+    }
+    _LOGGER.info(_JsonMessage(payload))
+
+
+def log_google_api_call(
+    *,
+    method: str,
+    path: str,
+    status: int,
+    latency_ms: int,
+    request_bytes: int,
+    wire_bytes: int,
+    decoded_bytes: int,
+    content_encoding: str,
+) -> None:
+    payload = {
+        "level": "INFO",
+        "event": "google_api_call",
+        "method": method,
+        "path": path,
+        "status": status,
+        "latency_ms": latency_ms,
+        "request_bytes": request_bytes,
+        "wire_bytes": wire_bytes,
+        "decoded_bytes": decoded_bytes,
+        "content_encoding": content_encoding,
+    }
+    _LOGGER.info(_JsonMessage(payload))
+
+
+def log_line_api_call(
+    *,
+    operation: str,
+    status: int,
+    latency_ms: int,
+    connect_ms: int | None = None,
+    new_connections: int | None = None,
+) -> None:
+    payload = {
+        "level": "INFO",
+        "event": "line_api_call",
+        "operation": operation,
+        "status": status,
+        "latency_ms": latency_ms,
+        "connect_ms": connect_ms,
+        "new_connections": new_connections,
     }
-    _LOGGER.error(json.dumps(payload, ensure_ascii=False))
+    _LOGGER.info(_JsonMessage(payload))
+
+
+def log_cache_stats(*, cache: str, stats: dict[str, Any]) -> None:
+    payload = {"level": "INFO", "event": "cache_stats", "cache": cache, **stats}
+    _LOGGER.info(_JsonMessage(payload))
+
+
+def log_warning(*, event: str, error: Any) -> None:
+    payload = {
+        "level": "WARNING",
+        "event": event,
+        "error_json": _ErrorJson(error),
+    }
+    _LOGGER.warning(_JsonMessage(payload))
+
+
+def _current_traceback() -> _Traceback | None:
+    """捕捉中の例外があればそれを返す（整形は書き出し時）。なければ None。"""
+
+    exc_type, exc, tb = sys.exc_info()
+    if exc_type is None or exc is None:
+        return None
+    return _Traceback(exc_type, exc, tb)
 
 
 def _to_error_json(error: Any) -> str:
@@ -0,0 +1,123 @@
+"""CloudWatch Embedded Metric Format（EMF）によるメトリクスの送出。"""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Literal, TextIO
+
+Unit = Literal["Count", "Milliseconds", "Percent", "None"]
+
+# EMF の1ディレクティブに載せられるメトリクス数と、1メトリクスあたりの値の数の上限
+_MAX_METRICS = 100
+_MAX_VALUES = 100
+
+
+class InvocationMetrics:
+    """
+    1回の呼び出し（リクエスト）の間に集めたメトリクス。
+
+    `count` は合計して1つの値に、`record` は値の配列（分布）として出す。スレッドプールの
+    ワーカーからも記録されるため、更新はロックで守る。
+    """
+
+    __slots__ = ("_lock", "_units", "_values")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._units: dict[str, Unit] = {}
+        self._values: dict[str, list[float]] = {}
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            values = self._values.setdefault(name, [0.0])
+            self._units.setdefault(name, "Count")
+            values[0] += value
+
+    def record(self, name: str, value: float, unit: Unit) -> None:
+        with self._lock:
+            self._units.setdefault(name, unit)
+            values = self._values.setdefault(name, [])
+            if len(values) < _MAX_VALUES:
+                values.append(value)
+
+    def to_emf(
+        self,
+        *,
+        namespace: str,
+        dimensions: dict[str, str],
+        properties: dict[str, Any] | None = None,
+        timestamp_ms: int | None = None,
+    ) -> dict[str, Any]:
+        """集めたメトリクスを EMF のドキュメント（dict）にする。"""
+
+        with self._lock:
+            names = list(self._values)[:_MAX_METRICS]
+            values = {name: list(self._values[name]) for name in names}
+            units = {name: self._units[name] for name in names}
+        document: dict[str, Any] = {
+            "_aws": {
+                "Timestamp": timestamp_ms if timestamp_ms is not None else int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": namespace,
+                        "Dimensions": [list(dimensions)],
+                        "Metrics": [{"Name": name, "Unit": units[name]} for name in names],
+                    }
+                ],
+            },
+            **(properties or {}),
+            **dimensions,
+        }
+        for name in names:
+            document[name] = values[name][0] if len(values[name]) == 1 else values[name]
+        return document
+
+
+_CURRENT: ContextVar[InvocationMetrics | None] = ContextVar("invocation_metrics", default=None)
+
+
+def start_invocation() -> tuple[InvocationMetrics, Token[InvocationMetrics | None]]:
+    """現在のコンテキストで収集を始める。戻り値のトークンを `end_invocation` に渡す。"""
+
+    metrics = InvocationMetrics()
+    return metrics, _CURRENT.set(metrics)
+
+
+def end_invocation(token: Token[InvocationMetrics | None]) -> None:
+    _CURRENT.reset(token)
+
+
+def count(name: str, value: float = 1) -> None:
+    """収集中なら件数を加算する（収集していなければ何もしない）。"""
+
+    metrics = _CURRENT.get()
+    if metrics is not None:
+        metrics.count(name, value)
+
+
+def record(name: str, value: float, unit: Unit = "None") -> None:
+    """収集中なら値を1つ記録する（収集していなければ何もしない）。"""
+
+    metrics = _CURRENT.get()
+    if metrics is not None:
+        metrics.record(name, value, unit)
+
+
+def flush(
+    metrics: InvocationMetrics,
+    *,
+    namespace: str,
+    dimensions: dict[str, str],
+    properties: dict[str, Any] | None = None,
+    stream: TextIO | None = None,
+) -> None:
+    """EMF ドキュメントを1行の JSON として標準出力へ書く（Lambda ではログ経由で取り込まれる）。"""
+
+    document = metrics.to_emf(namespace=namespace, dimensions=dimensions, properties=properties)
+    out = stream or sys.stdout
+    out.write(json.dumps(document, ensure_ascii=False) + "\n")
+    out.flush()
@@ -1,64 +1,307 @@
-"""FastAPI 用の共通ミドルウェア群。"""
+"""FastAPI 用の共通ミドルウェア群（`BaseHTTPMiddleware` を使わない ASGI ミドルウェア）。"""
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import time
 import uuid
-from typing import Awaitable, Callable
+from typing import Any
 
-from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from calendar_auto_register.core import metrics
+from calendar_auto_register.core.idempotency import (
+    IdempotencyStore,
+    StoredResponse,
+    idempotency_store_from_settings,
+)
 from calendar_auto_register.core.logging import log_request
+from calendar_auto_register.core.settings import Settings
+from calendar_auto_register.core.timing import end_request, start_request
 
-RequestHandler = Callable[[Request], Awaitable[Response]]
+# 実行中の同じリクエストの完了を待つ間のポーリング間隔
+_IDEMPOTENCY_POLL_INTERVAL_SEC = 0.2
+# 実行中の印の期限が切れる前に、期限の何分の1ごとに延長するか
+_IDEMPOTENCY_RENEWALS_PER_LEASE = 3
 
 
-async def api_key_middleware(request: Request, call_next: RequestHandler) -> Response:
+class ApiKeyMiddleware:
     """API キー認証ミドルウェア。ローカル環境では認証スキップ。"""
 
-    from calendar_auto_register.core.settings import load_settings
-
-    settings = load_settings()
-
-    # ローカル環境では認証スキップ
-    if settings.is_local:
-        return await call_next(request)
-
-    # # 本番環境では API キーをチェック
-    # auth_header = request.headers.get("Authorization", "")
-    # if not auth_header.startswith("Bearer "):
-    #     return JSONResponse(
-    #         {"detail": "Invalid or missing Authorization header"},
-    #         status_code=401,
-    #     )
-    #
-    # provided_key = auth_header[len("Bearer ") :].strip()
-    # if not settings.api_key or provided_key != settings.api_key:
-    #     return JSONResponse(
-    #         {"detail": "Unauthorized"},
-    #         status_code=401,
-    #     )
-
-    return await call_next(request)
-
-
-async def request_id_middleware(request: Request, call_next: RequestHandler) -> Response:
-    """X-Request-Id を受理・生成しレスポンスヘッダへ付与する。"""
-
-    request_id = request.headers.get("X-Request-Id") or str(uuid.uuid4())
-    request.state.request_id = request_id
-
-    started = time.perf_counter()
-    request.state.request_started = started
-    response = await call_next(request)
-
-    latency_ms = int((time.perf_counter() - started) * 1000)
-    response.headers["X-Request-Id"] = request_id
-    response.headers["X-Response-Time-Ms"] = str(latency_ms)
-    log_request(
-        path=request.url.path,
-        status=response.status_code,
-        request_id=request_id,
-        latency_ms=latency_ms,
-    )
-    return response
+    def __init__(self, app: ASGIApp, *, settings: Settings) -> None:
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # ローカル環境では認証スキップ
+        if scope["type"] != "http" or self.settings.is_local:
+            await self.app(scope, receive, send)
+            return
+
+        # # 本番環境では API キーをチェック
+        # auth_header = Headers(scope=scope).get("Authorization", "")
+        # if not auth_header.startswith("Bearer "):
+        #     response = JSONResponse(
+        #         {"detail": "Invalid or missing Authorization header"},
+        #         status_code=401,
+        #     )
+        #     await response(scope, receive, send)
+        #     return
+        #
+        # provided_key = auth_header[len("Bearer ") :].strip()
+        # if not self.settings.api_key or provided_key != self.settings.api_key:
+        #     response = JSONResponse(
+        #         {"detail": "Unauthorized"},
+        #         status_code=401,
+        #     )
+        #     await response(scope, receive, send)
+        #     return
+
+        await self.app(scope, receive, send)
+
+
+class RequestIdMiddleware:
+    """
+    X-Request-Id を受理・生成しレスポンスヘッダへ付与する。
+
+    `request.state.request_id` / `request_started` は例外ハンドラーからも参照する。
+    段階ごとの計測が有効なら、`core.timing` の span の合計を `Server-Timing` ヘッダーと
+    リクエストログの `stages` に出す。メトリクスが有効なら、リクエスト中に集めた値を
+    1つの EMF ドキュメントとしてまとめて出す。ヘッダーは `http.response.start` を送る
+    時点で付け、ログとメトリクスはレスポンスを送り終えてから出す。
+    """
+
+    def __init__(self, app: ASGIApp, *, settings: Settings) -> None:
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        settings = self.settings
+        path = scope["path"]
+        request_id = _header(scope, b"x-request-id") or str(uuid.uuid4())
+        started = time.perf_counter()
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+        state["request_started"] = started
+
+        timings, timing_token = start_request() if settings.timing_enabled else (None, None)
+        invocation, metrics_token = (
+            metrics.start_invocation() if settings.metrics_enabled else (None, None)
+        )
+        status: int | None = None
+        elapsed_ms = 0.0
+        stages: dict[str, float] | None = None
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status, elapsed_ms, stages
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-Id"] = request_id
+                headers["X-Response-Time-Ms"] = str(int(elapsed_ms))
+                if timings is not None:
+                    stages = timings.snapshot()
+                    headers["Server-Timing"] = timings.server_timing(total_ms=elapsed_ms)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            if timing_token is not None:
+                end_request(timing_token)
+            if metrics_token is not None:
+                metrics.end_invocation(metrics_token)
+
+        if status is None:
+            return
+        log_request(
+            path=path,
+            status=status,
+            request_id=request_id,
+            latency_ms=int(elapsed_ms),
+            stages=stages,
+        )
+        if invocation is not None:
+            invocation.record("RequestLatency", elapsed_ms, "Milliseconds")
+            for name, stage_ms in (stages or {}).items():
+                invocation.record(f"Latency.{name}", stage_ms, "Milliseconds")
+            metrics.flush(
+                invocation,
+                namespace=settings.metrics_namespace,
+                dimensions=_metric_dimensions(scope, path, status, settings=settings),
+                properties={"request_id": request_id},
+            )
+
+
+class IdempotencyMiddleware:
+    """
+    冪等キー付きの再試行に、完了済みのレスポンスをそのまま返すミドルウェア。
+
+    `IDEMPOTENCY_PATHS` への POST で `Idempotency-Key`（なければ `X-Request-Id`）がある
+    リクエストだけを対象にし、キー・パス・リクエストボディのハッシュで識別する。2xx で
+    送り終えたレスポンスを保存し、同じリクエストには `Idempotent-Replayed: true` を付けて
+    返す。同じキーのリクエストが実行中なら、完了を待ってから保存済みのレスポンスを返す
+    （`IDEMPOTENCY_WAIT_SEC` を過ぎたら 409）。2xx 以外は保存しないため、再試行で再実行される。
+    実行中の印は `IDEMPOTENCY_LEASE_SEC` ごとに期限を切り、処理が続く間は延長し続ける。
+    """
+
+    def __init__(self, app: ASGIApp, *, settings: Settings) -> None:
+        self.app = app
+        self.settings = settings
+        self.paths = frozenset(settings.idempotency_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        store = idempotency_store_from_settings(self.settings)
+        client_key = _header(scope, b"idempotency-key") or _header(scope, b"x-request-id")
+        if store is None or client_key is None:
+            await self.app(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        key = _idempotency_key(scope["path"], client_key, body)
+        if not await self._wait_for_turn(store, key, scope, receive, send):
+            return
+
+        status: int | None = None
+        headers: list[tuple[str, str]] = []
+        chunks: list[bytes] = []
+        completed = False
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status, completed
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers.extend(
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in message.get("headers", [])
+                )
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                completed = not message.get("more_body", False)
+            await send(message)
+
+        renewer = asyncio.create_task(self._renew_lease(store, key))
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            await run_in_threadpool(store.release, key)
+            raise
+        finally:
+            renewer.cancel()
+        if completed and status is not None and 200 <= status < 300:
+            response = StoredResponse(status=status, headers=headers, body=b"".join(chunks))
+            await run_in_threadpool(
+                lambda: store.complete(key, response, ttl_sec=self.settings.idempotency_ttl_sec)
+            )
+        else:
+            await run_in_threadpool(store.release, key)
+
+    async def _wait_for_turn(
+        self, store: IdempotencyStore, key: str, scope: Scope, receive: Receive, send: Send
+    ) -> bool:
+        """
+        実行してよければ True を返す。
+
+        保存済みのレスポンスがあればそれを送り、実行中の同じリクエストを待ちきれなければ
+        409 を送って False を返す。
+        """
+
+        wait_sec = self.settings.idempotency_wait_sec
+        deadline = time.monotonic() + wait_sec
+        while True:
+            stored = await run_in_threadpool(store.get, key)
+            if stored is not None:
+                await _send_stored(stored, send)
+                return False
+            # 実行中の印は、処理が途中で落ちても延長が止まって期限を過ぎれば外れる
+            if await run_in_threadpool(
+                lambda: store.acquire(key, lease_sec=self.settings.idempotency_lease_sec)
+            ):
+                return True
+            if time.monotonic() >= deadline:
+                conflict = JSONResponse(
+                    {"detail": "同じ冪等キーのリクエストを処理中です。"},
+                    status_code=409,
+                    headers={"Retry-After": str(max(1, int(wait_sec)))},
+                )
+                await conflict(scope, receive, send)
+                return False
+            await asyncio.sleep(_IDEMPOTENCY_POLL_INTERVAL_SEC)
+
+    async def _renew_lease(self, store: IdempotencyStore, key: str) -> None:
+        """処理が続く間、実行中の印の期限が切れる前に延長し続ける。"""
+
+        lease_sec = self.settings.idempotency_lease_sec
+        while True:
+            await asyncio.sleep(lease_sec / _IDEMPOTENCY_RENEWALS_PER_LEASE)
+            if not await run_in_threadpool(lambda: store.extend(key, lease_sec=lease_sec)):
+                return
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks: list[bytes] = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def _idempotency_key(path: str, client_key: str, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (path.encode("utf-8"), client_key.encode("utf-8"), body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+async def _send_stored(stored: StoredResponse, send: Send) -> None:
+    headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.headers]
+    headers.append((b"idempotent-replayed", b"true"))
+    await send({"type": "http.response.start", "status": stored.status, "headers": headers})
+    await send({"type": "http.response.body", "body": stored.body, "more_body": False})
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1") or None
+    return None
+
+
+def _metric_dimensions(
+    scope: Scope, path: str, status: int, *, settings: Settings
+) -> dict[str, str]:
+    """`METRICS_DIMENSIONS` で選んだディメンションの値。Path はルートのテンプレートを使う。"""
+
+    route: Any = scope.get("route")
+    available = {
+        "Service": "calendar-auto-register",
+        "Env": settings.app_env,
+        "Path": getattr(route, "path", None) or path,
+        "Status": str(status),
+    }
+    return {name: available[name] for name in settings.metrics_dimensions if name in available}
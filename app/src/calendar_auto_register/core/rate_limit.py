@@ -0,0 +1,85 @@
+"""外部 API 呼び出し用の適応型レートリミッタ。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+
+# 加算的増加の刻み（最大レートに対する割合）と乗算的減少の係数
+_INCREASE_RATIO = 0.1
+_DECREASE_FACTOR = 0.5
+
+
+class AdaptiveRateLimiter:
+    """
+    スロットリング時にレートを下げ、成功時に戻すトークンバケット（AIMD）。
+
+    トークンは予約方式で払い出すため、複数スレッドから呼ばれても先着順に間隔が空く。
+    """
+
+    def __init__(
+        self,
+        *,
+        max_rate: float,
+        min_rate: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._max_rate = max_rate
+        self._min_rate = min(min_rate, max_rate)
+        self._rate = max_rate
+        self._capacity = max(1.0, max_rate)
+        self._tokens = self._capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+        self.throttled = 0
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def acquire(self) -> float:
+        """トークンを1つ取得する。待機した秒数を返す。"""
+
+        wait = self.reserve()
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def reserve(self) -> float:
+        """
+        トークンを1つ予約し、使えるようになるまでの秒数を返す（自身では待機しない）。
+
+        asyncio など、呼び出し側で待機方法を選ぶ場合に使う。
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1.0
+            return 0.0 if self._tokens >= 0 else -self._tokens / self._rate
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._refill()
+            self._rate = min(self._max_rate, self._rate + self._max_rate * _INCREASE_RATIO)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self._refill()
+            self._rate = max(self._min_rate, self._rate * _DECREASE_FACTOR)
+            # バケットに残ったバーストを捨て、次の呼び出しから新しいレートで間隔を空ける
+            self._tokens = min(self._tokens, 0.0)
+            self.throttled += 1
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            self._refill()
+            return {"rate": self._rate, "tokens": self._tokens, "throttled": self.throttled}
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
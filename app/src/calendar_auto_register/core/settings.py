@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import lru_cache
 
 import boto3
@@ -28,6 +28,56 @@ class Settings:
     line_channel_access_token: str | None
     line_user_id: str | None
     api_key: str | None
+    bedrock_prompt_cache_enabled: bool = True
+    bedrock_cascade_model_ids: list[str] = field(default_factory=list)
+    bedrock_rate_limit_per_sec: float = 5.0
+    bedrock_rate_limit_min_per_sec: float = 0.2
+    bedrock_circuit_failure_threshold: int = 5
+    bedrock_circuit_reset_sec: float = 30.0
+    llm_singleflight_lock_dir: str | None = None
+    llm_singleflight_wait_sec: float = 60.0
+    llm_singleflight_result_ttl_sec: float = 60.0
+    calendar_max_workers: int = 1
+    google_rate_limit_per_sec: float = 10.0
+    google_retry_max_attempts: int = 4
+    google_retry_base_delay_sec: float = 0.5
+    google_retry_max_delay_sec: float = 8.0
+    calendar_deadline_sec: float = 25.0
+    calendar_mirror_enabled: bool = False
+    calendar_mirror_ttl_sec: float = 60.0
+    calendar_mirror_dir: str = "/tmp/calendar-auto-register/mirror"
+    calendar_mirror_s3_bucket: str | None = None
+    calendar_duplicate_similarity: float = 1.0
+    calendar_day_cache_ttl_sec: float = 0.0
+    calendar_day_cache_max_days: int = 64
+    calendar_async_client_enabled: bool = False
+    calendar_upsert_enabled: bool = False
+    mail_ledger_path: str | None = None
+    mail_ledger_retention_sec: float = 7 * 24 * 3600.0
+    mail_ledger_max_entries: int = 10000
+    line_digest_enabled: bool = False
+    line_digest_max_results: int = 20
+    line_digest_max_wait_sec: float = 300.0
+    line_digest_path: str | None = None
+    line_outbox_path: str | None = None
+    line_outbox_max_attempts: int = 8
+    line_outbox_base_delay_sec: float = 5.0
+    line_outbox_max_delay_sec: float = 900.0
+    line_outbox_drain_interval_sec: float = 0.0
+    timing_enabled: bool = True
+    metrics_enabled: bool = False
+    metrics_namespace: str = "CalendarAutoRegister"
+    metrics_dimensions: list[str] = field(default_factory=lambda: ["Path", "Status"])
+    log_async_enabled: bool = False
+    idempotency_enabled: bool = False
+    idempotency_path: str | None = None
+    idempotency_paths: list[str] = field(
+        default_factory=lambda: ["/calendar/events", "/llm/extract-event"]
+    )
+    idempotency_ttl_sec: float = 3600.0
+    idempotency_max_entries: int = 1000
+    idempotency_wait_sec: float = 120.0
+    idempotency_lease_sec: float = 900.0
 
     @property
     def is_local(self) -> bool:
@@ -46,6 +96,33 @@ def _load_json_list(raw: str | None) -> list[str]:
     return [str(item) for item in parsed]
 
 
+def _get_bool_env(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _get_float_env(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return float(raw)
+    except ValueError as exc:
+        raise ValueError(f"環境変数 {name} は数値である必要があります。") from exc
+
+
+def _get_int_env(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return int(raw)
+    except ValueError as exc:
+        raise ValueError(f"環境変数 {name} は整数である必要があります。") from exc
+
+
 def _get_required_env(name: str) -> str:
     value = os.getenv(name)
     if value is None:
@@ -111,4 +188,56 @@ def load_settings() -> Settings:
         line_channel_access_token=os.getenv("LINE_CHANNEL_ACCESS_TOKEN"),
         line_user_id=os.getenv("LINE_USER_ID"),
         api_key=os.getenv("API_KEY"),
+        bedrock_prompt_cache_enabled=_get_bool_env("BEDROCK_PROMPT_CACHE_ENABLED", True),
+        bedrock_cascade_model_ids=_load_json_list(os.getenv("BEDROCK_CASCADE_MODEL_IDS")),
+        bedrock_rate_limit_per_sec=_get_float_env("BEDROCK_RATE_LIMIT_PER_SEC", 5.0),
+        bedrock_rate_limit_min_per_sec=_get_float_env("BEDROCK_RATE_LIMIT_MIN_PER_SEC", 0.2),
+        bedrock_circuit_failure_threshold=_get_int_env("BEDROCK_CIRCUIT_FAILURE_THRESHOLD", 5),
+        bedrock_circuit_reset_sec=_get_float_env("BEDROCK_CIRCUIT_RESET_SEC", 30.0),
+        llm_singleflight_lock_dir=os.getenv("LLM_SINGLEFLIGHT_LOCK_DIR") or None,
+        llm_singleflight_wait_sec=_get_float_env("LLM_SINGLEFLIGHT_WAIT_SEC", 60.0),
+        llm_singleflight_result_ttl_sec=_get_float_env("LLM_SINGLEFLIGHT_RESULT_TTL_SEC", 60.0),
+        calendar_max_workers=_get_int_env("CALENDAR_MAX_WORKERS", 1),
+        google_rate_limit_per_sec=_get_float_env("GOOGLE_RATE_LIMIT_PER_SEC", 10.0),
+        google_retry_max_attempts=_get_int_env("GOOGLE_RETRY_MAX_ATTEMPTS", 4),
+        google_retry_base_delay_sec=_get_float_env("GOOGLE_RETRY_BASE_DELAY_SEC", 0.5),
+        google_retry_max_delay_sec=_get_float_env("GOOGLE_RETRY_MAX_DELAY_SEC", 8.0),
+        calendar_deadline_sec=_get_float_env("CALENDAR_DEADLINE_SEC", 25.0),
+        calendar_mirror_enabled=_get_bool_env("CALENDAR_MIRROR_ENABLED", False),
+        calendar_mirror_ttl_sec=_get_float_env("CALENDAR_MIRROR_TTL_SEC", 60.0),
+        calendar_mirror_dir=os.getenv(
+            "CALENDAR_MIRROR_DIR", "/tmp/calendar-auto-register/mirror"
+        ),
+        calendar_mirror_s3_bucket=os.getenv("CALENDAR_MIRROR_S3_BUCKET") or None,
+        calendar_duplicate_similarity=_get_float_env("CALENDAR_DUPLICATE_SIMILARITY", 1.0),
+        calendar_day_cache_ttl_sec=_get_float_env("CALENDAR_DAY_CACHE_TTL_SEC", 0.0),
+        calendar_day_cache_max_days=_get_int_env("CALENDAR_DAY_CACHE_MAX_DAYS", 64),
+        calendar_async_client_enabled=_get_bool_env("CALENDAR_ASYNC_CLIENT_ENABLED", False),
+        calendar_upsert_enabled=_get_bool_env("CALENDAR_UPSERT_ENABLED", False),
+        mail_ledger_path=os.getenv("MAIL_LEDGER_PATH") or None,
+        mail_ledger_retention_sec=_get_float_env("MAIL_LEDGER_RETENTION_SEC", 7 * 24 * 3600.0),
+        mail_ledger_max_entries=_get_int_env("MAIL_LEDGER_MAX_ENTRIES", 10000),
+        line_digest_enabled=_get_bool_env("LINE_DIGEST_ENABLED", False),
+        line_digest_max_results=_get_int_env("LINE_DIGEST_MAX_RESULTS", 20),
+        line_digest_max_wait_sec=_get_float_env("LINE_DIGEST_MAX_WAIT_SEC", 300.0),
+        line_digest_path=os.getenv("LINE_DIGEST_PATH") or None,
+        line_outbox_path=os.getenv("LINE_OUTBOX_PATH") or None,
+        line_outbox_max_attempts=_get_int_env("LINE_OUTBOX_MAX_ATTEMPTS", 8),
+        line_outbox_base_delay_sec=_get_float_env("LINE_OUTBOX_BASE_DELAY_SEC", 5.0),
+        line_outbox_max_delay_sec=_get_float_env("LINE_OUTBOX_MAX_DELAY_SEC", 900.0),
+        line_outbox_drain_interval_sec=_get_float_env("LINE_OUTBOX_DRAIN_INTERVAL_SEC", 0.0),
+        timing_enabled=_get_bool_env("TIMING_ENABLED", True),
+        # ローカル実行では既定で送出しない（標準出力を EMF で埋めない）
+        metrics_enabled=_get_bool_env("METRICS_ENABLED", app_env != _LOCAL_ENV),
+        metrics_namespace=os.getenv("METRICS_NAMESPACE") or "CalendarAutoRegister",
+        metrics_dimensions=_load_json_list(os.getenv("METRICS_DIMENSIONS")) or ["Path", "Status"],
+        log_async_enabled=_get_bool_env("LOG_ASYNC_ENABLED", app_env != _LOCAL_ENV),
+        idempotency_enabled=_get_bool_env("IDEMPOTENCY_ENABLED", False),
+        idempotency_path=os.getenv("IDEMPOTENCY_PATH") or None,
+        idempotency_paths=_load_json_list(os.getenv("IDEMPOTENCY_PATHS"))
+        or ["/calendar/events", "/llm/extract-event"],
+        idempotency_ttl_sec=_get_float_env("IDEMPOTENCY_TTL_SEC", 3600.0),
+        idempotency_max_entries=_get_int_env("IDEMPOTENCY_MAX_ENTRIES", 1000),
+        idempotency_wait_sec=_get_float_env("IDEMPOTENCY_WAIT_SEC", 120.0),
+        idempotency_lease_sec=_get_float_env("IDEMPOTENCY_LEASE_SEC", 900.0),
     )
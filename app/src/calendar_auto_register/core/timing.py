@@ -0,0 +1,109 @@
+"""リクエスト内の処理段階（S3・MIME 解析・Bedrock・Google・LINE など）ごとの所要時間の計測。"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+import time
+from collections.abc import Callable
+from contextvars import ContextVar, Token
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class RequestTimings:
+    """
+    1リクエスト分の段階ごとの累計時間（ミリ秒）。
+
+    同じ名前の span は合算する（並列の insert なども1つの段階として数える）。スレッドプールの
+    ワーカーからも記録されるため、更新はロックで守る。
+    """
+
+    __slots__ = ("_lock", "stages")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.stages: dict[str, float] = {}
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+
+    def snapshot(self) -> dict[str, float]:
+        """小数第1位に丸めた段階ごとの時間を返す。"""
+
+        with self._lock:
+            return {name: round(elapsed, 1) for name, elapsed in self.stages.items()}
+
+    def server_timing(self, *, total_ms: float) -> str:
+        """`Server-Timing` ヘッダーの値（例: `s3.get;dur=12.3, total;dur=20.5`）。"""
+
+        entries = [f"{name};dur={elapsed}" for name, elapsed in self.snapshot().items()]
+        entries.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(entries)
+
+
+_CURRENT: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def start_request() -> tuple[RequestTimings, Token[RequestTimings | None]]:
+    """現在のコンテキストで計測を始める。戻り値のトークンを `end_request` に渡す。"""
+
+    timings = RequestTimings()
+    return timings, _CURRENT.set(timings)
+
+
+def end_request(token: Token[RequestTimings | None]) -> None:
+    _CURRENT.reset(token)
+
+
+def current_timings() -> RequestTimings | None:
+    return _CURRENT.get()
+
+
+class span:  # `with span("...")` と関数のように使うため小文字の名前にしている
+    """
+    段階の所要時間を計測するコンテキストマネージャー。
+
+    計測中のリクエストがない（無効化されている・リクエスト外から呼ばれた）場合は何もしない。
+    """
+
+    __slots__ = ("_name", "_timings", "_started")
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def __enter__(self) -> span:
+        self._timings = _CURRENT.get()
+        if self._timings is not None:
+            self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._timings is not None:
+            self._timings.add(self._name, (time.perf_counter() - self._started) * 1000)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """関数（同期・非同期どちらでもよい）の呼び出し全体を `span(name)` で囲むデコレーター。"""
+
+    def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -0,0 +1,126 @@
+"""予約番号などの安定キーから、登録済み Google イベントを引くためのインデックス。"""
+
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from typing import Any
+
+from calendar_auto_register.core.settings import Settings
+from calendar_auto_register.shared.schemas.calendar import GoogleCalendarEventModel
+
+# 登録イベントの extendedProperties.private に保存するキー名
+BOOKING_KEY_PROPERTY = "bookingKey"
+
+_BOOKING_KEY_PATTERN = re.compile(
+    r"(?:予約番号|予約id|予約コード|受付番号|確認番号|チケット番号|整理番号"
+    r"|booking\s*(?:reference|number|no\.?|id|code)"
+    r"|reservation\s*(?:number|no\.?|id|code)"
+    r"|confirmation\s*(?:number|no\.?|code)"
+    r"|ticket\s*(?:number|no\.?))"
+    r"\s*[:#]?\s*(?P<value>[a-z0-9][a-z0-9-]{3,})",
+    re.IGNORECASE,
+)
+# 支払い期限イベントの summary 書式 `支払い期限 HH:MM@イベント名`（時刻は識別子に含めない）
+_PAYMENT_DEADLINE_PATTERN = re.compile(r"^支払い期限\s*(?:\d{1,2}:\d{2})?\s*@?\s*")
+
+
+def extract_booking_key(event: GoogleCalendarEventModel) -> str | None:
+    """
+    description から予約番号・予約参照番号・チケット番号などを取り出す。
+
+    全角/半角の揺れは NFKC で吸収し、大文字に揃えて返す。見つからなければ None。
+    """
+    if not event.description:
+        return None
+    text = unicodedata.normalize("NFKC", event.description)
+    match = _BOOKING_KEY_PATTERN.search(text)
+    if match is None:
+        return None
+    return match["value"].upper()
+
+
+def booking_identity(booking_key: str, item: dict[str, Any]) -> str:
+    """
+    予約キーに、イベント自身の種類を足した upsert の識別子を返す。
+
+    1つの予約番号が往路と復路、本体と支払い期限のように複数のイベントにまたがるため、
+    支払い期限かどうか・終日か・eventType・summary（支払い期限の接頭辞を除く）も含める。
+    `item` は events.list の item 形式（summary の自動登録の接頭辞は除いておく）。
+    """
+    summary = unicodedata.normalize("NFKC", str(item.get("summary") or "")).strip()
+    kind = "payment" if _PAYMENT_DEADLINE_PATTERN.match(summary) else "event"
+    all_day = "date" in (item.get("start") or {})
+    parts = (
+        booking_key,
+        kind,
+        "date" if all_day else "dateTime",
+        str(item.get("eventType") or "default"),
+        _PAYMENT_DEADLINE_PATTERN.sub("", summary),
+    )
+    return "\x1f".join(parts)
+
+
+class BookingKeyIndex:
+    """upsert の識別子（`booking_identity`）→ 登録済みイベント（events.list の item 形式）。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._items: dict[str, dict[str, Any]] = {}
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            return self._items.get(key)
+
+    def put(self, key: str, item: dict[str, Any]) -> None:
+        with self._lock:
+            self._items[key] = item
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+
+_INDEXES_LOCK = threading.Lock()
+_INDEXES: dict[str, BookingKeyIndex] = {}
+
+
+def index_from_settings(settings: Settings) -> BookingKeyIndex | None:
+    """カレンダーごとの共有インデックスを返す（upsert が無効なら None）。"""
+
+    if not settings.calendar_upsert_enabled:
+        return None
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(settings.calendar_id)
+        if index is None:
+            index = BookingKeyIndex()
+            _INDEXES[settings.calendar_id] = index
+        return index
+
+
+def reset_indexes() -> None:
+    """共有インデックスを破棄する（テスト用）。"""
+
+    with _INDEXES_LOCK:
+        _INDEXES.clear()
+
+
+class BatchClaims:
+    """
+    1回の一括登録で作成・一致・更新したイベント ID と、それを使ったイベント。
+
+    同じバッチの別のイベントが、先に登録したイベントを更新で上書きしないようにする。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._owners: dict[str, object] = {}
+
+    def claim(self, event_id: str | None, owner: object) -> bool:
+        """未使用か、同じ `owner`（再試行中のイベント）が使った ID なら記録して True を返す。"""
+
+        if event_id is None:
+            return True
+        with self._lock:
+            return self._owners.setdefault(event_id, owner) is owner
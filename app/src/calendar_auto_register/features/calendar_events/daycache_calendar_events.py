@@ -0,0 +1,201 @@
+"""events.list の結果を UTC の日単位でキャッシュする短期 TTL・LRU キャッシュ。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from calendar_auto_register.core.settings import Settings
+from calendar_auto_register.features.calendar_events.index_calendar_events import (
+    IndexedEvent,
+    to_indexed_event,
+)
+
+ListRangeFunc = Callable[[datetime, datetime], list[dict[str, Any]]]
+
+
+@dataclass(slots=True)
+class _DayBucket:
+    fetched_at: float
+    events: dict[str, IndexedEvent] = field(default_factory=dict)
+
+
+class DayWindowCache:
+    """
+    重複チェック用の events.list 結果を UTC の日ごとに保持するキャッシュ。
+
+    検索ウィンドウが含む日のうちキャッシュにない（または TTL 切れの）日だけを、
+    連続する範囲ごとに1回の events.list で取得する。自分で登録したイベントは
+    `add` で書き込み、同じ日への後続のチェックに反映させる。
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_sec: float,
+        max_days: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl_sec = ttl_sec
+        self._max_days = max_days
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: OrderedDict[date, _DayBucket] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def find_overlapping(
+        self,
+        time_min: datetime,
+        time_max: datetime,
+        list_range: ListRangeFunc,
+    ) -> list[dict[str, Any]]:
+        """[time_min, time_max) と重なるイベントを、不足している日だけ取得して返す。"""
+
+        days = _days_between(time_min.timestamp(), time_max.timestamp())
+        with self._lock:
+            missing = [day for day in days if not self._is_fresh(day)]
+            self.hits += len(days) - len(missing)
+            self.misses += len(missing)
+
+        for first, last in _contiguous_ranges(missing):
+            range_min = _day_start(first)
+            range_max = _day_start(last + timedelta(days=1))
+            fetched_at = self._clock()
+            items = list_range(range_min, range_max)
+            self._store(first, last, items, fetched_at)
+
+        min_ts = time_min.timestamp()
+        max_ts = time_max.timestamp()
+        found: dict[str, dict[str, Any]] = {}
+        with self._lock:
+            for day in days:
+                bucket = self._buckets.get(day)
+                if bucket is None:
+                    continue
+                self._buckets.move_to_end(day)
+                for event in bucket.events.values():
+                    if event.start_ts < max_ts and (
+                        event.end_ts > min_ts or event.start_ts >= min_ts
+                    ):
+                        found[event.id] = event.item
+        return list(found.values())
+
+    def add(self, item: dict[str, Any]) -> None:
+        """登録したイベントを、キャッシュ済みの該当日に書き込む（write-through）。"""
+
+        event = to_indexed_event(item)
+        if event is None:
+            return
+        with self._lock:
+            for day in _days_between(event.start_ts, max(event.end_ts, event.start_ts + 1)):
+                bucket = self._buckets.get(day)
+                if bucket is not None:
+                    bucket.events[event.id] = event
+
+    def discard(self, event_id: str) -> None:
+        """更新で日時が変わったイベントを、キャッシュ済みの全ての日から取り除く。"""
+
+        with self._lock:
+            for bucket in self._buckets.values():
+                bucket.events.pop(event_id, None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "days": len(self._buckets),
+            }
+
+    def _is_fresh(self, day: date) -> bool:
+        bucket = self._buckets.get(day)
+        if bucket is None:
+            return False
+        if self._clock() - bucket.fetched_at > self._ttl_sec:
+            del self._buckets[day]
+            return False
+        return True
+
+    def _store(
+        self,
+        first: date,
+        last: date,
+        items: list[dict[str, Any]],
+        fetched_at: float,
+    ) -> None:
+        buckets: dict[date, _DayBucket] = {}
+        day = first
+        while day <= last:
+            buckets[day] = _DayBucket(fetched_at=fetched_at)
+            day += timedelta(days=1)
+        for item in items:
+            event = to_indexed_event(item)
+            if event is None:
+                continue
+            for event_day in _days_between(event.start_ts, max(event.end_ts, event.start_ts + 1)):
+                bucket = buckets.get(event_day)
+                if bucket is not None:
+                    bucket.events[event.id] = event
+        with self._lock:
+            for bucket_day, bucket in buckets.items():
+                self._buckets[bucket_day] = bucket
+                self._buckets.move_to_end(bucket_day)
+            while len(self._buckets) > self._max_days:
+                self._buckets.popitem(last=False)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def _days_between(start_ts: float, end_ts: float) -> list[date]:
+    """[start_ts, end_ts) が含まれる UTC 日のリストを返す。"""
+
+    first = datetime.fromtimestamp(start_ts, tz=timezone.utc).date()
+    last = datetime.fromtimestamp(max(start_ts, end_ts - 1e-6), tz=timezone.utc).date()
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+def _contiguous_ranges(days: list[date]) -> list[tuple[date, date]]:
+    ranges: list[tuple[date, date]] = []
+    for day in days:
+        if ranges and ranges[-1][1] + timedelta(days=1) == day:
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+_CACHES_LOCK = threading.Lock()
+_CACHES: dict[str, DayWindowCache] = {}
+
+
+def cache_from_settings(settings: Settings) -> DayWindowCache | None:
+    """カレンダーごとの共有キャッシュを返す（TTL が 0 以下なら無効として None）。"""
+
+    if settings.calendar_day_cache_ttl_sec <= 0:
+        return None
+    with _CACHES_LOCK:
+        cache = _CACHES.get(settings.calendar_id)
+        if cache is None:
+            cache = DayWindowCache(
+                ttl_sec=settings.calendar_day_cache_ttl_sec,
+                max_days=settings.calendar_day_cache_max_days,
+            )
+            _CACHES[settings.calendar_id] = cache
+        return cache
+
+
+def reset_caches() -> None:
+    """共有キャッシュを破棄する（テスト用）。"""
+
+    with _CACHES_LOCK:
+        _CACHES.clear()
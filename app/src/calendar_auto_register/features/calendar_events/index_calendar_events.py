@@ -0,0 +1,268 @@
+"""重複候補イベントを期間と件名の類似度で引くためのインメモリ区間インデックス。"""
+
+from __future__ import annotations
+
+import heapq
+import unicodedata
+from bisect import bisect_left, insort
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone
+from difflib import SequenceMatcher
+from typing import Any
+
+
+@dataclass(slots=True, frozen=True)
+class IndexedEvent:
+    """インデックス上の1イベント。`item` は events.list の item と同じ形の dict。"""
+
+    id: str
+    normalized_summary: str
+    start_ts: float
+    end_ts: float
+    all_day: bool
+    item: dict[str, Any]
+
+
+@dataclass(slots=True, frozen=True)
+class DuplicateCandidate:
+    """類似度順に並べた重複候補。"""
+
+    event: IndexedEvent
+    similarity: float
+    start_delta_sec: float
+
+
+def normalize_summary(summary: str | None) -> str:
+    """
+    件名を比較用に正規化する。
+
+    NFKC で全角/半角を揃えて小文字化し、英数字（漢字・かなを含む）以外を取り除く。
+    登録時の prefix（絵文字）や空白・記号の揺れはここで吸収される。
+    """
+    if not summary:
+        return ""
+    normalized = unicodedata.normalize("NFKC", summary).casefold()
+    return "".join(char for char in normalized if char.isalnum())
+
+
+def to_indexed_event(item: dict[str, Any]) -> IndexedEvent | None:
+    """events.list の item を IndexedEvent に変換する（日時が解釈できなければ None）。"""
+
+    event_id = item.get("id")
+    start = item.get("start")
+    end = item.get("end")
+    if not event_id or not isinstance(start, dict) or not isinstance(end, dict):
+        return None
+    try:
+        start_ts, start_all_day = _to_timestamp(start)
+        end_ts, end_all_day = _to_timestamp(end)
+    except (KeyError, ValueError):
+        return None
+    if start_all_day != end_all_day:
+        return None
+    return IndexedEvent(
+        id=event_id,
+        normalized_summary=normalize_summary(item.get("summary")),
+        start_ts=start_ts,
+        end_ts=max(end_ts, start_ts),
+        all_day=start_all_day,
+        item={
+            "id": event_id,
+            "summary": item.get("summary"),
+            "start": dict(start),
+            "end": dict(end),
+        },
+    )
+
+
+class _SortedIntervals:
+    """
+    開始時刻でソートした (start_ts, id, end_ts) の配列を、期間の長さのバケット（1分 × 2 の
+    べき乗刻み）ごとに分けて持つ。
+
+    各バケットは自分の中の最長期間だけ検索窓を手前に広げ、[time_min - 最長期間, time_max) の
+    開始時刻を bisect で切り出す。数日にわたる予定があっても、広がるのはそのバケットの窓
+    だけで、短い予定の検索範囲は変わらない。最長期間は削除時にも計算し直す。バケット数を B、
+    重なった区間の数を k とすると、1回の検索は O(B log n + k + f) になる。f は重ならないのに
+    窓に入った区間の数で、同じバケットの区間（期間の差が2倍以内）のうち、time_min の直前の
+    最長期間分に開始したものに限られる。
+    """
+
+    def __init__(self) -> None:
+        self._buckets: dict[int, list[tuple[float, str, float]]] = {}
+        self._max_durations: dict[int, float] = {}
+
+    def add(self, event: IndexedEvent) -> None:
+        bucket = _duration_bucket(event)
+        entries = self._buckets.setdefault(bucket, [])
+        insort(entries, (event.start_ts, event.id, event.end_ts))
+        duration = event.end_ts - event.start_ts
+        self._max_durations[bucket] = max(self._max_durations.get(bucket, 0.0), duration)
+
+    def remove(self, event: IndexedEvent) -> None:
+        bucket = _duration_bucket(event)
+        entries = self._buckets.get(bucket)
+        if entries is None:
+            return
+        position = bisect_left(entries, (event.start_ts, event.id))
+        if position >= len(entries) or entries[position][:2] != (event.start_ts, event.id):
+            return
+        del entries[position]
+        if not entries:
+            del self._buckets[bucket]
+            del self._max_durations[bucket]
+        elif event.end_ts - event.start_ts >= self._max_durations[bucket]:
+            self._max_durations[bucket] = max(end_ts - start_ts for start_ts, _, end_ts in entries)
+
+    def bulk_load(self, events: Iterable[IndexedEvent]) -> None:
+        for event in events:
+            bucket = _duration_bucket(event)
+            self._buckets.setdefault(bucket, []).append((event.start_ts, event.id, event.end_ts))
+        for bucket, entries in self._buckets.items():
+            entries.sort()
+            self._max_durations[bucket] = max(end_ts - start_ts for start_ts, _, end_ts in entries)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._max_durations.clear()
+
+    def candidate_ids(self, min_ts: float, max_ts: float) -> Iterator[str]:
+        ranges = []
+        for bucket, entries in self._buckets.items():
+            low = bisect_left(entries, (min_ts - self._max_durations[bucket],))
+            high = bisect_left(entries, (max_ts,))
+            if low < high:
+                ranges.append(entries[low:high])
+        # バケットをまたいでも開始時刻順に返す
+        for _, event_id, _ in heapq.merge(*ranges):
+            yield event_id
+
+
+def _duration_bucket(event: IndexedEvent) -> int:
+    return int((event.end_ts - event.start_ts) // 60).bit_length()
+
+
+class IntervalIndex:
+    """終日イベントと時刻指定イベントを別々の配列で保持する区間インデックス。"""
+
+    def __init__(self) -> None:
+        self._events: dict[str, IndexedEvent] = {}
+        self._timed = _SortedIntervals()
+        self._all_day = _SortedIntervals()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __iter__(self) -> Iterator[IndexedEvent]:
+        return iter(self._events.values())
+
+    def add(self, item: dict[str, Any]) -> IndexedEvent | None:
+        """item を追加（同じ ID があれば置き換え）する。解釈できない item は無視する。"""
+
+        event = to_indexed_event(item)
+        if event is None:
+            return None
+        self.remove(event.id)
+        self._events[event.id] = event
+        self._intervals(event.all_day).add(event)
+        return event
+
+    def bulk_load(self, items: Iterable[dict[str, Any]]) -> None:
+        """空のインデックスへまとめて読み込む（1件ずつの insort より速い）。"""
+
+        self.clear()
+        for item in items:
+            event = to_indexed_event(item)
+            if event is not None:
+                self._events[event.id] = event
+        self._timed.bulk_load(event for event in self._events.values() if not event.all_day)
+        self._all_day.bulk_load(event for event in self._events.values() if event.all_day)
+
+    def remove(self, event_id: str) -> None:
+        event = self._events.pop(event_id, None)
+        if event is not None:
+            self._intervals(event.all_day).remove(event)
+
+    def clear(self) -> None:
+        self._events.clear()
+        self._timed.clear()
+        self._all_day.clear()
+
+    def overlapping(
+        self,
+        time_min: datetime,
+        time_max: datetime,
+        *,
+        all_day: bool | None = None,
+    ) -> list[IndexedEvent]:
+        """[time_min, time_max) と期間が重なるイベントを返す（all_day で種別を絞り込める）。"""
+
+        min_ts = time_min.timestamp()
+        max_ts = time_max.timestamp()
+        kinds = (False, True) if all_day is None else (all_day,)
+        found: list[IndexedEvent] = []
+        for kind in kinds:
+            for event_id in self._intervals(kind).candidate_ids(min_ts, max_ts):
+                event = self._events[event_id]
+                if event.start_ts < max_ts and (event.end_ts > min_ts or event.start_ts >= min_ts):
+                    found.append(event)
+        return found
+
+    def _intervals(self, all_day: bool) -> _SortedIntervals:
+        return self._all_day if all_day else self._timed
+
+
+def rank_candidates(
+    events: Iterable[IndexedEvent],
+    *,
+    summary: str,
+    start_ts: float,
+    all_day: bool,
+    min_similarity: float,
+) -> list[DuplicateCandidate]:
+    """
+    同じ種別（終日/時刻指定）のイベントを件名の類似度で絞り込み、順位付けして返す。
+
+    類似度の高い順、同率なら開始時刻の近い順に並べる。
+    """
+    normalized = normalize_summary(summary)
+    # 比較元を seq2 に固定して前処理を使い回し、上限値で足切りしてから ratio を計算する
+    matcher = SequenceMatcher(None, "", normalized, autojunk=False)
+    ranked: list[DuplicateCandidate] = []
+    for event in events:
+        if event.all_day != all_day:
+            continue
+        if event.normalized_summary == normalized:
+            similarity = 1.0
+        elif not normalized or not event.normalized_summary:
+            continue
+        else:
+            matcher.set_seq1(event.normalized_summary)
+            if matcher.real_quick_ratio() < min_similarity:
+                continue
+            if matcher.quick_ratio() < min_similarity:
+                continue
+            similarity = matcher.ratio()
+        if similarity < min_similarity:
+            continue
+        ranked.append(
+            DuplicateCandidate(
+                event=event,
+                similarity=similarity,
+                start_delta_sec=abs(event.start_ts - start_ts),
+            )
+        )
+    ranked.sort(key=lambda candidate: (-candidate.similarity, candidate.start_delta_sec))
+    return ranked
+
+
+def _to_timestamp(value: dict[str, Any]) -> tuple[float, bool]:
+    if "dateTime" in value:
+        parsed = datetime.fromisoformat(value["dateTime"].replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            raise ValueError("タイムゾーンのない日時はインデックスに登録できません。")
+        return parsed.timestamp(), False
+    # 終日イベントは重複チェックと同じく UTC の 0 時として扱う
+    parsed_date = date.fromisoformat(value["date"])
+    return datetime.combine(parsed_date, time.min, tzinfo=timezone.utc).timestamp(), True
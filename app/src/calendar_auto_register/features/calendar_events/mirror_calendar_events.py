@@ -0,0 +1,246 @@
+"""syncToken による増分同期で管理対象カレンダーをローカルに複製するミラー。"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Protocol
+
+from botocore.exceptions import ClientError
+from googleapiclient.errors import HttpError
+
+from calendar_auto_register.clients import s3_client
+from calendar_auto_register.core.settings import Settings
+from calendar_auto_register.features.calendar_events.index_calendar_events import IntervalIndex
+
+# ミラーに保持するフィールドだけを取得する
+_LIST_FIELDS = "items(id,status,summary,start,end),nextPageToken,nextSyncToken"
+_STORE_VERSION = 1
+
+ListPageFunc = Callable[..., dict[str, Any]]
+
+
+class MirrorStore(Protocol):
+    """ミラーのスナップショット（gzip JSON）を呼び出し間で永続化するストア。"""
+
+    def load(self) -> bytes | None: ...
+
+    def save(self, payload: bytes) -> None: ...
+
+
+class FileMirrorStore:
+    """ローカルファイル（Lambda の `/tmp` など）に保存するストア。"""
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+
+    def load(self) -> bytes | None:
+        try:
+            return self._path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def save(self, payload: bytes) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, self._path)
+
+
+class S3MirrorStore:
+    """S3 に保存するストア（コールドスタートをまたいでミラーを共有する）。"""
+
+    def __init__(self, bucket: str, key: str, *, region: str) -> None:
+        self._bucket = bucket
+        self._key = key
+        self._region = region
+
+    def load(self) -> bytes | None:
+        try:
+            response = s3_client.get_object(self._bucket, self._key, region=self._region)
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in {"NoSuchKey", "404"}:
+                return None
+            raise
+        body: bytes = response["Body"].read()
+        return body
+
+    def save(self, payload: bytes) -> None:
+        s3_client.put_object(self._bucket, self._key, payload, region=self._region)
+
+
+class CalendarMirror:
+    """
+    管理対象カレンダーのイベントを保持するインメモリのミラー。
+
+    `refresh` は TTL を超えていれば syncToken で増分同期し、410 Gone の場合は全件を取り直す。
+    重複判定は区間インデックスから期間が重なるイベントを引くだけで済む。ストアへの保存は
+    前回の保存から内容が変わったときだけ行う。
+    """
+
+    def __init__(self, store: MirrorStore, *, ttl_sec: float) -> None:
+        self._store = store
+        self._ttl_sec = ttl_sec
+        self._lock = threading.RLock()
+        self._index = IntervalIndex()
+        self._sync_token: str | None = None
+        self._synced_at = 0.0
+        self._loaded = False
+        self._dirty = False
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def refresh(self, list_page: ListPageFunc) -> None:
+        """TTL を超えていれば同期し、ストアへ保存する。"""
+
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if self._sync_token is not None and time.time() - self._synced_at <= self._ttl_sec:
+                return
+            self._sync(list_page)
+            self._save()
+
+    def find_overlapping(self, time_min: datetime, time_max: datetime) -> list[dict[str, Any]]:
+        """[time_min, time_max) と期間が重なるイベントを events.list の item 形式で返す。"""
+
+        with self._lock:
+            return [event.item for event in self._index.overlapping(time_min, time_max)]
+
+    def apply(self, item: dict[str, Any]) -> None:
+        """登録直後のイベントなどを書き込む（同一バッチ内の重複判定に反映させる）。"""
+
+        with self._lock:
+            self._apply(item)
+
+    def save(self) -> None:
+        """前回の保存以降に変更があればストアへ保存する。"""
+
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _sync(self, list_page: ListPageFunc) -> None:
+        if self._sync_token is not None:
+            try:
+                self._fetch(list_page, sync_token=self._sync_token)
+                self.incremental_syncs += 1
+                return
+            except HttpError as exc:
+                if exc.resp is None or exc.resp.status != 410:
+                    raise
+        # 初回、または syncToken が失効した（410 Gone）場合は全件を取り直す
+        self._clear()
+        self._fetch(list_page, sync_token=None)
+        self.full_syncs += 1
+
+    def _fetch(self, list_page: ListPageFunc, *, sync_token: str | None) -> None:
+        page_token: str | None = None
+        while True:
+            params: dict[str, Any] = {"singleEvents": True, "fields": _LIST_FIELDS}
+            if sync_token is not None:
+                params["syncToken"] = sync_token
+            if page_token is not None:
+                params["pageToken"] = page_token
+            response = list_page(**params)
+            for item in response.get("items", []):
+                self._apply(item)
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+        self._sync_token = response.get("nextSyncToken")
+        self._synced_at = time.time()
+        self._dirty = True
+
+    def _apply(self, item: dict[str, Any]) -> None:
+        if item.get("status") == "cancelled":
+            event_id = item.get("id")
+            if event_id:
+                self._index.remove(event_id)
+                self._dirty = True
+            return
+        self._index.add(item)
+        self._dirty = True
+
+    def _clear(self) -> None:
+        self._index.clear()
+        self._sync_token = None
+
+    def _load(self) -> None:
+        self._loaded = True
+        payload = self._store.load()
+        if payload is None:
+            return
+        try:
+            snapshot = json.loads(gzip.decompress(payload))
+        except (OSError, ValueError):
+            return
+        if snapshot.get("version") != _STORE_VERSION:
+            return
+        self._index.bulk_load(snapshot.get("items", []))
+        self._sync_token = snapshot.get("sync_token")
+        self._synced_at = float(snapshot.get("synced_at", 0.0))
+
+    def _save(self) -> None:
+        if self._sync_token is None:
+            return
+        snapshot = {
+            "version": _STORE_VERSION,
+            "sync_token": self._sync_token,
+            "synced_at": self._synced_at,
+            "items": [event.item for event in self._index],
+        }
+        payload = json.dumps(snapshot, ensure_ascii=False, separators=(",", ":"))
+        self._store.save(gzip.compress(payload.encode("utf-8")))
+        self._dirty = False
+
+
+_MIRRORS_LOCK = threading.Lock()
+_MIRRORS: dict[str, CalendarMirror] = {}
+
+
+def mirror_from_settings(settings: Settings) -> CalendarMirror | None:
+    """設定に応じたカレンダーごとの共有ミラーを返す（無効なら None）。"""
+
+    if not settings.calendar_mirror_enabled:
+        return None
+    with _MIRRORS_LOCK:
+        mirror = _MIRRORS.get(settings.calendar_id)
+        if mirror is None:
+            mirror = CalendarMirror(
+                _store_from_settings(settings),
+                ttl_sec=settings.calendar_mirror_ttl_sec,
+            )
+            _MIRRORS[settings.calendar_id] = mirror
+        return mirror
+
+
+def _store_from_settings(settings: Settings) -> MirrorStore:
+    file_name = f"{_safe_name(settings.calendar_id)}.json.gz"
+    if settings.calendar_mirror_s3_bucket:
+        return S3MirrorStore(
+            settings.calendar_mirror_s3_bucket,
+            f"calendar-mirror/{file_name}",
+            region=settings.region,
+        )
+    return FileMirrorStore(Path(settings.calendar_mirror_dir) / file_name)
+
+
+def _safe_name(calendar_id: str) -> str:
+    return "".join(char if char.isalnum() or char in "-_." else "_" for char in calendar_id)
+
+
+def reset_mirrors() -> None:
+    """共有ミラーを破棄する（テスト用）。"""
+
+    with _MIRRORS_LOCK:
+        _MIRRORS.clear()
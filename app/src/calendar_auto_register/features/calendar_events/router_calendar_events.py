@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import time
+
 from fastapi import APIRouter, Depends, Request
+from starlette.concurrency import run_in_threadpool
 
+from calendar_auto_register.core import ledger
 from calendar_auto_register.core.settings import Settings
 from calendar_auto_register.features.calendar_events.schemas_calendar_events import (
     CalendarEventsRequest,
@@ -11,10 +15,14 @@ from calendar_auto_register.features.calendar_events.schemas_calendar_events imp
 )
 from calendar_auto_register.features.calendar_events.usecase_calendar_events import (
     create_calendar_events,
+    create_calendar_events_async,
 )
 
 router = APIRouter(prefix="/calendar", tags=["calendar"])
 
+# レスポンス返却とログ出力のために Lambda の残り時間から確保しておく秒数
+_LAMBDA_DEADLINE_MARGIN_SEC = 2.0
+
 
 async def get_settings(request: Request) -> Settings:
     return request.app.state.settings  # type: ignore[attr-defined]
@@ -22,8 +30,43 @@ async def get_settings(request: Request) -> Settings:
 
 @router.post("/events", response_model=CalendarEventsResponse)
 async def calendar_events(
+    request: Request,
     payload: CalendarEventsRequest,
     settings: Settings = Depends(get_settings),
 ) -> CalendarEventsResponse:
-    results = create_calendar_events(payload.events, settings=settings)
-    return CalendarEventsResponse(results=results)
+    recorded = ledger.recorded_output(settings, payload.mail_id, "calendar_events")
+    if recorded is not None:
+        return CalendarEventsResponse.model_validate_json(recorded)
+
+    deadline = _lambda_deadline(request)
+    if settings.calendar_async_client_enabled:
+        results = await create_calendar_events_async(
+            payload.events,
+            settings=settings,
+            deadline=deadline,
+        )
+    else:
+        results = await run_in_threadpool(
+            create_calendar_events,
+            payload.events,
+            settings=settings,
+            deadline=deadline,
+        )
+    response = CalendarEventsResponse(results=results)
+    # 失敗を含む結果は記録しない（再実行で登録し直せるようにする）
+    if all(result.status != "FAILED" for result in results):
+        ledger.record_output(
+            settings, payload.mail_id, "calendar_events", response.model_dump_json()
+        )
+    return response
+
+
+def _lambda_deadline(request: Request) -> float | None:
+    """Mangum 経由の Lambda 実行時は、残り時間から再試行の期限（time.monotonic 基準）を求める。"""
+
+    context = request.scope.get("aws.context")
+    get_remaining = getattr(context, "get_remaining_time_in_millis", None)
+    if get_remaining is None:
+        return None
+    remaining_sec = get_remaining() / 1000
+    return time.monotonic() + max(0.0, remaining_sec - _LAMBDA_DEADLINE_MARGIN_SEC)
@@ -9,6 +9,7 @@ from calendar_auto_register.shared.schemas.calendar import (
 )
 from calendar_auto_register.shared.schemas.calendar_events import (
     CalendarEventResult,
+    CalendarEventResultMetadata,
     CalendarEventsResponse,
     ErrorModel,
 )
@@ -18,6 +19,7 @@ class CalendarEventsRequest(BaseModel):
     """カレンダー登録リクエスト（bulk対応）。"""
 
     events: list[CalendarEventModel] = Field(default_factory=list)
+    mail_id: str | None = Field(default=None, description="`/mail/parse` が返した台帳の ID")
 
     model_config = ConfigDict(extra="forbid")
 
@@ -26,6 +28,7 @@ __all__ = [
     "CalendarEventModel",
     "CalendarEventsRequest",
     "CalendarEventResult",
+    "CalendarEventResultMetadata",
     "CalendarEventsResponse",
     "ErrorModel",
 ]
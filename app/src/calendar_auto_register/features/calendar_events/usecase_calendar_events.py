@@ -2,15 +2,45 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta, timezone
-from typing import Any, Iterable
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Iterable, Literal
 
 from googleapiclient.errors import HttpError
 
-from calendar_auto_register.clients import google_client
+from calendar_auto_register.clients import google_async_client, google_client
+from calendar_auto_register.clients.google_async_client import AsyncCalendarClient
+from calendar_auto_register.core import metrics
+from calendar_auto_register.core.logging import log_cache_stats, log_warning
+from calendar_auto_register.core.rate_limit import AdaptiveRateLimiter
 from calendar_auto_register.core.settings import Settings
+from calendar_auto_register.core.timing import timed
+from calendar_auto_register.features.calendar_events import (
+    bookingkey_calendar_events,
+    daycache_calendar_events,
+    index_calendar_events,
+    mirror_calendar_events,
+)
+from calendar_auto_register.features.calendar_events.bookingkey_calendar_events import (
+    BOOKING_KEY_PROPERTY,
+    BatchClaims,
+    BookingKeyIndex,
+)
+from calendar_auto_register.features.calendar_events.daycache_calendar_events import (
+    DayWindowCache,
+)
+from calendar_auto_register.features.calendar_events.mirror_calendar_events import (
+    CalendarMirror,
+)
 from calendar_auto_register.features.calendar_events.schemas_calendar_events import (
     CalendarEventModel,
+    CalendarEventResultMetadata,
 )
 from calendar_auto_register.shared.schemas.calendar import DateModel, DateTimeModel
 from calendar_auto_register.shared.schemas.calendar_events import (
@@ -19,15 +49,29 @@ from calendar_auto_register.shared.schemas.calendar_events import (
 )
 
 _DUPLICATE_WINDOW_MINUTES = 15
+# 重複チェックで参照するフィールドだけを受け取る（attendees や conferenceData などは不要）
+_LIST_FIELDS = "items(id,summary,start,end),nextPageToken"
+_INSERT_FIELDS = "id"
 _SUMMARY_PREFIX = "⚙️ "
 
 
+@timed("calendar.register")
 def create_calendar_events(
     events: Iterable[CalendarEventModel],
     *,
     settings: Settings,
+    deadline: float | None = None,
 ) -> list[CalendarEventResult]:
-    """Google Calendar へイベントを登録し、1件ごとの結果を返す。"""
+    """
+    Google Calendar へイベントを登録し、1件ごとの結果を返す。
+
+    同一 fingerprint のイベントは API を呼ばずに DUPLICATED（先頭の結果の ID）として返す。
+    `CALENDAR_MAX_WORKERS` が2以上の場合は独立したイベントを並行に処理する。結果は入力順で返す。
+    `deadline`（time.monotonic 基準）を過ぎる再試行は行わない。未指定なら
+    `CALENDAR_DEADLINE_SEC` 後を期限とする。
+    `CALENDAR_UPSERT_ENABLED` の場合、description の予約番号などが登録済みのイベントと一致し
+    日時や件名だけが変わっていれば、新規登録せずに既存イベントを更新（UPDATED）する。
+    """
 
     events_list = list(events)
     if not events_list:
@@ -50,79 +94,596 @@ def create_calendar_events(
             for event in events_list
         ]
 
-    results: list[CalendarEventResult] = []
-    for event in events_list:
+    if deadline is None:
+        deadline = time.monotonic() + settings.calendar_deadline_sec
+    limiter = google_client.get_rate_limiter(
+        settings.calendar_id,
+        rate_per_sec=settings.google_rate_limit_per_sec,
+    )
+    mirror = _refreshed_mirror(service, settings=settings, limiter=limiter)
+    day_cache = (
+        daycache_calendar_events.cache_from_settings(settings) if mirror is None else None
+    )
+    booking_index = bookingkey_calendar_events.index_from_settings(settings)
+    day_cache_before = day_cache.stats() if day_cache is not None else None
+    try:
+        results = _process_events(
+            service,
+            events_list,
+            settings=settings,
+            limiter=limiter,
+            mirror=mirror,
+            day_cache=day_cache,
+            booking_index=booking_index,
+            deadline=deadline,
+        )
+        # 途中で失敗した場合は保存しない（次回の増分同期で取り込み直す）
+        if mirror is not None:
+            mirror.save()
+        return results
+    finally:
+        if day_cache is not None:
+            stats = day_cache.stats()
+            log_cache_stats(cache="calendar_day_cache", stats=stats)
+            _record_cache_metrics("CalendarDayCache", before=day_cache_before, after=stats)
+
+
+@timed("calendar.register")
+async def create_calendar_events_async(
+    events: Iterable[CalendarEventModel],
+    *,
+    settings: Settings,
+    deadline: float | None = None,
+    client: AsyncCalendarClient | None = None,
+) -> list[CalendarEventResult]:
+    """
+    `create_calendar_events` の非同期版。共有の httpx.AsyncClient 上で I/O を重ねて実行する。
+
+    同時に処理するイベント数は `CALENDAR_MAX_WORKERS` で制限する。ミラーと日単位キャッシュは
+    同期版（スレッド）向けの実装のため使わず、重複チェックは毎回 events.list で行う。
+    予約番号による更新（upsert）も同期版のみが対応する。
+    """
+
+    events_list = list(events)
+    if not events_list:
+        return []
+
+    if client is None:
         try:
-            normalized_event, start_dt, end_dt = _normalize_event(event, settings)
-            duplicate = _find_duplicate_event(
-                service,
+            client = google_async_client.client_from_settings(settings)
+        except ValueError as exc:
+            error = ErrorModel(code="GOOGLE_AUTH_ERROR", message=str(exc), retryable=False)
+            return [
+                CalendarEventResult(
+                    status="FAILED",
+                    event=_event_with_default_tz(event, settings),
+                    error=error,
+                )
+                for event in events_list
+            ]
+
+    if deadline is None:
+        deadline = time.monotonic() + settings.calendar_deadline_sec
+    limiter = google_client.get_rate_limiter(
+        settings.calendar_id,
+        rate_per_sec=settings.google_rate_limit_per_sec,
+    )
+    groups = _group_by_fingerprint(events_list)
+    survivors = [indices[0] for indices in groups]
+    semaphore = asyncio.Semaphore(max(1, settings.calendar_max_workers))
+
+    async def _run(index: int) -> CalendarEventResult:
+        async with semaphore:
+            return await _process_event_async(
+                client,
+                events_list[index],
                 settings=settings,
-                normalized_event=normalized_event,
-                start_dt=start_dt,
-                end_dt=end_dt,
+                limiter=limiter,
+                deadline=deadline,
             )
-            if duplicate:
-                results.append(
-                    CalendarEventResult(
-                        status="DUPLICATED",
-                        event=normalized_event,
-                        google_event_id=duplicate.get("id"),
-                    )
-                )
-                continue
 
-            created = _insert_event(
+    outcomes = await asyncio.gather(*(_run(index) for index in survivors))
+    results = dict(zip(survivors, outcomes, strict=True))
+    return _merge_collapsed(events_list, groups, results, settings)
+
+
+def async_unsupported_features(settings: Settings) -> list[str]:
+    """
+    有効になっているが非同期版（`CALENDAR_ASYNC_CLIENT_ENABLED`）では使われない機能の設定名。
+
+    非同期版はミラー・日単位キャッシュ・予約番号による upsert に対応していないため、
+    組み合わせた場合は起動時に警告する。
+    """
+
+    if not settings.calendar_async_client_enabled:
+        return []
+    enabled = {
+        "CALENDAR_MIRROR_ENABLED": settings.calendar_mirror_enabled,
+        "CALENDAR_DAY_CACHE_TTL_SEC": settings.calendar_day_cache_ttl_sec > 0,
+        "CALENDAR_UPSERT_ENABLED": settings.calendar_upsert_enabled,
+    }
+    return [name for name, is_enabled in enabled.items() if is_enabled]
+
+
+def _process_events(
+    service: Any,
+    events_list: list[CalendarEventModel],
+    *,
+    settings: Settings,
+    limiter: AdaptiveRateLimiter,
+    mirror: CalendarMirror | None,
+    day_cache: DayWindowCache | None,
+    booking_index: BookingKeyIndex | None,
+    deadline: float,
+) -> list[CalendarEventResult]:
+    # 同一 fingerprint のイベントは先頭の1件だけを Google に問い合わせ、残りは結果を流用する
+    groups = _group_by_fingerprint(events_list)
+    survivors = [indices[0] for indices in groups]
+    results: dict[int, CalendarEventResult] = {}
+    claims = bookingkey_calendar_events.BatchClaims() if booking_index is not None else None
+
+    if settings.calendar_max_workers <= 1 or len(survivors) <= 1:
+        for index in survivors:
+            results[index] = _process_event(
                 service,
+                events_list[index],
                 settings=settings,
-                normalized_event=normalized_event,
+                limiter=limiter,
+                mirror=mirror,
+                day_cache=day_cache,
+                booking_index=booking_index,
+                claims=claims,
+                deadline=deadline,
             )
-            results.append(
-                CalendarEventResult(
-                    status="CREATED",
-                    event=normalized_event,
-                    google_event_id=created.get("id"),
-                )
+    else:
+        # googleapiclient（httplib2）はスレッドセーフではないため、ワーカーごとに Service を持つ
+        worker_local = threading.local()
+
+        def _run(index: int) -> CalendarEventResult:
+            worker_service = getattr(worker_local, "service", None)
+            if worker_service is None:
+                worker_service = google_client.service_from_settings(settings)
+                worker_local.service = worker_service
+            return _process_event(
+                worker_service,
+                events_list[index],
+                settings=settings,
+                limiter=limiter,
+                mirror=mirror,
+                day_cache=day_cache,
+                booking_index=booking_index,
+                claims=claims,
+                deadline=deadline,
             )
-        except ValueError as exc:
-            results.append(
-                CalendarEventResult(
-                    status="FAILED",
-                    event=_event_with_default_tz(event, settings),
-                    error=ErrorModel(
-                        code="INVALID_EVENT",
-                        message=str(exc),
-                        retryable=False,
-                    ),
-                )
+
+        max_workers = min(settings.calendar_max_workers, len(survivors))
+        # 段階ごとの計測（contextvars）をワーカースレッドへ引き継ぐ
+        contexts = [contextvars.copy_context() for _ in survivors]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = executor.map(lambda index, ctx: ctx.run(_run, index), survivors, contexts)
+            results.update(zip(survivors, outcomes, strict=True))
+
+    return _merge_collapsed(events_list, groups, results, settings)
+
+
+def _record_cache_metrics(
+    name: str,
+    *,
+    before: dict[str, Any] | None,
+    after: dict[str, Any],
+) -> None:
+    """キャッシュの累計から、この呼び出しでのヒット・ミス数とヒット率をメトリクスに載せる。"""
+
+    hits = after["hits"] - (before["hits"] if before else 0)
+    misses = after["misses"] - (before["misses"] if before else 0)
+    metrics.count(f"{name}Hits", hits)
+    metrics.count(f"{name}Misses", misses)
+    if hits + misses:
+        metrics.record(f"{name}HitRatio", hits / (hits + misses) * 100, "Percent")
+
+
+def _merge_collapsed(
+    events_list: list[CalendarEventModel],
+    groups: list[list[int]],
+    results: dict[int, CalendarEventResult],
+    settings: Settings,
+) -> list[CalendarEventResult]:
+    """survivor の結果を同じグループの残りへ流用し、入力順の結果リストにする。"""
+
+    for indices in groups:
+        survivor = results[indices[0]]
+        for index in indices[1:]:
+            results[index] = _collapsed_result(events_list[index], survivor, settings)
+    return [results[index] for index in range(len(events_list))]
+
+
+def _collapsed_result(
+    event: CalendarEventModel,
+    survivor: CalendarEventResult,
+    settings: Settings,
+) -> CalendarEventResult:
+    """バッチ内で重複したイベントの結果を、先頭（survivor）の結果から組み立てる。"""
+
+    if survivor.status == "FAILED":
+        return survivor.model_copy(update={"event": _event_with_default_tz(event, settings)})
+    try:
+        normalized_event, _, _ = _normalize_event(event, settings)
+    except ValueError:  # pragma: no cover - survivor と同じ fingerprint なら正規化できる
+        normalized_event = survivor.event
+    return CalendarEventResult(
+        status="DUPLICATED",
+        event=normalized_event,
+        google_event_id=survivor.google_event_id,
+    )
+
+
+def _process_event(
+    service: Any,
+    event: CalendarEventModel,
+    *,
+    settings: Settings,
+    limiter: AdaptiveRateLimiter,
+    mirror: CalendarMirror | None,
+    day_cache: DayWindowCache | None,
+    booking_index: BookingKeyIndex | None,
+    claims: BatchClaims | None,
+    deadline: float,
+) -> CalendarEventResult:
+    """
+    1件のイベントについて重複チェックと登録を行い、結果を返す。
+
+    再試行可能な Google API エラーは指数バックオフ（ジッタ付き・Retry-After 優先）で
+    `deadline`（time.monotonic 基準）まで再試行する。再試行は重複チェックからやり直すため、
+    失敗応答の裏で作成済みだったイベントは DUPLICATED として扱われる。
+    """
+
+    try:
+        normalized_event, start_dt, end_dt = _normalize_event(event, settings)
+    except ValueError as exc:
+        return _failed_result(event, settings, code="INVALID_EVENT", message=str(exc))
+
+    retry_count = 0
+    while True:
+        try:
+            return _register_event(
+                service,
+                settings=settings,
+                limiter=limiter,
+                mirror=mirror,
+                day_cache=day_cache,
+                booking_index=booking_index,
+                claims=claims,
+                normalized_event=normalized_event,
+                start_dt=start_dt,
+                end_dt=end_dt,
+                retry_count=retry_count,
             )
         except HttpError as exc:
-            status = exc.resp.status if exc.resp else 500
-            retryable = status >= 500 or status in {429, 408}
-            results.append(
-                CalendarEventResult(
-                    status="FAILED",
-                    event=_event_with_default_tz(event, settings),
-                    error=ErrorModel(
-                        code="GOOGLE_API_ERROR",
-                        message=_format_http_error(exc),
-                        retryable=retryable,
-                    ),
-                )
-            )
+            delay = _next_retry_delay(exc, retry_count, settings=settings, deadline=deadline)
+            if delay is not None:
+                time.sleep(delay)
+                retry_count += 1
+                continue
+            return _http_error_result(event, settings, exc, retry_count=retry_count)
         except Exception as exc:  # pragma: no cover - defensive
-            results.append(
-                CalendarEventResult(
-                    status="FAILED",
-                    event=_event_with_default_tz(event, settings),
-                    error=ErrorModel(
-                        code="UNEXPECTED_ERROR",
-                        message=str(exc),
-                        retryable=False,
-                    ),
-                )
+            return _failed_result(
+                event,
+                settings,
+                code="UNEXPECTED_ERROR",
+                message=str(exc),
+                retry_count=retry_count,
             )
 
-    return results
+
+def _register_event(
+    service: Any,
+    *,
+    settings: Settings,
+    limiter: AdaptiveRateLimiter,
+    mirror: CalendarMirror | None,
+    day_cache: DayWindowCache | None,
+    booking_index: BookingKeyIndex | None,
+    claims: BatchClaims | None,
+    normalized_event: CalendarEventModel,
+    start_dt: datetime | date,
+    end_dt: datetime | date,
+    retry_count: int,
+) -> CalendarEventResult:
+    metadata = CalendarEventResultMetadata(retry_count=retry_count)
+    booking_key = (
+        bookingkey_calendar_events.extract_booking_key(normalized_event)
+        if booking_index is not None
+        else None
+    )
+    if booking_index is not None and claims is not None and booking_key is not None:
+        upserted = _upsert_booked_event(
+            service,
+            settings=settings,
+            limiter=limiter,
+            mirror=mirror,
+            day_cache=day_cache,
+            booking_index=booking_index,
+            claims=claims,
+            booking_key=booking_key,
+            normalized_event=normalized_event,
+            start_dt=start_dt,
+            end_dt=end_dt,
+        )
+        if upserted is not None:
+            status, event_id = upserted
+            return CalendarEventResult(
+                status=status,
+                event=normalized_event,
+                google_event_id=event_id,
+                metadata=metadata,
+            )
+
+    duplicate = _find_duplicate_event(
+        service,
+        settings=settings,
+        limiter=limiter,
+        mirror=mirror,
+        day_cache=day_cache,
+        normalized_event=normalized_event,
+        start_dt=start_dt,
+        end_dt=end_dt,
+    )
+    if duplicate:
+        if claims is not None:
+            claims.claim(duplicate.get("id"), normalized_event)
+        return CalendarEventResult(
+            status="DUPLICATED",
+            event=normalized_event,
+            google_event_id=duplicate.get("id"),
+            metadata=metadata,
+        )
+
+    created = _insert_event(
+        service,
+        settings=settings,
+        limiter=limiter,
+        normalized_event=normalized_event,
+        booking_key=booking_key,
+    )
+    if mirror is not None:
+        mirror.apply(created)
+    if day_cache is not None:
+        day_cache.add(created)
+    if claims is not None:
+        claims.claim(created.get("id"), normalized_event)
+    if booking_index is not None and booking_key is not None:
+        booking_index.put(_booking_identity(booking_key, created), created)
+    return CalendarEventResult(
+        status="CREATED",
+        event=normalized_event,
+        google_event_id=created.get("id"),
+        metadata=metadata,
+    )
+
+
+def _upsert_booked_event(
+    service: Any,
+    *,
+    settings: Settings,
+    limiter: AdaptiveRateLimiter,
+    mirror: CalendarMirror | None,
+    day_cache: DayWindowCache | None,
+    booking_index: BookingKeyIndex,
+    claims: BatchClaims,
+    booking_key: str,
+    normalized_event: CalendarEventModel,
+    start_dt: datetime | date,
+    end_dt: datetime | date,
+) -> tuple[Literal["UPDATED", "DUPLICATED"], str | None] | None:
+    """
+    予約キーと種類・summary が一致する登録済みイベントがあれば、変更点に応じて更新または
+    重複として扱う。
+
+    登録済みイベントが見つからない（削除済みを含む）場合や、同じバッチの別のイベントが
+    作成・一致・更新したイベントだった場合は None を返し、通常の登録に戻す。
+    """
+
+    identity = _booking_identity(booking_key, _build_google_event_body(normalized_event))
+    existing = booking_index.get(identity)
+    if existing is None:
+        existing = _find_booked_event(
+            service,
+            settings=settings,
+            limiter=limiter,
+            booking_index=booking_index,
+            booking_key=booking_key,
+            identity=identity,
+        )
+        if existing is None:
+            return None
+    if not claims.claim(existing.get("id"), normalized_event):
+        return None
+
+    if _is_duplicate(existing, normalized_event, start_dt, end_dt):
+        return "DUPLICATED", existing.get("id")
+
+    body = _build_google_event_body(normalized_event, booking_key=booking_key)
+    try:
+        patched = _execute(
+            service.events().patch(
+                calendarId=settings.calendar_id,
+                eventId=existing["id"],
+                body=body,
+                fields=_INSERT_FIELDS,
+            ),
+            limiter,
+        )
+    except HttpError as exc:
+        if exc.resp is not None and exc.resp.status in {404, 410}:
+            # 手動で削除されたイベントは更新せず、新規登録し直す
+            booking_index.discard(identity)
+            return None
+        raise
+
+    updated = {**existing, **body, **patched}
+    booking_index.put(identity, updated)
+    if mirror is not None:
+        mirror.apply(updated)
+    if day_cache is not None:
+        day_cache.discard(updated["id"])
+        day_cache.add(updated)
+    return "UPDATED", updated.get("id")
+
+
+def _find_booked_event(
+    service: Any,
+    *,
+    settings: Settings,
+    limiter: AdaptiveRateLimiter,
+    booking_index: BookingKeyIndex,
+    booking_key: str,
+    identity: str,
+) -> dict[str, Any] | None:
+    """
+    インデックスにない予約キーを、extendedProperties の完全一致で1回だけ問い合わせる。
+
+    同じ予約キーのイベントはすべてインデックスに載せ、識別子が一致するものを返す。
+    """
+
+    response = _execute(
+        service.events().list(
+            calendarId=settings.calendar_id,
+            privateExtendedProperty=f"{BOOKING_KEY_PROPERTY}={booking_key}",
+            singleEvents=True,
+            fields=_LIST_FIELDS,
+        ),
+        limiter,
+    )
+    found: dict[str, Any] | None = None
+    for item in response.get("items", []):
+        item_identity = _booking_identity(booking_key, item)
+        if booking_index.get(item_identity) is None:
+            booking_index.put(item_identity, item)
+        if found is None and item_identity == identity:
+            found = item
+    return found
+
+
+def _booking_identity(booking_key: str, item: dict[str, Any]) -> str:
+    summary = _strip_summary_prefix(str(item.get("summary") or ""))
+    return bookingkey_calendar_events.booking_identity(booking_key, {**item, "summary": summary})
+
+
+def _failed_result(
+    event: CalendarEventModel,
+    settings: Settings,
+    *,
+    code: str,
+    message: str,
+    retryable: bool = False,
+    retry_count: int = 0,
+) -> CalendarEventResult:
+    return CalendarEventResult(
+        status="FAILED",
+        event=_event_with_default_tz(event, settings),
+        error=ErrorModel(code=code, message=message, retryable=retryable),
+        metadata=CalendarEventResultMetadata(retry_count=retry_count),
+    )
+
+
+def _next_retry_delay(
+    exc: HttpError,
+    retry_count: int,
+    *,
+    settings: Settings,
+    deadline: float,
+) -> float | None:
+    """再試行する場合は待機秒数を、回数または期限の上限に達した場合は None を返す。"""
+
+    if not _is_retryable(exc) or retry_count + 1 >= settings.google_retry_max_attempts:
+        return None
+    delay = _retry_delay(exc, retry_count, settings)
+    if time.monotonic() + delay >= deadline:
+        return None
+    return delay
+
+
+def _is_retryable(exc: HttpError) -> bool:
+    status = exc.resp.status if exc.resp else 500
+    return status >= 500 or status in {429, 408}
+
+
+def _http_error_result(
+    event: CalendarEventModel,
+    settings: Settings,
+    exc: HttpError,
+    *,
+    retry_count: int,
+) -> CalendarEventResult:
+    return _failed_result(
+        event,
+        settings,
+        code="GOOGLE_API_ERROR",
+        message=_format_http_error(exc),
+        retryable=_is_retryable(exc),
+        retry_count=retry_count,
+    )
+
+
+def _retry_delay(exc: HttpError, retry_count: int, settings: Settings) -> float:
+    """Retry-After があればそれに従い、なければ full jitter の指数バックオフ秒数を返す。"""
+
+    retry_after = _retry_after_sec(exc)
+    if retry_after is not None:
+        return retry_after
+    ceiling = min(
+        settings.google_retry_max_delay_sec,
+        settings.google_retry_base_delay_sec * (2**retry_count),
+    )
+    return random.uniform(0.0, ceiling)
+
+
+def _retry_after_sec(exc: HttpError) -> float | None:
+    raw = exc.resp.get("retry-after") if exc.resp is not None else None
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(raw)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _group_by_fingerprint(events: list[CalendarEventModel]) -> list[list[int]]:
+    """同一 fingerprint のイベントのインデックスを、最初の出現順にまとめる。"""
+
+    groups: dict[tuple[str, ...], list[int]] = {}
+    for index, event in enumerate(events):
+        groups.setdefault(_event_fingerprint(event), []).append(index)
+    return list(groups.values())
+
+
+def _event_fingerprint(event: CalendarEventModel) -> tuple[str, ...]:
+    """prefix を除いた summary・UTC に正規化した開始/終了・終日フラグからなる同一性キー。"""
+
+    all_day = isinstance(event.start, DateModel) and isinstance(event.end, DateModel)
+    return (
+        _strip_summary_prefix(event.summary),
+        _fingerprint_time(event.start),
+        _fingerprint_time(event.end),
+        "all_day" if all_day else "timed",
+    )
+
+
+def _fingerprint_time(value: DateModel | DateTimeModel) -> str:
+    if isinstance(value, DateModel):
+        return value.date
+    try:
+        parsed = _parse_datetime(value.dateTime)
+    except ValueError:
+        return value.dateTime
+    if parsed.tzinfo is None:
+        return value.dateTime
+    return parsed.astimezone(timezone.utc).isoformat()
 
 
 def _normalize_event(
@@ -199,40 +760,156 @@ def _find_duplicate_event(
     service: Any,
     *,
     settings: Settings,
+    limiter: AdaptiveRateLimiter,
+    mirror: CalendarMirror | None,
+    day_cache: DayWindowCache | None,
     normalized_event: CalendarEventModel,
     start_dt: datetime | date,
     end_dt: datetime | date,
 ) -> dict[str, Any] | None:
+    time_min, time_max = _duplicate_window(start_dt, end_dt)
+    if mirror is not None:
+        items = mirror.find_overlapping(time_min, time_max)
+    elif day_cache is not None:
+        items = day_cache.find_overlapping(
+            time_min,
+            time_max,
+            lambda range_min, range_max: _list_all_events(
+                service,
+                settings=settings,
+                limiter=limiter,
+                time_min=range_min,
+                time_max=range_max,
+            ),
+        )
+    else:
+        response = _execute(
+            service.events().list(
+                calendarId=settings.calendar_id,
+                timeMin=time_min.isoformat(),
+                timeMax=time_max.isoformat(),
+                singleEvents=True,
+                orderBy="startTime",
+                fields=_LIST_FIELDS,
+            ),
+            limiter,
+        )
+        items = response.get("items", [])
+    return _match_duplicate(
+        items,
+        settings=settings,
+        normalized_event=normalized_event,
+        start_dt=start_dt,
+        end_dt=end_dt,
+    )
+
+
+def _duplicate_window(
+    start_dt: datetime | date,
+    end_dt: datetime | date,
+) -> tuple[datetime, datetime]:
+    """重複チェックで既存イベントを探す期間 [time_min, time_max) を返す。"""
+
     # 終日イベント（date型）の場合
     if isinstance(start_dt, date) and not isinstance(start_dt, datetime):
         tz_info = timezone.utc
-        time_min = datetime.combine(start_dt, datetime.min.time(), tzinfo=tz_info).isoformat()
-        time_max = datetime.combine(end_dt, datetime.min.time(), tzinfo=tz_info).isoformat()
+        time_min = datetime.combine(start_dt, datetime.min.time(), tzinfo=tz_info)
+        time_max = datetime.combine(end_dt, datetime.min.time(), tzinfo=tz_info)  # type: ignore
     else:
         # 時刻指定イベント（datetime型）の場合
         delta = timedelta(minutes=_DUPLICATE_WINDOW_MINUTES)
-        time_min = (start_dt - delta).isoformat()  # type: ignore
-        time_max = (end_dt + delta).isoformat()  # type: ignore
+        time_min = start_dt - delta  # type: ignore
+        time_max = end_dt + delta  # type: ignore
+    return time_min, time_max
 
-    response = (
-        service.events()
-        .list(
-            calendarId=settings.calendar_id,
-            timeMin=time_min,
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy="startTime",
-        )
-        .execute()
-    )
-    items = response.get("items", [])
+
+def _match_duplicate(
+    items: list[dict[str, Any]],
+    *,
+    settings: Settings,
+    normalized_event: CalendarEventModel,
+    start_dt: datetime | date,
+    end_dt: datetime | date,
+) -> dict[str, Any] | None:
+    """完全一致する候補を優先し、類似度判定が有効なら最も近い候補を返す。"""
 
     for candidate in items:
         if _is_duplicate(candidate, normalized_event, start_dt, end_dt):
             return candidate
+    if settings.calendar_duplicate_similarity < 1.0:
+        return _find_similar_event(
+            items,
+            normalized_event=normalized_event,
+            start_dt=start_dt,
+            min_similarity=settings.calendar_duplicate_similarity,
+        )
     return None
 
 
+def _list_all_events(
+    service: Any,
+    *,
+    settings: Settings,
+    limiter: AdaptiveRateLimiter,
+    time_min: datetime,
+    time_max: datetime,
+) -> list[dict[str, Any]]:
+    """日単位キャッシュの補充用に、範囲内のイベントを全ページ取得する。"""
+
+    items: list[dict[str, Any]] = []
+    page_token: str | None = None
+    while True:
+        response = _execute(
+            service.events().list(
+                calendarId=settings.calendar_id,
+                timeMin=time_min.isoformat(),
+                timeMax=time_max.isoformat(),
+                singleEvents=True,
+                pageToken=page_token,
+                fields=_LIST_FIELDS,
+            ),
+            limiter,
+        )
+        items.extend(response.get("items", []))
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return items
+
+
+def _find_similar_event(
+    items: list[dict[str, Any]],
+    *,
+    normalized_event: CalendarEventModel,
+    start_dt: datetime | date,
+    min_similarity: float,
+) -> dict[str, Any] | None:
+    """
+    件名の表記揺れや時刻のずれを許容して、最も近い既存イベントを返す。
+
+    `items` はどの経路でも重複チェックの期間に絞り込み済み（ミラーは区間インデックス、
+    日単位キャッシュは日ごとのバケット、それ以外は timeMin/timeMax 付きの events.list）の
+    ため、ここで区間インデックスを組み直さず、そのまま順位付けする。
+    """
+
+    all_day = not isinstance(start_dt, datetime)
+    if all_day:
+        start_at = datetime.combine(start_dt, datetime.min.time(), tzinfo=timezone.utc)
+    else:
+        start_at = start_dt  # type: ignore[assignment]
+    ranked = index_calendar_events.rank_candidates(
+        (
+            event
+            for event in map(index_calendar_events.to_indexed_event, items)
+            if event is not None
+        ),
+        summary=normalized_event.summary,
+        start_ts=start_at.timestamp(),
+        all_day=all_day,
+        min_similarity=min_similarity,
+    )
+    return ranked[0].event.item if ranked else None
+
+
 def _is_duplicate(
     candidate: dict[str, Any],
     normalized_event: CalendarEventModel,
@@ -297,20 +974,181 @@ def _insert_event(
     service: Any,
     *,
     settings: Settings,
+    limiter: AdaptiveRateLimiter,
     normalized_event: CalendarEventModel,
+    booking_key: str | None = None,
 ) -> dict[str, Any]:
-    body = _build_google_event_body(normalized_event)
-    return (
-        service.events()
-        .insert(
+    """イベントを登録し、登録内容に払い出された ID を付けた dict を返す（レスポンスは ID のみ）。"""
+
+    body = _build_google_event_body(normalized_event, booking_key=booking_key)
+    created = _execute(
+        service.events().insert(
             calendarId=settings.calendar_id,
             body=body,
+            fields=_INSERT_FIELDS,
+        ),
+        limiter,
+    )
+    return {**body, **created}
+
+
+def _refreshed_mirror(
+    service: Any,
+    *,
+    settings: Settings,
+    limiter: AdaptiveRateLimiter,
+) -> CalendarMirror | None:
+    """ミラーが有効なら同期して返す。同期に失敗した場合は None（API での重複チェック）に戻す。"""
+
+    mirror = mirror_calendar_events.mirror_from_settings(settings)
+    if mirror is None:
+        return None
+
+    def _list_page(**params: Any) -> dict[str, Any]:
+        return _execute(service.events().list(calendarId=settings.calendar_id, **params), limiter)
+
+    try:
+        mirror.refresh(_list_page)
+    except Exception as exc:
+        log_warning(event="calendar_mirror_refresh_failed", error=exc)
+        return None
+    return mirror
+
+
+def _execute(request: Any, limiter: AdaptiveRateLimiter) -> dict[str, Any]:
+    """レートリミッタでペースを守りつつ Google API リクエストを実行する。"""
+
+    limiter.acquire()
+    try:
+        response: dict[str, Any] = request.execute()
+    except HttpError as exc:
+        if exc.resp is not None and exc.resp.status == 429:
+            limiter.on_throttle()
+        raise
+    limiter.on_success()
+    return response
+
+
+async def _process_event_async(
+    client: AsyncCalendarClient,
+    event: CalendarEventModel,
+    *,
+    settings: Settings,
+    limiter: AdaptiveRateLimiter,
+    deadline: float,
+) -> CalendarEventResult:
+    """`_process_event` の非同期版（再試行の待機も asyncio.sleep で行う）。"""
+
+    try:
+        normalized_event, start_dt, end_dt = _normalize_event(event, settings)
+    except ValueError as exc:
+        return _failed_result(event, settings, code="INVALID_EVENT", message=str(exc))
+
+    retry_count = 0
+    while True:
+        try:
+            return await _register_event_async(
+                client,
+                settings=settings,
+                limiter=limiter,
+                normalized_event=normalized_event,
+                start_dt=start_dt,
+                end_dt=end_dt,
+                retry_count=retry_count,
+            )
+        except HttpError as exc:
+            delay = _next_retry_delay(exc, retry_count, settings=settings, deadline=deadline)
+            if delay is not None:
+                await asyncio.sleep(delay)
+                retry_count += 1
+                continue
+            return _http_error_result(event, settings, exc, retry_count=retry_count)
+        except Exception as exc:  # pragma: no cover - defensive
+            return _failed_result(
+                event,
+                settings,
+                code="UNEXPECTED_ERROR",
+                message=str(exc),
+                retry_count=retry_count,
+            )
+
+
+async def _register_event_async(
+    client: AsyncCalendarClient,
+    *,
+    settings: Settings,
+    limiter: AdaptiveRateLimiter,
+    normalized_event: CalendarEventModel,
+    start_dt: datetime | date,
+    end_dt: datetime | date,
+    retry_count: int,
+) -> CalendarEventResult:
+    metadata = CalendarEventResultMetadata(retry_count=retry_count)
+    time_min, time_max = _duplicate_window(start_dt, end_dt)
+    response = await _execute_async(
+        lambda: client.list_events(
+            settings.calendar_id,
+            timeMin=time_min.isoformat(),
+            timeMax=time_max.isoformat(),
+            singleEvents=True,
+            orderBy="startTime",
+            fields=_LIST_FIELDS,
+        ),
+        limiter,
+    )
+    duplicate = _match_duplicate(
+        response.get("items", []),
+        settings=settings,
+        normalized_event=normalized_event,
+        start_dt=start_dt,
+        end_dt=end_dt,
+    )
+    if duplicate:
+        return CalendarEventResult(
+            status="DUPLICATED",
+            event=normalized_event,
+            google_event_id=duplicate.get("id"),
+            metadata=metadata,
         )
-        .execute()
+
+    created = await _execute_async(
+        lambda: client.insert_event(
+            settings.calendar_id,
+            _build_google_event_body(normalized_event),
+            fields=_INSERT_FIELDS,
+        ),
+        limiter,
+    )
+    return CalendarEventResult(
+        status="CREATED",
+        event=normalized_event,
+        google_event_id=created.get("id"),
+        metadata=metadata,
     )
 
 
-def _build_google_event_body(event: CalendarEventModel) -> dict[str, Any]:
+async def _execute_async(
+    request: Callable[[], Awaitable[dict[str, Any]]],
+    limiter: AdaptiveRateLimiter,
+) -> dict[str, Any]:
+    """`_execute` の非同期版。レートリミッタの待ち時間はイベントループを止めずに待つ。"""
+
+    await asyncio.sleep(limiter.reserve())
+    try:
+        response = await request()
+    except HttpError as exc:
+        if exc.resp is not None and exc.resp.status == 429:
+            limiter.on_throttle()
+        raise
+    limiter.on_success()
+    return response
+
+
+def _build_google_event_body(
+    event: CalendarEventModel,
+    *,
+    booking_key: str | None = None,
+) -> dict[str, Any]:
     body: dict[str, Any] = {"summary": event.summary}
 
     # start/end フィールドの構築（型に応じて異なる構造）
@@ -330,6 +1168,8 @@ def _build_google_event_body(event: CalendarEventModel) -> dict[str, Any]:
         body["description"] = event.description
     if event.eventType:
         body["eventType"] = event.eventType
+    if booking_key:
+        body["extendedProperties"] = {"private": {BOOKING_KEY_PROPERTY: booking_key}}
     return body
 
 
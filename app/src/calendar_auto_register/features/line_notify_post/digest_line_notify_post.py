@@ -0,0 +1,215 @@
+"""複数の登録結果をまとめて通知するためのダイジェスト用バッファ。"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Protocol
+
+from calendar_auto_register.core.settings import Settings
+from calendar_auto_register.shared.schemas.calendar_events import CalendarEventResult
+
+
+class DigestQueue(Protocol):
+    """通知待ちの結果を保持するキュー（プロセス内、またはファイルなどの永続キュー）。"""
+
+    def append(self, results: list[CalendarEventResult], *, enqueued_at: float) -> None: ...
+
+    def drain_if(
+        self, *, max_results: int, max_wait_sec: float, now: float
+    ) -> list[CalendarEventResult]:
+        """
+        件数か経過時間のしきい値に達していれば、すべて取り出して返す（未達なら空）。
+
+        判定と取り出しは1回の排他の中で行い、間に別のプロセスが取り出さないようにする。
+        """
+        ...
+
+    def drain(self) -> list[CalendarEventResult]: ...
+
+
+class InMemoryDigestQueue:
+    """プロセス内のリストで保持するキュー（ウォームなコンテナの間だけ保持される）。"""
+
+    def __init__(self) -> None:
+        self._items: list[CalendarEventResult] = []
+        self._oldest_at: float | None = None
+
+    def append(self, results: list[CalendarEventResult], *, enqueued_at: float) -> None:
+        if self._oldest_at is None:
+            self._oldest_at = enqueued_at
+        self._items.extend(results)
+
+    def drain_if(
+        self, *, max_results: int, max_wait_sec: float, now: float
+    ) -> list[CalendarEventResult]:
+        if not _is_due(
+            len(self._items),
+            self._oldest_at,
+            max_results=max_results,
+            max_wait_sec=max_wait_sec,
+            now=now,
+        ):
+            return []
+        return self.drain()
+
+    def drain(self) -> list[CalendarEventResult]:
+        items, self._items, self._oldest_at = self._items, [], None
+        return items
+
+
+class FileDigestQueue:
+    """
+    JSON Lines ファイルに追記するキュー（EFS などの共有ボリューム上に置ける）。
+
+    1行が1件の結果で、投入時刻を添えて保存する。読み書きは flock で排他する。
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._path.touch(exist_ok=True)
+
+    def append(self, results: list[CalendarEventResult], *, enqueued_at: float) -> None:
+        lines = "".join(
+            json.dumps({"enqueued_at": enqueued_at, "result": result.model_dump(mode="json")})
+            + "\n"
+            for result in results
+        )
+        with open(self._path, "a", encoding="utf-8") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                handle.write(lines)
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def drain_if(
+        self, *, max_results: int, max_wait_sec: float, now: float
+    ) -> list[CalendarEventResult]:
+        def is_due(lines: list[str]) -> bool:
+            oldest_at = float(json.loads(lines[0])["enqueued_at"]) if lines else None
+            return _is_due(
+                len(lines),
+                oldest_at,
+                max_results=max_results,
+                max_wait_sec=max_wait_sec,
+                now=now,
+            )
+
+        return self._drain(is_due)
+
+    def drain(self) -> list[CalendarEventResult]:
+        return self._drain(lambda lines: True)
+
+    def _drain(self, should_drain: Callable[[list[str]], bool]) -> list[CalendarEventResult]:
+        with open(self._path, "r+", encoding="utf-8") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                lines = [line for line in handle if line.strip()]
+                if not should_drain(lines):
+                    return []
+                handle.seek(0)
+                handle.truncate()
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        return [CalendarEventResult.model_validate(json.loads(line)["result"]) for line in lines]
+
+
+def _is_due(
+    count: int,
+    oldest_at: float | None,
+    *,
+    max_results: int,
+    max_wait_sec: float,
+    now: float,
+) -> bool:
+    if count == 0:
+        return False
+    return count >= max_results or (oldest_at is not None and now - oldest_at >= max_wait_sec)
+
+
+class DigestBuffer:
+    """
+    結果をキューに溜め、件数または経過時間のしきい値に達したらまとめて取り出す。
+
+    Lambda ではタイマーを持てないため、経過時間の判定は次の投入時（または `flush`）に行う。
+    """
+
+    def __init__(
+        self,
+        queue: DigestQueue,
+        *,
+        max_results: int,
+        max_wait_sec: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._queue = queue
+        self._max_results = max_results
+        self._max_wait_sec = max_wait_sec
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def add(self, results: list[CalendarEventResult]) -> list[CalendarEventResult] | None:
+        """結果を投入し、しきい値に達していれば溜まった結果をすべて返す（未達なら None）。"""
+
+        now = self._clock()
+        with self._lock:
+            if results:
+                self._queue.append(results, enqueued_at=now)
+            drained = self._queue.drain_if(
+                max_results=self._max_results, max_wait_sec=self._max_wait_sec, now=now
+            )
+        # 別のプロセスが先に取り出していれば空になる（0件のダイジェストは送らない）
+        return drained or None
+
+    def requeue(self, results: list[CalendarEventResult]) -> None:
+        """送信に失敗した結果をキューへ戻す（次の投入または `flush` で再送される）。"""
+
+        if not results:
+            return
+        with self._lock:
+            self._queue.append(results, enqueued_at=self._clock())
+
+    def flush(self) -> list[CalendarEventResult]:
+        """しきい値に関わらず、溜まっている結果をすべて取り出す。"""
+
+        with self._lock:
+            return self._queue.drain()
+
+
+_BUFFERS_LOCK = threading.Lock()
+_BUFFERS: dict[str, DigestBuffer] = {}
+
+
+def digest_from_settings(settings: Settings) -> DigestBuffer | None:
+    """設定に応じた共有のダイジェスト用バッファを返す（無効なら None）。"""
+
+    if not settings.line_digest_enabled:
+        return None
+    key = settings.line_digest_path or ""
+    with _BUFFERS_LOCK:
+        buffer = _BUFFERS.get(key)
+        if buffer is None:
+            queue: DigestQueue = (
+                FileDigestQueue(settings.line_digest_path)
+                if settings.line_digest_path
+                else InMemoryDigestQueue()
+            )
+            buffer = DigestBuffer(
+                queue,
+                max_results=settings.line_digest_max_results,
+                max_wait_sec=settings.line_digest_max_wait_sec,
+            )
+            _BUFFERS[key] = buffer
+        return buffer
+
+
+def reset_digests() -> None:
+    """共有バッファを破棄する（テスト用）。"""
+
+    with _BUFFERS_LOCK:
+        _BUFFERS.clear()
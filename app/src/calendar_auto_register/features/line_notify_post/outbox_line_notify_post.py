@@ -0,0 +1,168 @@
+"""LINE 通知の outbox（通知を先に永続化し、送信は後から再試行付きで行う）。"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Protocol
+
+from calendar_auto_register.core.settings import Settings
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS outbox (
+        id TEXT PRIMARY KEY,
+        messages TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL,
+        created_at REAL NOT NULL,
+        dead INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS outbox_due ON outbox (dead, next_attempt_at)",
+)
+
+
+@dataclass(slots=True, frozen=True)
+class OutboxEntry:
+    """送信待ちの通知1件（1回の通知で送るテキストメッセージの一覧）。"""
+
+    id: str
+    messages: list[str]
+    attempts: int
+
+
+class NotificationOutbox(Protocol):
+    """
+    outbox のバックエンド。
+
+    `claim_due` は取り出した通知の次回試行時刻を `lease_sec` 先へずらすため、複数の送信処理が
+    同じ通知を同時に送ることはない。送信結果に応じて `complete` / `retry` / `fail` を呼ぶ。
+    """
+
+    def enqueue(self, messages: list[str]) -> str: ...
+
+    def claim_due(self, *, limit: int, lease_sec: float) -> list[OutboxEntry]: ...
+
+    def complete(self, entry_id: str) -> None: ...
+
+    def retry(self, entry_id: str, *, delay_sec: float, error: str) -> None: ...
+
+    def fail(self, entry_id: str, *, error: str) -> None: ...
+
+    def pending_count(self) -> int: ...
+
+
+class SqliteNotificationOutbox:
+    """
+    SQLite による outbox（Lambda の `/tmp`、または EFS 上のファイル）。
+
+    再試行回数を使い切った通知は削除せず dead として残し、調査できるようにする。
+    """
+
+    def __init__(self, path: str | Path, *, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    def enqueue(self, messages: list[str]) -> str:
+        entry_id = uuid.uuid4().hex
+        now = self._clock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO outbox (id, messages, next_attempt_at, created_at)"
+                " VALUES (?, ?, ?, ?)",
+                (entry_id, json.dumps(messages, ensure_ascii=False), now, now),
+            )
+        return entry_id
+
+    def claim_due(self, *, limit: int, lease_sec: float) -> list[OutboxEntry]:
+        now = self._clock()
+        with self._lock, self._conn:
+            # BEGIN IMMEDIATE で書き込みロックを取り、他プロセスと同じ通知を取り合わない
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = self._conn.execute(
+                "SELECT id, messages, attempts FROM outbox"
+                " WHERE dead = 0 AND next_attempt_at <= ?"
+                " ORDER BY next_attempt_at LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE outbox SET next_attempt_at = ? WHERE id = ?",
+                [(now + lease_sec, row[0]) for row in rows],
+            )
+        return [
+            OutboxEntry(id=row[0], messages=json.loads(row[1]), attempts=row[2]) for row in rows
+        ]
+
+    def complete(self, entry_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+
+    def retry(self, entry_id: str, *, delay_sec: float, error: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?, last_error = ?"
+                " WHERE id = ?",
+                (self._clock() + delay_sec, error, entry_id),
+            )
+
+    def fail(self, entry_id: str, *, error: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET attempts = attempts + 1, dead = 1, last_error = ? WHERE id = ?",
+                (error, entry_id),
+            )
+
+    def pending_count(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM outbox WHERE dead = 0").fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_OUTBOXES_LOCK = threading.Lock()
+_OUTBOXES: dict[str, NotificationOutbox] = {}
+
+
+def outbox_from_settings(settings: Settings) -> NotificationOutbox | None:
+    """設定に応じた共有の outbox を返す（`LINE_OUTBOX_PATH` が未設定なら None）。"""
+
+    if not settings.line_outbox_path:
+        return None
+    with _OUTBOXES_LOCK:
+        outbox = _OUTBOXES.get(settings.line_outbox_path)
+        if outbox is None:
+            outbox = SqliteNotificationOutbox(settings.line_outbox_path)
+            _OUTBOXES[settings.line_outbox_path] = outbox
+        return outbox
+
+
+def register_outbox(path: str, outbox: NotificationOutbox) -> None:
+    """`LINE_OUTBOX_PATH` に対応する outbox を差し替える（リモートのバックエンドやテスト用）。"""
+
+    with _OUTBOXES_LOCK:
+        _OUTBOXES[path] = outbox
+
+
+def reset_outboxes() -> None:
+    """共有の outbox を破棄する（テスト用）。"""
+
+    with _OUTBOXES_LOCK:
+        _OUTBOXES.clear()
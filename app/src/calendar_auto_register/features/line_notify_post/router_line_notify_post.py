@@ -5,13 +5,18 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Request
 
 from calendar_auto_register.clients.line_client import LineApiError
+from calendar_auto_register.core import ledger
 from calendar_auto_register.core.settings import Settings
 from calendar_auto_register.features.line_notify_post.schemas_line_notify_post import (
+    LineDigestFlushResponse,
     LineNotifyErrorResponse,
     LineNotifyRequest,
     LineNotifyResponse,
+    LineOutboxDrainResponse,
 )
 from calendar_auto_register.features.line_notify_post.usecase_line_notify_post import (
+    drain_line_outbox,
+    flush_line_digest,
     send_line_notification,
 )
 from calendar_auto_register.shared.schemas.calendar_events import ErrorModel
@@ -32,13 +37,59 @@ async def line_notify(
     payload: LineNotifyRequest,
     settings: Settings = Depends(get_settings),
 ) -> LineNotifyResponse:
+    recorded = ledger.recorded_output(settings, payload.mail_id, "line_notify")
+    if recorded is not None:
+        return LineNotifyResponse.model_validate_json(recorded)
     try:
-        send_line_notification(payload.results, settings=settings)
+        response = await send_line_notification(payload.results, settings=settings)
     except ValueError as exc:
-        error = ErrorModel(code="INVALID_REQUEST", message=str(exc), retryable=False)
-        raise HTTPException(status_code=400, detail={"error": error.model_dump()}) from exc
+        raise _invalid_request(exc) from exc
     except LineApiError as exc:
-        retryable = exc.status_code >= 500 or exc.status_code in {408, 429}
-        error = ErrorModel(code="LINE_API_ERROR", message=str(exc), retryable=retryable)
-        raise HTTPException(status_code=502, detail={"error": error.model_dump()}) from exc
-    return LineNotifyResponse(status="SENT")
+        raise _line_api_error(exc) from exc
+    # BUFFERED / QUEUED の結果は後から送信されるため、再配信時に二重に溜めないよう記録する
+    ledger.record_output(settings, payload.mail_id, "line_notify", response.model_dump_json())
+    return response
+
+
+@router.post(
+    "/notify/flush",
+    response_model=LineDigestFlushResponse,
+    responses={502: {"model": LineNotifyErrorResponse}, 400: {"model": LineNotifyErrorResponse}},
+)
+async def line_notify_flush(
+    settings: Settings = Depends(get_settings),
+) -> LineDigestFlushResponse:
+    """ダイジェストに溜まった結果をしきい値に関わらず送信する（スケジュール実行用）。"""
+
+    try:
+        return await flush_line_digest(settings=settings)
+    except ValueError as exc:
+        raise _invalid_request(exc) from exc
+    except LineApiError as exc:
+        raise _line_api_error(exc) from exc
+
+
+@router.post(
+    "/notify/drain",
+    response_model=LineOutboxDrainResponse,
+    responses={400: {"model": LineNotifyErrorResponse}},
+)
+async def line_notify_drain(
+    settings: Settings = Depends(get_settings),
+) -> LineOutboxDrainResponse:
+    """outbox の送信待ちの通知を送る（スケジュール実行用）。失敗分は outbox 側で再試行する。"""
+
+    try:
+        return await drain_line_outbox(settings=settings)
+    except ValueError as exc:
+        raise _invalid_request(exc) from exc
+
+
+def _invalid_request(exc: ValueError) -> HTTPException:
+    error = ErrorModel(code="INVALID_REQUEST", message=str(exc), retryable=False)
+    return HTTPException(status_code=400, detail={"error": error.model_dump()})
+
+
+def _line_api_error(exc: LineApiError) -> HTTPException:
+    error = ErrorModel(code="LINE_API_ERROR", message=str(exc), retryable=exc.retryable)
+    return HTTPException(status_code=502, detail={"error": error.model_dump()})
@@ -35,14 +35,35 @@ class LineNotifyRequest(BaseModel):
 
     results: list[CalendarEventResult] = Field(default_factory=list)
     normalized_mail: NormalizedMailModel | None = None
+    mail_id: str | None = Field(default=None, description="`/mail/parse` が返した台帳の ID")
 
     model_config = ConfigDict(extra="forbid")
 
 
 class LineNotifyResponse(BaseModel):
-    """LINE通知レスポンス。"""
+    """LINE通知レスポンス。ダイジェストのしきい値未達なら BUFFERED、outbox 有効時は QUEUED"""
 
-    status: Literal["SENT"]
+    status: Literal["SENT", "BUFFERED", "QUEUED"]
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class LineDigestFlushResponse(BaseModel):
+    """ダイジェスト送信レスポンス。"""
+
+    status: Literal["SENT", "QUEUED", "EMPTY"]
+    count: int = Field(description="送信した結果の件数")
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class LineOutboxDrainResponse(BaseModel):
+    """outbox 送信レスポンス。"""
+
+    sent: int = Field(description="送信できた通知の件数")
+    retried: int = Field(description="再試行待ちに戻した通知の件数")
+    failed: int = Field(description="再試行を諦めて dead にした通知の件数")
+    pending: int = Field(description="outbox に残っている送信待ちの件数")
 
     model_config = ConfigDict(extra="forbid")
 
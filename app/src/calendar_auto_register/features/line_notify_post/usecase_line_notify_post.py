@@ -2,39 +2,230 @@
 
 from __future__ import annotations
 
+import asyncio
+import random
 import re
 from datetime import date, datetime, timedelta
+from typing import Literal
 
 from calendar_auto_register.clients import line_client
+from calendar_auto_register.core.logging import log_warning
 from calendar_auto_register.core.settings import Settings
+from calendar_auto_register.core.timing import timed
+from calendar_auto_register.features.line_notify_post import (
+    digest_line_notify_post,
+    outbox_line_notify_post,
+)
+from calendar_auto_register.features.line_notify_post.schemas_line_notify_post import (
+    LineDigestFlushResponse,
+    LineNotifyResponse,
+    LineOutboxDrainResponse,
+)
 from calendar_auto_register.shared.schemas.calendar import DateModel, GoogleCalendarEventModel
 from calendar_auto_register.shared.schemas.calendar_events import CalendarEventResult
 
+# 1件の結果で長くなりうるフィールドの上限（超えた分は末尾を「…」にする）
+_MAX_SUMMARY_LENGTH = 100
+_MAX_LOCATION_LENGTH = 100
+_MAX_ERROR_LENGTH = 300
+_ELLIPSIS = "…"
+_CONTINUED_HEADER = "🔍 詳細（続き）"
+# outbox から1回の drain で送る通知の上限と、取り出した通知を他の送信処理から隠す秒数
+_OUTBOX_DRAIN_LIMIT = 50
+_OUTBOX_LEASE_SEC = 60.0
 
-def send_line_notification(
+
+async def send_line_notification(
+    results: list[CalendarEventResult],
+    *,
+    settings: Settings,
+) -> LineNotifyResponse:
+    """
+    LINE へ通知メッセージを送信する（イベントループを塞がない非同期 API を使う）。
+
+    本文は文字数上限に収まるよう複数のテキストメッセージに分け、1回の Push にまとめて送る。
+
+    ダイジェストが有効な場合は結果をバッファに溜め、件数または経過時間のしきい値に達したときだけ
+    溜まった結果をまとめて送る（しきい値未達なら BUFFERED）。outbox が有効な場合は送信せずに
+    outbox へ永続化して QUEUED を返し、送信は `drain_line_outbox` に任せる。
+    """
+    _validate_line_settings(settings)
+
+    digest = digest_line_notify_post.digest_from_settings(settings)
+    if digest is None:
+        return LineNotifyResponse(status=await _deliver(results, settings=settings))
+
+    pending = digest.add(results)
+    if pending is None:
+        return LineNotifyResponse(status="BUFFERED")
+    return LineNotifyResponse(status=await _deliver_digest(digest, pending, settings=settings))
+
+
+async def flush_line_digest(*, settings: Settings) -> LineDigestFlushResponse:
+    """バッファに溜まっている結果をしきい値に関わらず送信する。"""
+
+    _validate_line_settings(settings)
+
+    digest = digest_line_notify_post.digest_from_settings(settings)
+    pending = digest.flush() if digest is not None else []
+    if digest is None or not pending:
+        return LineDigestFlushResponse(status="EMPTY", count=0)
+    status = await _deliver_digest(digest, pending, settings=settings)
+    return LineDigestFlushResponse(status=status, count=len(pending))
+
+
+async def drain_line_outbox(
+    *,
+    settings: Settings,
+    limit: int = _OUTBOX_DRAIN_LIMIT,
+) -> LineOutboxDrainResponse:
+    """
+    outbox から送信時刻に達した通知を取り出して送る。
+
+    再試行できる失敗（429・5xx・接続エラー）は Retry-After、なければ full jitter の指数バックオフで
+    次回の送信時刻を決める。再試行できない失敗と、回数を使い切った通知は dead として残す。
+    """
+    outbox = outbox_line_notify_post.outbox_from_settings(settings)
+    if outbox is None:
+        return LineOutboxDrainResponse(sent=0, retried=0, failed=0, pending=0)
+    _validate_line_settings(settings)
+
+    sent = retried = failed = 0
+    for entry in outbox.claim_due(limit=limit, lease_sec=_OUTBOX_LEASE_SEC):
+        try:
+            await line_client.push_messages_async(
+                channel_access_token=settings.line_channel_access_token or "",
+                user_id=settings.line_user_id or "",
+                messages=entry.messages,
+            )
+        except line_client.LineApiError as exc:
+            if exc.retryable and entry.attempts + 1 < settings.line_outbox_max_attempts:
+                outbox.retry(
+                    entry.id,
+                    delay_sec=_outbox_retry_delay(exc, entry.attempts, settings),
+                    error=str(exc),
+                )
+                retried += 1
+            else:
+                outbox.fail(entry.id, error=str(exc))
+                log_warning(event="line_outbox_dead_letter", error=exc)
+                failed += 1
+            continue
+        outbox.complete(entry.id)
+        sent += 1
+    return LineOutboxDrainResponse(
+        sent=sent, retried=retried, failed=failed, pending=outbox.pending_count()
+    )
+
+
+async def run_outbox_drainer(*, settings: Settings) -> None:
+    """
+    `LINE_OUTBOX_DRAIN_INTERVAL_SEC` ごとに outbox を送り続ける（常駐プロセス向け）。
+
+    キャンセルされるまで戻らない。Lambda ではスケジュール実行で `drain_line_outbox` を呼ぶ。
+    """
+    while True:
+        try:
+            await drain_line_outbox(settings=settings)
+        except Exception as exc:  # 常駐タスクは止めずに次の周期で再試行する
+            log_warning(event="line_outbox_drain_failed", error=exc)
+        await asyncio.sleep(settings.line_outbox_drain_interval_sec)
+
+
+async def _deliver(
+    results: list[CalendarEventResult],
+    *,
+    settings: Settings,
+) -> Literal["SENT", "QUEUED"]:
+    """outbox が有効なら永続化だけ行い、無効ならその場で送信する。"""
+
+    messages = render_line_messages(results)
+    outbox = outbox_line_notify_post.outbox_from_settings(settings)
+    if outbox is not None:
+        outbox.enqueue(messages)
+        return "QUEUED"
+    await line_client.push_messages_async(
+        channel_access_token=settings.line_channel_access_token or "",
+        user_id=settings.line_user_id or "",
+        messages=messages,
+    )
+    return "SENT"
+
+
+async def _deliver_digest(
+    digest: digest_line_notify_post.DigestBuffer,
     results: list[CalendarEventResult],
     *,
     settings: Settings,
-) -> None:
-    """LINE へ通知メッセージを送信する。"""
+) -> Literal["SENT", "QUEUED"]:
+    """溜まった結果をまとめて送る。失敗したらバッファへ戻す。"""
 
+    try:
+        return await _deliver(results, settings=settings)
+    except line_client.LineApiError:
+        digest.requeue(results)
+        raise
+
+
+def _outbox_retry_delay(exc: line_client.LineApiError, attempts: int, settings: Settings) -> float:
+    """Retry-After があればそれに従い、なければ full jitter の指数バックオフ秒数を返す。"""
+
+    if exc.retry_after is not None:
+        return exc.retry_after
+    ceiling = min(
+        settings.line_outbox_max_delay_sec,
+        settings.line_outbox_base_delay_sec * (2**attempts),
+    )
+    return random.uniform(0.0, ceiling)
+
+
+def _validate_line_settings(settings: Settings) -> None:
     if not settings.line_channel_access_token:
         raise ValueError("LINE_CHANNEL_ACCESS_TOKEN が未設定です。")
     if not settings.line_user_id:
         raise ValueError("LINE_USER_ID が未設定です。")
 
-    message = build_line_message(results)
-    line_client.push_message(
-        channel_access_token=settings.line_channel_access_token,
-        user_id=settings.line_user_id,
-        message=message,
-    )
 
+@timed("line.render")
+def render_line_messages(
+    results: list[CalendarEventResult],
+    *,
+    max_length: int = line_client.MAX_TEXT_LENGTH,
+) -> list[str]:
+    """
+    通知本文を、1件あたり `max_length` 文字以内のテキストメッセージに分けて返す。
 
-def build_line_message(results: list[CalendarEventResult]) -> str:
-    """LINE通知用の本文を構築する。"""
+    結果1件分のブロックごとに長さを積み上げ、上限を超える手前のイベントの境目で次のメッセージに
+    切り替える。サマリは先頭のメッセージにだけ載せ、2通目以降は「詳細（続き）」から始める。
+    件名・場所・エラーは上限の長さで切り詰めるため、1ブロックが上限を超えることはない。
+    """
+    messages: list[str] = []
+    lines = _header_lines(results)
+    length = _lines_length(lines)
+    has_block = False
 
+    for result in results:
+        block = _result_lines(result)
+        block_length = _lines_length(block)
+        # 見出しの後は改行1つ、ブロック同士の間は空行を挟むため改行2つ
+        if has_block and length + 2 + block_length > max_length:
+            messages.append("\n".join(lines))
+            lines = [_CONTINUED_HEADER]
+            length = _lines_length(lines)
+            has_block = False
+        if has_block:
+            lines.append("")
+        lines.extend(block)
+        length += (2 if has_block else 1) + block_length
+        has_block = True
+
+    messages.append("\n".join(lines))
+    return [_clip(message, max_length) for message in messages]
+
+
+def _header_lines(results: list[CalendarEventResult]) -> list[str]:
     created = sum(1 for result in results if result.status == "CREATED")
+    updated = sum(1 for result in results if result.status == "UPDATED")
     duplicated = sum(1 for result in results if result.status == "DUPLICATED")
     failed = sum(1 for result in results if result.status == "FAILED")
 
@@ -42,49 +233,74 @@ def build_line_message(results: list[CalendarEventResult]) -> str:
     lines.append("カレンダー自動登録 結果")
     lines.append("")
     lines.append("🧾 サマリ")
-    lines.append(f"登録 {created}件 / 重複 {duplicated}件 / 失敗 {failed}件")
+    if updated:
+        lines.append(f"登録 {created}件 / 更新 {updated}件 / 重複 {duplicated}件 / 失敗 {failed}件")
+    else:
+        lines.append(f"登録 {created}件 / 重複 {duplicated}件 / 失敗 {failed}件")
     lines.append("")
     lines.append("🔍 詳細")
+    return lines
+
+
+def _result_lines(result: CalendarEventResult) -> list[str]:
+    """結果1件分の行。長いフィールドは上限の長さで切り詰める。"""
+
+    event = result.event
+    label = _status_label(result.status)
+    lines = [f"{label}　{_truncate(event.summary, _MAX_SUMMARY_LENGTH)}"]
+
+    # 日時フォーマット（終日イベント or 時刻指定イベント）
+    if isinstance(event.start, DateModel) and isinstance(event.end, DateModel):
+        # 終日イベント
+        time_label, time_str = _format_all_day_event(event)
+        lines.append(f"{time_label}　{time_str}")
+    elif hasattr(event.start, "dateTime") and hasattr(event.end, "dateTime"):
+        # 時刻指定イベント（DateTimeModelの場合）
+        if _is_payment_deadline_event(event.summary):
+            # 支払い期限イベント
+            time_str = _format_payment_deadline_datetime(event.start.dateTime, event.end.dateTime)
+            lines.append(f"期限　{time_str}")
+        else:
+            # 通常の時刻指定イベント
+            time_str = _format_datetime_range(event.start.dateTime, event.end.dateTime)
+            lines.append(f"日時　{time_str}")
+
+    if event.location:
+        lines.append(f"場所　{_truncate(event.location, _MAX_LOCATION_LENGTH)}")
+    if result.status == "FAILED" and result.error:
+        error = f"{result.error.code} / {result.error.message}"
+        lines.append(f"エラー　{_truncate(error, _MAX_ERROR_LENGTH)}")
+    return lines
+
+
+def _text_length(text: str) -> int:
+    """LINE の文字数上限と同じく UTF-16 のコード単位で数える（絵文字などは2文字）。"""
+
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _lines_length(lines: list[str]) -> int:
+    return sum(_text_length(line) for line in lines) + max(len(lines) - 1, 0)
+
+
+def _truncate(value: str, max_length: int) -> str:
+    if _text_length(value) <= max_length:
+        return value
+    return _clip(value, max_length - 1) + _ELLIPSIS
 
-    for result in results:
-        event = result.event
-        label = _status_label(result.status)
-        lines.append(f"{label}　{event.summary}")
-
-        # 日時フォーマット（終日イベント or 時刻指定イベント）
-        if isinstance(event.start, DateModel) and isinstance(event.end, DateModel):
-            # 終日イベント
-            time_label, time_str = _format_all_day_event(event)
-            lines.append(f"{time_label}　{time_str}")
-        elif hasattr(event.start, "dateTime") and hasattr(event.end, "dateTime"):
-            # 時刻指定イベント（DateTimeModelの場合）
-            if _is_payment_deadline_event(event.summary):
-                # 支払い期限イベント
-                time_str = _format_payment_deadline_datetime(
-                    event.start.dateTime, event.end.dateTime
-                )
-                lines.append(f"期限　{time_str}")
-            else:
-                # 通常の時刻指定イベント
-                time_str = _format_datetime_range(
-                    event.start.dateTime, event.end.dateTime
-                )
-                lines.append(f"日時　{time_str}")
 
-        if event.location:
-            lines.append(f"場所　{event.location}")
-        if result.status == "FAILED" and result.error:
-            lines.append(f"エラー　{result.error.code} / {result.error.message}")
-        lines.append("")
+def _clip(value: str, max_length: int) -> str:
+    """UTF-16 のコード単位で `max_length` 以内に収まるよう末尾を落とす（サロゲートは分けない）。"""
 
-    if lines and lines[-1] == "":
-        lines.pop()
-    return "\n".join(lines)
+    if _text_length(value) <= max_length:
+        return value
+    return value.encode("utf-16-le")[: max_length * 2].decode("utf-16-le", errors="ignore")
 
 
 def _status_label(status: str) -> str:
     return {
         "CREATED": "登録",
+        "UPDATED": "更新",
         "DUPLICATED": "重複",
         "FAILED": "失敗",
     }.get(status, status)
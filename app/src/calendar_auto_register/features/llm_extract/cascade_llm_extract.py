@@ -0,0 +1,157 @@
+"""モデルカスケード: 高速モデルの抽出結果を構造チェックで採点し、必要時のみ上位モデルへ昇格する。"""
+
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+
+from calendar_auto_register.core.settings import Settings
+from calendar_auto_register.shared.schemas.calendar import (
+    DateModel,
+    DateTimeModel,
+    GoogleCalendarEventModel,
+)
+
+# プロンプトの summary 書式: `支払い期限 HH:MM@イベント名`
+_PAYMENT_DEADLINE_PREFIX = "支払い期限 "
+_PAYMENT_DEADLINE_PATTERN = re.compile(r"^支払い期限 \d{2}:\d{2}@\S")
+# 全角英数字・記号（U+FF01〜U+FF5E）
+_FULL_WIDTH_PATTERN = re.compile("[！-～]")
+
+
+@dataclass(slots=True)
+class TierStats:
+    """カスケードの1段（モデル）ごとの集計値。"""
+
+    calls: int = 0
+    accepted: int = 0
+    escalated: int = 0
+    latency_ms_total: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+_STATS_LOCK = threading.Lock()
+_TIER_STATS: dict[str, TierStats] = {}
+
+
+def resolve_model_tiers(settings: Settings) -> list[str]:
+    """
+    カスケードで試すモデルIDを高速な順に返す。
+
+    `bedrock_cascade_model_ids` の後ろに `bedrock_model_id` を最終段として加える。
+    """
+    tiers: list[str] = []
+    for model_id in [*settings.bedrock_cascade_model_ids, settings.bedrock_model_id]:
+        if model_id and model_id not in tiers:
+            tiers.append(model_id)
+    return tiers
+
+
+def validate_extracted_events(events: list[GoogleCalendarEventModel]) -> list[str]:
+    """
+    抽出結果をプロンプトの規則に照らして構造チェックし、問題点の一覧を返す。
+
+    空リストであれば合格とみなす。
+    """
+    issues: list[str] = []
+    for index, event in enumerate(events):
+        issues.extend(f"events[{index}]: {issue}" for issue in _validate_event(event))
+    return issues
+
+
+def _validate_event(event: GoogleCalendarEventModel) -> list[str]:
+    issues: list[str] = []
+    summary = event.summary
+
+    if not summary.strip():
+        issues.append("summary が空です")
+    if "@ " in summary:
+        issues.append("summary の `@` の直後に空白があります")
+    if _FULL_WIDTH_PATTERN.search(summary):
+        issues.append("summary に全角英数字・記号が含まれています")
+    if summary.startswith(_PAYMENT_DEADLINE_PREFIX):
+        if not _PAYMENT_DEADLINE_PATTERN.match(summary):
+            issues.append("支払い期限の summary 書式が不正です")
+        if event.location is not None:
+            issues.append("支払い期限イベントに location が含まれています")
+
+    if isinstance(event.start, DateTimeModel) and isinstance(event.end, DateTimeModel):
+        start_dt = _parse_aware_datetime(event.start.dateTime)
+        end_dt = _parse_aware_datetime(event.end.dateTime)
+        if start_dt is None or end_dt is None:
+            issues.append("dateTime がタイムゾーン付き ISO 8601 ではありません")
+        elif end_dt <= start_dt:
+            issues.append("end.dateTime が start.dateTime 以前です")
+    elif isinstance(event.start, DateModel) and isinstance(event.end, DateModel):
+        start_date = _parse_date(event.start.date)
+        end_date = _parse_date(event.end.date)
+        if start_date is None or end_date is None:
+            issues.append("date が YYYY-MM-DD 形式ではありません")
+        elif end_date <= start_date:
+            issues.append("end.date が start.date 以前です")
+    else:
+        issues.append("start と end の形式（date / dateTime）が一致しません")
+
+    return issues
+
+
+def _parse_aware_datetime(value: str) -> datetime | None:
+    try:
+        parsed = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo is not None else None
+
+
+def _parse_date(value: str) -> date | None:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def record_tier_result(
+    model_id: str,
+    *,
+    accepted: bool,
+    latency_ms: int,
+    input_tokens: int,
+    output_tokens: int,
+) -> None:
+    """1段分の試行結果を集計に加える。"""
+
+    with _STATS_LOCK:
+        stats = _TIER_STATS.setdefault(model_id, TierStats())
+        stats.calls += 1
+        if accepted:
+            stats.accepted += 1
+        else:
+            stats.escalated += 1
+        stats.latency_ms_total += latency_ms
+        stats.input_tokens += input_tokens
+        stats.output_tokens += output_tokens
+
+
+def get_cascade_stats() -> dict[str, dict[str, float]]:
+    """モデルごとの採用率・平均レイテンシ・トークン消費のスナップショットを返す。"""
+
+    with _STATS_LOCK:
+        snapshot: dict[str, dict[str, float]] = {}
+        for model_id, stats in _TIER_STATS.items():
+            values: dict[str, float] = dict(asdict(stats))
+            values["hit_rate"] = stats.accepted / stats.calls if stats.calls else 0.0
+            values["latency_ms_avg"] = (
+                stats.latency_ms_total / stats.calls if stats.calls else 0.0
+            )
+            snapshot[model_id] = values
+        return snapshot
+
+
+def reset_cascade_stats() -> None:
+    """集計値を初期化する（テスト用）。"""
+
+    with _STATS_LOCK:
+        _TIER_STATS.clear()
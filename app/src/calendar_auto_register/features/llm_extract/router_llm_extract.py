@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 
+from calendar_auto_register.core import ledger
 from calendar_auto_register.core.settings import Settings
 from calendar_auto_register.features.llm_extract.schemas_llm_extract import (
     LlmExtractEventRequest,
@@ -41,6 +43,9 @@ async def llm_extract_event(
 
     try:
         settings = await _get_settings(request)
+        recorded = ledger.recorded_output(settings, payload.mail_id, "llm_extract")
+        if recorded is not None:
+            return LlmExtractEventResponse.model_validate_json(recorded)
 
         # NormalizedMail ドメインモデルに変換
         from calendar_auto_register.core.models import NormalizedMail
@@ -55,9 +60,13 @@ async def llm_extract_event(
             attachments=[],  # API からは添付情報は不要
         )
 
-        events = extract_events(normalized_mail, settings=settings)
+        # 同期の Bedrock 呼び出しでイベントループを塞がないようスレッドで実行する
+        # （同時に届いた同一メールの抽出はユースケース側で1回にまとめられる）
+        events = await run_in_threadpool(extract_events, normalized_mail, settings=settings)
 
-        return LlmExtractEventResponse(events=events)
+        response = LlmExtractEventResponse(events=events)
+        ledger.record_output(settings, payload.mail_id, "llm_extract", response.model_dump_json())
+        return response
 
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -32,6 +32,7 @@ class LlmExtractEventRequest(BaseModel):
     """LLM 抽出リクエスト"""
 
     normalized_mail: NormalizedMailModel
+    mail_id: str | None = Field(default=None, description="`/mail/parse` が返した台帳の ID")
 
     model_config = ConfigDict(extra="forbid")
 
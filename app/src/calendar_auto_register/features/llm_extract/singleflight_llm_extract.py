@@ -0,0 +1,321 @@
+"""同一メールに対する同時抽出リクエストを1回の Bedrock 呼び出しに集約する single-flight。"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Protocol
+
+from pydantic import TypeAdapter
+
+from calendar_auto_register.core.models import NormalizedMail
+from calendar_auto_register.core.prompts import (
+    CALENDAR_EVENT_EXTRACTION_SYSTEM,
+    build_extraction_user_message,
+)
+from calendar_auto_register.core.settings import Settings
+from calendar_auto_register.features.llm_extract.cascade_llm_extract import resolve_model_tiers
+from calendar_auto_register.shared.schemas.calendar import GoogleCalendarEventModel
+
+_EVENTS_ADAPTER: TypeAdapter[list[GoogleCalendarEventModel]] = TypeAdapter(
+    list[GoogleCalendarEventModel]
+)
+# 他プロセスの抽出完了を待つ間のポーリング間隔
+_POLL_INTERVAL_SEC = 0.2
+# リースディレクトリの掃除は、解放のたびではなくプロセスごとに間隔を空けて行う
+_SWEEP_INTERVAL_SEC = 3600.0
+
+ExtractFunc = Callable[[], list[GoogleCalendarEventModel]]
+
+
+def extraction_cache_key(normalized_mail: NormalizedMail, *, settings: Settings) -> str:
+    """
+    抽出結果を一意に識別するキーを返す。
+
+    使用モデル・システムプロンプト・ユーザーメッセージが同じなら同じキーになる。
+    """
+    digest = hashlib.sha256()
+    for part in (
+        *resolve_model_tiers(settings),
+        CALENDAR_EVENT_EXTRACTION_SYSTEM,
+        build_extraction_user_message(normalized_mail),
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class LeaseBackend(Protocol):
+    """プロセス間で抽出の実行権（リース）と結果を共有するバックエンド。"""
+
+    def try_acquire(self, key: str) -> bool: ...
+
+    def release(self, key: str, payload: str | None) -> None: ...
+
+    def is_held(self, key: str) -> bool: ...
+
+    def read_result(self, key: str) -> str | None: ...
+
+
+class FileLeaseBackend:
+    """
+    ローカルファイルの flock によるリース実装。
+
+    同一ホスト上のコンテナ/プロセス間（共有ボリューム上の `/tmp` など）で利用する。
+    完了した結果は `result_ttl_sec` の間だけ再利用される。ロックファイルは解放時に削除し、
+    期限切れの結果ファイルや落ちたプロセスが残したロックファイルは1時間おきに掃除する。
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        result_ttl_sec: float,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._result_ttl_sec = result_ttl_sec
+        self._clock = clock
+        self._held: dict[str, IO[bytes]] = {}
+        self._lock = threading.Lock()
+        self._swept_at = 0.0
+        self.sweep()
+
+    def try_acquire(self, key: str) -> bool:
+        lock_path = self._lock_path(key)
+        while True:
+            handle = open(lock_path, "ab")
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                handle.close()
+                return False
+            if _is_current(handle, lock_path):
+                break
+            # 開いてからロックするまでの間に解放・削除されたファイルだったので開き直す
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            handle.close()
+        with self._lock:
+            self._held[key] = handle
+        return True
+
+    def release(self, key: str, payload: str | None) -> None:
+        if payload is not None:
+            result_path = self._result_path(key)
+            tmp_path = result_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(payload, encoding="utf-8")
+            os.replace(tmp_path, result_path)
+        with self._lock:
+            handle = self._held.pop(key, None)
+        if handle is not None:
+            # ロックを持ったまま削除し、待っている側には削除済みのファイルだと分かるようにする
+            self._lock_path(key).unlink(missing_ok=True)
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            handle.close()
+        if self._clock() - self._swept_at >= _SWEEP_INTERVAL_SEC:
+            self.sweep()
+
+    def is_held(self, key: str) -> bool:
+        try:
+            handle = open(self._lock_path(key), "rb")
+        except FileNotFoundError:
+            return False
+        with handle:
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            return False
+
+    def read_result(self, key: str) -> str | None:
+        result_path = self._result_path(key)
+        try:
+            if self._clock() - result_path.stat().st_mtime > self._result_ttl_sec:
+                result_path.unlink(missing_ok=True)
+                return None
+            return result_path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def sweep(self) -> int:
+        """期限切れの結果・書きかけのファイルと、誰も保持していないロックファイルを削除する。"""
+
+        now = self._clock()
+        removed = 0
+        for path in self._directory.iterdir():
+            if path.suffix == ".lock":
+                removed += _remove_unheld_lock(path)
+                continue
+            try:
+                expired = now - path.stat().st_mtime > self._result_ttl_sec
+            except FileNotFoundError:
+                continue
+            if expired and path.suffix in (".json", ".tmp"):
+                path.unlink(missing_ok=True)
+                removed += 1
+        self._swept_at = now
+        return removed
+
+    def _lock_path(self, key: str) -> Path:
+        return self._directory / f"{key}.lock"
+
+    def _result_path(self, key: str) -> Path:
+        return self._directory / f"{key}.json"
+
+
+def _remove_unheld_lock(lock_path: Path) -> int:
+    """誰もロックしていないロックファイル（落ちたプロセスが残したもの）を削除する。"""
+
+    try:
+        handle = open(lock_path, "rb")
+    except FileNotFoundError:
+        return 0
+    with handle:
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return 0
+        if not _is_current(handle, lock_path):
+            return 0
+        lock_path.unlink(missing_ok=True)
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    return 1
+
+
+def _is_current(handle: IO[bytes], path: Path) -> bool:
+    """開いているファイルが、いま `path` にあるファイルと同じかどうか。"""
+
+    try:
+        return os.fstat(handle.fileno()).st_ino == path.stat().st_ino
+    except FileNotFoundError:
+        return False
+
+
+@dataclass(slots=True)
+class _InFlightCall:
+    done: threading.Event = field(default_factory=threading.Event)
+    result: list[GoogleCalendarEventModel] | None = None
+    error: BaseException | None = None
+
+
+class SingleFlight:
+    """同一キーの同時呼び出しを1回の実行にまとめ、全呼び出し元へ同じ結果を返す。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[str, _InFlightCall] = {}
+        self.coalesced = 0
+
+    def do(self, key: str, func: ExtractFunc) -> list[GoogleCalendarEventModel]:
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if call is None:
+                call = _InFlightCall()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return list(call.result or [])
+
+        try:
+            call.result = func()
+            return list(call.result)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+
+_SINGLE_FLIGHT = SingleFlight()
+
+
+def coalesce(
+    key: str,
+    func: ExtractFunc,
+    *,
+    settings: Settings,
+    lease_backend: LeaseBackend | None = None,
+) -> list[GoogleCalendarEventModel]:
+    """
+    同一キーの抽出を集約して実行する。
+
+    プロセス内では single-flight で1回にまとめ、リースバックエンドがあれば
+    プロセス間でも実行を1回に抑えて結果を共有する。
+    """
+    backend = lease_backend or lease_backend_from_settings(settings)
+    if backend is None:
+        return _SINGLE_FLIGHT.do(key, func)
+    return _SINGLE_FLIGHT.do(
+        key,
+        lambda: _run_with_lease(
+            key, func, backend=backend, wait_sec=settings.llm_singleflight_wait_sec
+        ),
+    )
+
+
+def _run_with_lease(
+    key: str,
+    func: ExtractFunc,
+    *,
+    backend: LeaseBackend,
+    wait_sec: float,
+) -> list[GoogleCalendarEventModel]:
+    payload = backend.read_result(key)
+    if payload is not None:
+        return _EVENTS_ADAPTER.validate_json(payload)
+
+    if not backend.try_acquire(key):
+        # 他プロセスが抽出中: 完了を待って結果を共有する
+        deadline = time.monotonic() + wait_sec
+        while time.monotonic() < deadline and backend.is_held(key):
+            time.sleep(_POLL_INTERVAL_SEC)
+        payload = backend.read_result(key)
+        if payload is not None:
+            return _EVENTS_ADAPTER.validate_json(payload)
+        # 先行プロセスが失敗・タイムアウトした場合は自分で抽出する
+        if not backend.try_acquire(key):
+            return func()
+
+    try:
+        result = func()
+    except BaseException:
+        backend.release(key, None)
+        raise
+    backend.release(key, _EVENTS_ADAPTER.dump_json(result).decode("utf-8"))
+    return result
+
+
+_BACKENDS_LOCK = threading.Lock()
+_FILE_BACKENDS: dict[str, FileLeaseBackend] = {}
+
+
+def lease_backend_from_settings(settings: Settings) -> LeaseBackend | None:
+    """設定に応じたリースバックエンドを返す（未設定ならプロセス内のみで集約）。"""
+
+    if not settings.llm_singleflight_lock_dir:
+        return None
+    with _BACKENDS_LOCK:
+        backend = _FILE_BACKENDS.get(settings.llm_singleflight_lock_dir)
+        if backend is None:
+            backend = FileLeaseBackend(
+                settings.llm_singleflight_lock_dir,
+                result_ttl_sec=settings.llm_singleflight_result_ttl_sec,
+            )
+            _FILE_BACKENDS[settings.llm_singleflight_lock_dir] = backend
+        return backend
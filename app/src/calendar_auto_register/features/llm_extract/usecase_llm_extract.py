@@ -2,29 +2,52 @@
 
 from __future__ import annotations
 
+import time
 import unicodedata
+from dataclasses import dataclass
 from typing import Any
 
 import boto3  # type: ignore[import-untyped]
-from langchain_core.runnables.retry import ExponentialJitterParams
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import Generation, LLMResult
 
 try:  # テスト時にパッチできるようにモジュール変数として保持する
     from langchain_aws import ChatBedrock
 except ModuleNotFoundError:  # pragma: no cover - 環境依存
     ChatBedrock = None  # type: ignore
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_core.output_parsers import JsonOutputParser
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
+from calendar_auto_register.clients import bedrock_throttle
+from calendar_auto_register.core import metrics
+from calendar_auto_register.core.logging import log_llm_usage
 from calendar_auto_register.core.models import NormalizedMail
 from calendar_auto_register.core.prompts import (
     CALENDAR_EVENT_EXTRACTION_SYSTEM,
     build_extraction_user_message,
 )
 from calendar_auto_register.core.settings import Settings
+from calendar_auto_register.core.timing import timed
+from calendar_auto_register.features.llm_extract.cascade_llm_extract import (
+    record_tier_result,
+    resolve_model_tiers,
+    validate_extracted_events,
+)
 from calendar_auto_register.features.llm_extract.schemas_llm_extract import (
     GoogleCalendarEventModel,
 )
+from calendar_auto_register.features.llm_extract.singleflight_llm_extract import (
+    coalesce,
+    extraction_cache_key,
+)
+
+# Bedrock Converse API のプロンプトキャッシュ（cachePoint）に対応するモデルファミリー
+_PROMPT_CACHE_MODEL_MARKERS = ("anthropic.claude", "amazon.nova")
+# 最終段モデルのリトライ上限
+_MAX_ATTEMPTS = 5
+# LLM 出力中で全角文字が混入しうるテキストフィールド
+_HALF_WIDTH_FIELDS = ("summary", "location", "description")
 
 
 def _normalize_to_half_width(text: str) -> str:
@@ -32,6 +55,7 @@ def _normalize_to_half_width(text: str) -> str:
     全角文字を半角に正規化する。
 
     NFKC (Compatibility Decomposition) を使用して、全角の英数字・記号を半角に変換。
+    ASCII のみ、または既に NFKC 正規形の文字列は変換せずそのまま返す。
 
     Args:
         text: 正規化対象のテキスト
@@ -39,84 +63,146 @@ def _normalize_to_half_width(text: str) -> str:
     Returns:
         半角に正規化されたテキスト
     """
+    if text.isascii() or unicodedata.is_normalized("NFKC", text):
+        return text
     return unicodedata.normalize("NFKC", text)
 
 
-def _normalize_event_to_half_width(event: GoogleCalendarEventModel) -> GoogleCalendarEventModel:
+def _normalize_event_fields_to_half_width(event_data: Any) -> None:
     """
-    GoogleCalendarEventModel のテキストフィールドを半角に正規化する。
+    検証前のイベント dict のテキストフィールドをその場で半角に正規化する。
 
     Args:
-        event: 正規化対象のイベント
-
-    Returns:
-        半角に正規化されたイベント
+        event_data: LLM 出力の1イベント分（dict 以外は検証側でエラーにする）
     """
-    # 更新するフィールドを集める
-    update_data: dict[str, Any] = {}
+    if not isinstance(event_data, dict):
+        return
+    for field_name in _HALF_WIDTH_FIELDS:
+        value = event_data.get(field_name)
+        # summary / location / description はメール本文から抽出されるため全角の可能性あり
+        if isinstance(value, str) and value:
+            event_data[field_name] = _normalize_to_half_width(value)
+
+
+class EventExtractionResponse(BaseModel):
+    """LLM抽出レスポンス"""
+
+    events: list[GoogleCalendarEventModel] = Field(default_factory=list)
+
+
+_EXTRACTION_RESPONSE_ADAPTER: TypeAdapter[EventExtractionResponse] = TypeAdapter(
+    EventExtractionResponse
+)
 
-    # summary（必須）- メール本文から抽出されるため全角の可能性あり
-    update_data["summary"] = _normalize_to_half_width(event.summary)
 
-    # location（任意）- メール本文から抽出されるため全角の可能性あり
-    if event.location:
-        update_data["location"] = _normalize_to_half_width(event.location)
+def _validate_extraction_output(parsed: Any) -> EventExtractionResponse:
+    """
+    パース済み JSON を半角正規化し、1回の検証で EventExtractionResponse を構築する。
 
-    # description（任意）- メール本文から抽出されるため全角の可能性あり
-    if event.description:
-        update_data["description"] = _normalize_to_half_width(event.description)
+    Args:
+        parsed: LLM 出力をパースした JSON 値
 
-    return event.model_copy(update=update_data)
+    Returns:
+        検証・正規化済みの抽出レスポンス
+    """
+    if isinstance(parsed, dict) and isinstance(parsed.get("events"), list):
+        for event_data in parsed["events"]:
+            _normalize_event_fields_to_half_width(event_data)
+    return _EXTRACTION_RESPONSE_ADAPTER.validate_python(parsed)
 
 
 class NormalizedJsonOutputParser(JsonOutputParser):
     """
     LangChain JsonOutputParser の拡張版。
 
-    JSON パース後、自動的に GoogleCalendarEventModel の全フィールドを
-    半角正規化する。LangChain の runnable chain に統合。
+    JSON パース後、テキストフィールドを半角正規化したうえで1回だけ検証し、
+    EventExtractionResponse を返す。LangChain の runnable chain に統合。
     """
 
-    def parse(self, text: str) -> dict[str, Any]:
+    def parse_result(self, result: list[Generation], *, partial: bool = False) -> Any:
         """
-        JSON をパースして、イベントを正規化して返す。
+        LLM 出力の JSON をパースして、正規化・検証済みのレスポンスを返す。
+
+        runnable chain からは parse ではなくこのメソッドが呼ばれる。
 
         Args:
-            text: LLM からの出力テキスト（JSON形式）
+            result: LLM からの出力（JSON形式）
+            partial: ストリーミング途中の部分パースかどうか
 
         Returns:
-            正規化済みの dict（{events: [...]}）
+            正規化済みの EventExtractionResponse（部分パース時は dict）
         """
-        # 基底クラスの parse メソッドで JSON をパース
-        parsed_dict = super().parse(text)
-
-        # events キーが存在するかチェック
-        if "events" not in parsed_dict:
-            return parsed_dict
-
-        events_data = parsed_dict["events"]
-        if not isinstance(events_data, list):
-            return parsed_dict
-
-        # 各イベントを GoogleCalendarEventModel に変換して正規化
-        normalized_events = []
-        for event_data in events_data:
-            # dict → GoogleCalendarEventModel に変換
-            event = GoogleCalendarEventModel(**event_data)
-            # 正規化して追加
-            normalized_event = _normalize_event_to_half_width(event)
-            normalized_events.append(normalized_event.model_dump())
+        # 基底クラスで JSON をパース
+        parsed = super().parse_result(result, partial=partial)
+        if partial:
+            return parsed
+        return _validate_extraction_output(parsed)
+
+
+@dataclass(slots=True)
+class LlmUsage:
+    """1回の抽出で消費したトークン数（リトライ分を含む）。"""
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+
+class _UsageCallbackHandler(BaseCallbackHandler):
+    """LLM レスポンスの usage_metadata を集計する LangChain コールバック。"""
+
+    def __init__(self) -> None:
+        self.usage = LlmUsage()
+        self.calls = 0
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: list[list[BaseMessage]], **kwargs: Any
+    ) -> None:
+        # with_retry による再試行も1回ずつ数える
+        self.calls += 1
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if not usage:
+                    continue
+                details = usage.get("input_token_details") or {}
+                self.usage.input_tokens += usage.get("input_tokens", 0)
+                self.usage.output_tokens += usage.get("output_tokens", 0)
+                self.usage.cache_read_tokens += details.get("cache_read", 0)
+                self.usage.cache_write_tokens += details.get("cache_creation", 0)
+
+
+def supports_prompt_caching(model_id: str) -> bool:
+    """
+    モデルが Bedrock のプロンプトキャッシュに対応しているか判定する。
 
-        parsed_dict["events"] = normalized_events
-        return parsed_dict
+    推論プロファイル ID（`apac.anthropic.claude-...` など）も対象とする。
+    """
+    return any(marker in model_id for marker in _PROMPT_CACHE_MODEL_MARKERS)
 
 
-class EventExtractionResponse(BaseModel):
-    """LLM抽出レスポンス"""
+def _build_system_message(*, use_prompt_cache: bool) -> SystemMessage:
+    """
+    システムプロンプトのメッセージを構築する。
 
-    events: list[GoogleCalendarEventModel] = Field(default_factory=list)
+    システムプロンプトは毎回同一のため、キャッシュ有効時は末尾に cachePoint を置き、
+    プロンプト全体をキャッシュ対象の prefix とする。
+    """
+    if not use_prompt_cache:
+        return SystemMessage(content=CALENDAR_EVENT_EXTRACTION_SYSTEM)
+    return SystemMessage(
+        content=[
+            {"type": "text", "text": CALENDAR_EVENT_EXTRACTION_SYSTEM},
+            {"cachePoint": {"type": "default"}},
+        ]
+    )
 
 
+@timed("llm.extract")
 def extract_events(
     normalized_mail: NormalizedMail,
     *,
@@ -128,6 +214,14 @@ def extract_events(
     LangChain ChatBedrock と NormalizedJsonOutputParser を使用してプロンプトベースで
     JSON を取得。パーサーが自動的に LLM レスポンスの全フィールドを半角正規化し、
     Pydantic で検証して Google Calendar API 互換形式で応答。
+    対応モデルではシステムプロンプトをプロンプトキャッシュに載せ、
+    キャッシュ読み込み/書き込みトークン数をログに記録する。
+
+    `BEDROCK_CASCADE_MODEL_IDS` が設定されている場合は高速なモデルから順に試し、
+    構造チェックに失敗したときだけ次のモデルへ昇格する（最終段は `BEDROCK_MODEL_ID`）。
+
+    同じメールに対する同時リクエストは抽出キャッシュキー単位で1回の呼び出しに集約し、
+    `LLM_SINGLEFLIGHT_LOCK_DIR` が設定されていればプロセス間でも結果を共有する。
 
     Args:
         normalized_mail: 正規化されたメール情報
@@ -144,55 +238,165 @@ def extract_events(
     if not settings.bedrock_model_id:
         raise ValueError("Bedrock モデルID が設定されていません")
 
-    try:
-        # AWS Bedrock クライアントを初期化（東京リージョン固定）
-        bedrock_client = boto3.client("bedrock-runtime", region_name=settings.region)
+    key = extraction_cache_key(normalized_mail, settings=settings)
+    return coalesce(
+        key,
+        lambda: _extract_events(normalized_mail, settings=settings),
+        settings=settings,
+    )
 
-        if ChatBedrock is None:
-            raise RuntimeError("langchain_aws がインストールされていません。")
 
-        chat: Any = ChatBedrock(
-            model=settings.bedrock_model_id,
-            client=bedrock_client,
-            model_kwargs={"max_tokens": 2048},
-        )
+def _extract_events(
+    normalized_mail: NormalizedMail,
+    *,
+    settings: Settings,
+) -> list[GoogleCalendarEventModel]:
+    """モデルカスケードで予定を抽出する（集約されない実処理）。"""
 
-        # カスタム出力パーサーを初期化（半角正規化付き）
-        output_parser = NormalizedJsonOutputParser(pydantic_object=EventExtractionResponse)
-
-        # Runnable チェーン（LLM → カスタムパーサー → 正規化）
-        # リトライ機能付き: 最大5回、エクスポーネンシャルバックオフ
-        chain = (chat | output_parser).with_retry(
-            retry_if_exception_type=(ValueError, RuntimeError),
-            stop_after_attempt=5,
-            wait_exponential_jitter=True,
-            exponential_jitter_params=ExponentialJitterParams(
-                initial=1,
-                max=10,
-                exp_base=2,
+    try:
+        # AWS Bedrock クライアントを初期化（東京リージョン固定）
+        # 全呼び出しを共有のレートリミッタ/サーキットブレーカー経由にする
+        bedrock_client = bedrock_throttle.throttled_client(
+            boto3.client(
+                "bedrock-runtime",
+                region_name=settings.region,
+                config=bedrock_throttle.BOTO_CONFIG,
             ),
+            settings=settings,
         )
 
+        if ChatBedrock is None:
+            raise RuntimeError("langchain_aws がインストールされていません。")
+
         # プロンプト構築
         user_message_text = build_extraction_user_message(normalized_mail)
 
-        # メッセージの構築
-        messages = [
-            SystemMessage(content=CALENDAR_EVENT_EXTRACTION_SYSTEM),
-            HumanMessage(content=user_message_text),
-        ]
-
-        # チェーン実行（リトライ付き）
-        # NormalizedJsonOutputParser が parse メソッドで正規化を実施
-        parsed_dict = chain.invoke(messages)
-
-        # Pydantic で検証
-        parsed_response = EventExtractionResponse(**parsed_dict)
-
-        # 正規化済みの予定を返す
-        return parsed_response.events
+        model_ids = resolve_model_tiers(settings)
+        for tier, model_id in enumerate(model_ids):
+            is_final_tier = tier == len(model_ids) - 1
+            usage_handler = _UsageCallbackHandler()
+            started = time.perf_counter()
+            try:
+                # 途中段はリトライせず、失敗したら上位モデルへ昇格する
+                events = _invoke_extraction(
+                    bedrock_client,
+                    model_id=model_id,
+                    user_message_text=user_message_text,
+                    settings=settings,
+                    max_attempts=_MAX_ATTEMPTS if is_final_tier else 1,
+                    usage_handler=usage_handler,
+                )
+            except Exception:
+                _record_tier(
+                    model_id,
+                    tier=tier,
+                    accepted=False,
+                    started=started,
+                    usage_handler=usage_handler,
+                )
+                if is_final_tier:
+                    raise
+                continue
+
+            # 最終段の結果は構造チェックに関わらず採用する
+            accepted = is_final_tier or not validate_extracted_events(events)
+            _record_tier(
+                model_id,
+                tier=tier,
+                accepted=accepted,
+                started=started,
+                usage_handler=usage_handler,
+            )
+            if accepted:
+                # 正規化済みの予定を返す
+                return events
+
+        raise RuntimeError("抽出に使用できるモデルがありません")  # pragma: no cover - defensive
 
     except ValueError as exc:
         raise exc
     except Exception as exc:
         raise RuntimeError(f"LLM 呼び出し失敗: {exc}") from exc
+
+
+def _invoke_extraction(
+    bedrock_client: Any,
+    *,
+    model_id: str,
+    user_message_text: str,
+    settings: Settings,
+    max_attempts: int,
+    usage_handler: _UsageCallbackHandler,
+) -> list[GoogleCalendarEventModel]:
+    """1つのモデルで予定抽出を実行し、検証済みの予定リストを返す。"""
+
+    use_prompt_cache = settings.bedrock_prompt_cache_enabled and supports_prompt_caching(
+        model_id
+    )
+    chat: Any = ChatBedrock(
+        model=model_id,
+        client=bedrock_client,
+        region=settings.region,
+        model_kwargs={"max_tokens": 2048},
+        # cachePoint は Converse API 経由でのみ Bedrock に渡る
+        beta_use_converse_api=use_prompt_cache,
+    )
+
+    # カスタム出力パーサーを初期化（半角正規化付き）
+    output_parser = NormalizedJsonOutputParser(pydantic_object=EventExtractionResponse)
+
+    # Runnable チェーン（LLM → カスタムパーサー → 正規化）
+    # リトライ機能付き: 待機はクライアント側のレートリミッタに任せ、固定のバックオフはしない
+    # （スロットリングは BedrockRetryableError として RuntimeError 扱いで再試行される）
+    chain = (chat | output_parser).with_retry(
+        retry_if_exception_type=(ValueError, RuntimeError),
+        stop_after_attempt=max_attempts,
+        wait_exponential_jitter=False,
+    )
+
+    # メッセージの構築
+    messages = [
+        _build_system_message(use_prompt_cache=use_prompt_cache),
+        HumanMessage(content=user_message_text),
+    ]
+
+    # チェーン実行（リトライ付き）
+    # NormalizedJsonOutputParser が正規化と Pydantic 検証を1回で実施
+    parsed = chain.invoke(messages, config={"callbacks": [usage_handler]})
+    if isinstance(parsed, EventExtractionResponse):
+        return parsed.events
+    # パーサーを経由しない出力（dict）の場合のみここで検証する
+    return _validate_extraction_output(parsed).events
+
+
+def _record_tier(
+    model_id: str,
+    *,
+    tier: int,
+    accepted: bool,
+    started: float,
+    usage_handler: _UsageCallbackHandler,
+) -> None:
+    latency_ms = int((time.perf_counter() - started) * 1000)
+    usage = usage_handler.usage
+    record_tier_result(
+        model_id,
+        accepted=accepted,
+        latency_ms=latency_ms,
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+    )
+    metrics.count("BedrockInputTokens", usage.input_tokens)
+    metrics.count("BedrockOutputTokens", usage.output_tokens)
+    metrics.count("BedrockCacheReadTokens", usage.cache_read_tokens)
+    metrics.count("BedrockRetries", max(usage_handler.calls - 1, 0))
+    log_llm_usage(
+        model_id=model_id,
+        tier=tier,
+        accepted=accepted,
+        latency_ms=latency_ms,
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+        cache_read_tokens=usage.cache_read_tokens,
+        cache_write_tokens=usage.cache_write_tokens,
+    )
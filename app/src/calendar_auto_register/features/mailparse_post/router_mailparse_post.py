@@ -8,10 +8,9 @@ from calendar_auto_register.core.settings import Settings
 from calendar_auto_register.features.mailparse_post.schemas_mailparse_post import (
     MailParseRequest,
     MailParseResponse,
-    NormalizedMailModel,
 )
 from calendar_auto_register.features.mailparse_post.usecase_mailparse_post import (
-    parse_mail,
+    parse_mail_once,
 )
 
 router = APIRouter(prefix="/mail", tags=["mail"])
@@ -27,7 +26,6 @@ async def mail_parse(
     settings: Settings = Depends(get_settings),
 ) -> MailParseResponse:
     try:
-        normalized = parse_mail(payload, settings=settings)
+        return parse_mail_once(payload, settings=settings)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return MailParseResponse(normalized_mail=NormalizedMailModel(**normalized))
@@ -33,3 +33,7 @@ class NormalizedMailModel(BaseModel):
 
 class MailParseResponse(BaseModel):
     normalized_mail: NormalizedMailModel
+    mail_id: str | None = Field(
+        default=None, description="処理済みメール台帳の ID（後続ステージへ引き渡す）"
+    )
+    replayed: bool = Field(default=False, description="台帳に記録済みの結果を返した場合 true")
@@ -5,15 +5,20 @@ from __future__ import annotations
 import email
 import email.policy
 import email.utils
+import hashlib
 from dataclasses import asdict
 from email.message import EmailMessage
 from typing import Any
 
 from calendar_auto_register.clients import s3_client
+from calendar_auto_register.core import ledger as mail_ledger
 from calendar_auto_register.core.models import NormalizedMail
 from calendar_auto_register.core.settings import Settings
+from calendar_auto_register.core.timing import span
 from calendar_auto_register.features.mailparse_post.schemas_mailparse_post import (
     MailParseRequest,
+    MailParseResponse,
+    NormalizedMailModel,
 )
 
 
@@ -25,16 +30,83 @@ def parse_mail(
     """S3 から `.eml` を取得して NormalizedMail を返す。"""
 
     raw_eml = _load_eml_from_s3(request.s3_key, settings=settings)
-    message = email.message_from_bytes(raw_eml, policy=email.policy.default)
-    normalized = _build_normalized_mail(message)
+    with span("mail.mime"):
+        message = email.message_from_bytes(raw_eml, policy=email.policy.default)
+        normalized = _build_normalized_mail(message)
     return asdict(normalized)
 
 
-def _load_eml_from_s3(s3_key: str, settings: Settings) -> bytes:
+def parse_mail_once(
+    request: MailParseRequest,
+    *,
+    settings: Settings,
+) -> MailParseResponse:
+    """
+    処理済みメール台帳を確認してからメールを解析する。
+
+    同じ S3 キー + ETag の配信、または同じ本文（SHA-256）のメールが解析済みなら、
+    記録済みのレスポンスを `replayed=True` で返す。台帳が無効なら毎回解析する。
+    """
+
+    ledger = mail_ledger.ledger_from_settings(settings)
+    if ledger is None:
+        normalized = parse_mail(request, settings=settings)
+        return MailParseResponse(normalized_mail=NormalizedMailModel(**normalized))
+
+    # S3/EventBridge の重複配信は HEAD（ETag）だけで判定し、本文を取得し直さない
+    head = s3_client.head_object(_raw_mail_bucket(settings), request.s3_key, region=settings.region)
+    etag = str(head.get("ETag", "")).strip('"')
+    mail_id = ledger.lookup_delivery(request.s3_key, etag) if etag else None
+    if mail_id is not None:
+        replayed = _replayed_response(ledger, mail_id)
+        if replayed is not None:
+            return replayed
+
+    response = s3_client.get_object(
+        bucket=_raw_mail_bucket(settings),
+        key=request.s3_key,
+        region=settings.region,
+    )
+    raw_eml: bytes = response["Body"].read()
+    mail_id = hashlib.sha256(raw_eml).hexdigest()
+    etag = str(response.get("ETag", etag)).strip('"')
+    if etag:
+        ledger.record_delivery(request.s3_key, etag, mail_id)
+    # 別のキーへ再アップロードされた同じメールは本文のハッシュで判定する
+    replayed = _replayed_response(ledger, mail_id)
+    if replayed is not None:
+        return replayed
+
+    with span("mail.mime"):
+        message = email.message_from_bytes(raw_eml, policy=email.policy.default)
+        mail = _build_normalized_mail(message)
+    parsed = MailParseResponse(
+        normalized_mail=NormalizedMailModel(**asdict(mail)),
+        mail_id=mail_id,
+    )
+    ledger.record_stage(mail_id, "mail_parse", parsed.model_dump_json())
+    return parsed
+
+
+def _replayed_response(
+    ledger: mail_ledger.MailLedger,
+    mail_id: str,
+) -> MailParseResponse | None:
+    recorded = ledger.stage_output(mail_id, "mail_parse")
+    if recorded is None:
+        return None
+    return MailParseResponse.model_validate_json(recorded).model_copy(update={"replayed": True})
+
+
+def _raw_mail_bucket(settings: Settings) -> str:
     if not settings.raw_mail_bucket:
         raise ValueError("RAWメールバケット名が設定されていません。")
+    return settings.raw_mail_bucket
+
+
+def _load_eml_from_s3(s3_key: str, settings: Settings) -> bytes:
     response = s3_client.get_object(
-        bucket=settings.raw_mail_bucket,
+        bucket=_raw_mail_bucket(settings),
         key=s3_key,
         region=settings.region,
     )
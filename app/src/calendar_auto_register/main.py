@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
 import os
 from typing import Any
 
@@ -9,14 +11,42 @@ import uvicorn
 from mangum import Mangum
 
 from .app import create_app
+from .clients import line_client
+from .core.logging import flush_logs
+from .features.line_notify_post.usecase_line_notify_post import drain_line_outbox
 
 app = create_app()
-_handler = Mangum(app)
+# Mangum は lifespan を呼び出しごとに回すため使わない（共有クライアントはプロセス終了時に閉じる）
+_handler = Mangum(app, lifespan="off")
 
 
 def lambda_handler(event: dict[str, Any], context: Any) -> Any:
     """AWS Lambda から呼び出されるエントリポイント"""
-    return _handler(event, context)
+    try:
+        if event.get("source") == "aws.events":
+            # EventBridge のスケジュール実行では API を経由せず outbox の送信だけを行う
+            # asyncio.run はループを閉じて外すため、Mangum と同じループで回して使い回す
+            loop = asyncio.get_event_loop()
+            result = loop.run_until_complete(drain_line_outbox(settings=app.state.settings))
+            return result.model_dump()
+        return _handler(event, context)
+    finally:
+        # 応答後は実行環境が凍結されるため、キューに残ったログをここで書き切る
+        flush_logs()
+
+
+def _close_clients() -> None:
+    """プロセス終了時に、ウォームな呼び出し間で共有してきた接続プールを閉じる。"""
+
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        return
+    if not loop.is_closed() and not loop.is_running():
+        loop.run_until_complete(line_client.close_async_clients())
+
+
+atexit.register(_close_clients)
 
 
 def run_local() -> None:
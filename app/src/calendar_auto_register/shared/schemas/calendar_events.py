@@ -17,13 +17,22 @@ class ErrorModel(BaseModel):
     retryable: bool
 
 
+class CalendarEventResultMetadata(BaseModel):
+    """1件ごとの処理メタデータ。"""
+
+    retry_count: int = 0
+
+    model_config = ConfigDict(extra="forbid")
+
+
 class CalendarEventResult(BaseModel):
     """1件ごとの処理結果。"""
 
-    status: Literal["CREATED", "DUPLICATED", "FAILED"]
+    status: Literal["CREATED", "UPDATED", "DUPLICATED", "FAILED"]
     event: GoogleCalendarEventModel
     google_event_id: str | None = None
     error: ErrorModel | None = None
+    metadata: CalendarEventResultMetadata = Field(default_factory=CalendarEventResultMetadata)
 
     model_config = ConfigDict(extra="forbid")
 
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Iterator
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from calendar_auto_register import main
+from calendar_auto_register.features.line_notify_post.schemas_line_notify_post import (
+    LineOutboxDrainResponse,
+)
+
+
+def _http_event(path: str) -> dict[str, Any]:
+    return {
+        "version": "2.0",
+        "routeKey": f"GET {path}",
+        "rawPath": path,
+        "rawQueryString": "",
+        "headers": {"host": "example.com"},
+        "requestContext": {
+            "http": {"method": "GET", "path": path, "protocol": "HTTP/1.1", "sourceIp": "1.2.3.4"},
+            "stage": "$default",
+        },
+        "isBase64Encoded": False,
+    }
+
+
+@pytest.fixture
+def lambda_loop() -> Iterator[asyncio.AbstractEventLoop]:
+    """Lambda のプロセスと同じく、呼び出し間で使い回すイベントループを用意する。"""
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        yield loop
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def test_スケジュール実行の後もHTTPリクエストを処理できる(
+    lambda_loop: asyncio.AbstractEventLoop,
+) -> None:
+    """outbox の送信後もイベントループが残り、続く API 呼び出しが Mangum で処理される。"""
+
+    loops: list[asyncio.AbstractEventLoop] = []
+
+    async def drain(*, settings: Any) -> LineOutboxDrainResponse:
+        loops.append(asyncio.get_running_loop())
+        return LineOutboxDrainResponse(sent=1, retried=0, failed=0, pending=0)
+
+    with patch.object(main, "drain_line_outbox", drain):
+        drained = main.lambda_handler({"source": "aws.events"}, None)
+        response = main.lambda_handler(_http_event("/healthz"), None)
+        main.lambda_handler({"source": "aws.events"}, None)
+
+    assert drained == {"sent": 1, "retried": 0, "failed": 0, "pending": 0}
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"]) == {"status": "ok", "env": "local"}
+    assert loops == [lambda_loop, lambda_loop]
+    assert not lambda_loop.is_closed()
+
+
+def test_API呼び出しのたびに接続プールを閉じない(lambda_loop: asyncio.AbstractEventLoop) -> None:
+    """Mangum の lifespan を回さず、共有クライアントがウォームな呼び出し間で残る。"""
+
+    with patch.object(main.line_client, "close_async_clients") as close:
+        for _ in range(2):
+            response = main.lambda_handler(_http_event("/healthz"), None)
+            assert response["statusCode"] == 200
+
+    close.assert_not_called()
@@ -0,0 +1,128 @@
+"""Bedrock 共有スロットル（レートリミッタ/サーキットブレーカー）のテスト。"""
+
+from __future__ import annotations
+
+import pytest
+from botocore.exceptions import ClientError
+
+from calendar_auto_register.clients.bedrock_throttle import (
+    AdaptiveRateLimiter,
+    BedrockCircuitOpenError,
+    BedrockRetryableError,
+    BedrockThrottle,
+    CircuitBreaker,
+)
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def _throttling_error() -> ClientError:
+    return ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "Converse")
+
+
+def test_スロットリングでレートが半減し成功で回復する() -> None:
+    clock = _FakeClock()
+    limiter = AdaptiveRateLimiter(max_rate=10.0, min_rate=1.0, clock=clock, sleep=clock.sleep)
+
+    limiter.on_throttle()
+    assert limiter.rate == 5.0
+    # バーストは破棄されるため、次の取得は新しいレートで待機する
+    assert limiter.acquire() == pytest.approx(0.2)
+
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.rate == 10.0
+
+
+def test_連続失敗でブレーカーが開き一定時間後に1件だけ試行を通す() -> None:
+    clock = _FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_sec=30.0, clock=clock)
+    throttle = BedrockThrottle(
+        limiter=AdaptiveRateLimiter(max_rate=100.0, min_rate=1.0, clock=clock, sleep=clock.sleep),
+        breaker=breaker,
+    )
+
+    def _throttled() -> None:
+        raise _throttling_error()
+
+    for _ in range(2):
+        with pytest.raises(BedrockRetryableError):
+            throttle.call(_throttled)
+    assert breaker.state == "open"
+
+    with pytest.raises(BedrockCircuitOpenError):
+        throttle.call(lambda: "ok")
+    assert breaker.snapshot()["rejected"] == 1
+
+    clock.now += 30.0
+    assert throttle.call(lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+
+
+def test_リクエスト不正はブレーカーの失敗に数えない() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_sec=30.0)
+    throttle = BedrockThrottle(
+        limiter=AdaptiveRateLimiter(max_rate=100.0, min_rate=1.0), breaker=breaker
+    )
+
+    def _invalid() -> None:
+        raise ClientError({"Error": {"Code": "ValidationException", "Message": "bad"}}, "Converse")
+
+    with pytest.raises(ClientError):
+        throttle.call(_invalid)
+    assert breaker.state == "closed"
+
+
+def _open_breaker(clock: _FakeClock) -> tuple[BedrockThrottle, CircuitBreaker]:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_sec=30.0, clock=clock)
+    throttle = BedrockThrottle(
+        limiter=AdaptiveRateLimiter(max_rate=100.0, min_rate=1.0, clock=clock, sleep=clock.sleep),
+        breaker=breaker,
+    )
+
+    def _throttled() -> None:
+        raise _throttling_error()
+
+    with pytest.raises(BedrockRetryableError):
+        throttle.call(_throttled)
+    assert breaker.state == "open"
+    clock.now += 30.0
+    return throttle, breaker
+
+
+def test_half_openの試行がリクエスト不正で終わってもブレーカーは閉じる() -> None:
+    clock = _FakeClock()
+    throttle, breaker = _open_breaker(clock)
+
+    def _invalid() -> None:
+        raise ClientError({"Error": {"Code": "ValidationException", "Message": "bad"}}, "Converse")
+
+    with pytest.raises(ClientError):
+        throttle.call(_invalid)
+    assert breaker.state == "closed"
+    assert throttle.call(lambda: "ok") == "ok"
+
+
+def test_half_openの試行が想定外の例外で終わるとブレーカーは再び開く() -> None:
+    clock = _FakeClock()
+    throttle, breaker = _open_breaker(clock)
+
+    def _broken() -> None:
+        raise ValueError("unexpected")
+
+    with pytest.raises(ValueError):
+        throttle.call(_broken)
+    assert breaker.state == "open"
+    clock.now += 30.0
+    assert throttle.call(lambda: "ok") == "ok"
@@ -0,0 +1,111 @@
+"""Google Calendar クライアント層のテスト。"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from calendar_auto_register.clients import google_client
+from calendar_auto_register.core.settings import load_settings
+
+_PAYLOAD = json.dumps(
+    {"items": [{"id": f"event-{number}", "summary": "朝礼"} for number in range(200)]}
+).encode("utf-8")
+
+
+class _GzipHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports: list[int] = []
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.client_ports.append(self.client_address[1])
+        body = gzip.compress(_PAYLOAD)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:  # noqa: N802
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.do_GET()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+
+@pytest.fixture
+def gzip_server() -> Iterator[str]:
+    _GzipHandler.client_ports = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GzipHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_metered_http_reports_wire_bytes_and_reuses_connection(gzip_server: str) -> None:
+    http = google_client.MeteredHttp(timeout=5)
+
+    with patch.object(google_client, "log_google_api_call") as log_call:
+        for _ in range(2):
+            response, content = http.request(f"{gzip_server}/calendar/v3/events")
+            assert response.status == 200
+            assert content == _PAYLOAD
+
+    calls = [call.kwargs for call in log_call.call_args_list]
+    assert [call["path"] for call in calls] == ["/calendar/v3/events"] * 2
+    assert calls[0]["decoded_bytes"] == len(_PAYLOAD)
+    assert calls[0]["wire_bytes"] == len(gzip.compress(_PAYLOAD))
+    assert calls[0]["wire_bytes"] < calls[0]["decoded_bytes"]
+    assert calls[0]["content_encoding"] == "gzip"
+    # keep-alive により2回目も同じ接続を使う
+    assert len(set(_GzipHandler.client_ports)) == 1
+
+
+def test_metered_http_counts_request_body_in_bytes(gzip_server: str) -> None:
+    http = google_client.MeteredHttp(timeout=5)
+    # googleapiclient は JSON 本文を str で渡す
+    body = json.dumps({"summary": "朝礼"})
+
+    with patch.object(google_client, "log_google_api_call") as log_call:
+        http.request(f"{gzip_server}/calendar/v3/events", "POST", body=body)
+        http.request(f"{gzip_server}/calendar/v3/events", "POST", body=body.encode("ascii"))
+
+    request_bytes = [call.kwargs["request_bytes"] for call in log_call.call_args_list]
+    assert request_bytes == [len(body.encode("ascii"))] * 2
+
+
+def test_service_from_settings_reuses_service_per_thread() -> None:
+    settings = load_settings()
+
+    with (
+        patch.object(google_client, "build_credentials_from_service_account") as credentials,
+        patch.object(
+            google_client, "build_calendar_service", side_effect=lambda **_: object()
+        ) as build,
+    ):
+        first = google_client.service_from_settings(settings)
+        second = google_client.service_from_settings(settings)
+        other_thread: list[Any] = []
+        thread = threading.Thread(
+            target=lambda: other_thread.append(google_client.service_from_settings(settings))
+        )
+        thread.start()
+        thread.join()
+
+    assert first is second
+    assert other_thread[0] is not first
+    assert build.call_count == 2
+    assert credentials.call_count == 2
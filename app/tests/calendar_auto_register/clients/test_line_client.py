@@ -0,0 +1,140 @@
+"""LINE Messaging API クライアントのテスト。"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import time
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+
+from calendar_auto_register.clients import line_client
+
+
+@pytest.fixture
+async def fake_async_line_server() -> Any:
+    """応答を遅らせて同時処理数を記録する、aiohttp によるローカルのフェイク LINE API。"""
+
+    state: dict[str, Any] = {
+        "active": 0,
+        "max_active": 0,
+        "status": 200,
+        "delay_sec": 0.2,
+        "message_counts": [],
+        "client_ports": [],
+    }
+
+    async def push(request: web.Request) -> web.Response:
+        state["client_ports"].append(request.transport.get_extra_info("peername")[1])
+        body = await request.json()
+        state["message_counts"].append(len(body["messages"]))
+        state["active"] += 1
+        state["max_active"] = max(state["max_active"], state["active"])
+        try:
+            await asyncio.sleep(state["delay_sec"])
+        finally:
+            state["active"] -= 1
+        if state["status"] != 200:
+            return web.json_response(
+                {"message": "Too many requests"},
+                status=state["status"],
+                headers={"Retry-After": "7"},
+            )
+        return web.json_response({"sentMessages": [{"id": "1", "quoteToken": "q"}]})
+
+    app = web.Application()
+    app.router.add_post("/v2/bot/message/push", push)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    await web.SockSite(runner, sock).start()
+    port = sock.getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}", state
+    finally:
+        await line_client.close_async_clients()
+        await runner.cleanup()
+
+
+async def test_push_message_async_reuses_pooled_connection(
+    fake_async_line_server: Any,
+) -> None:
+    host, state = fake_async_line_server
+    state["delay_sec"] = 0
+
+    with patch.object(line_client, "log_line_api_call") as log_call:
+        for _ in range(3):
+            await line_client.push_message_async(
+                channel_access_token="token",
+                user_id="user",
+                message="hello",
+                host=host,
+            )
+
+    assert len(set(state["client_ports"])) == 1
+    calls = [call.kwargs for call in log_call.call_args_list]
+    assert [call["new_connections"] for call in calls] == [1, 0, 0]
+    assert calls[1]["connect_ms"] == calls[2]["connect_ms"] == 0
+    assert all(call["status"] == 200 for call in calls)
+    assert line_client.get_async_messaging_api("token", host=host).api_client is (
+        line_client.get_async_messaging_api("token", host=host).api_client
+    )
+
+
+async def test_push_message_async_runs_concurrently(fake_async_line_server: Any) -> None:
+    host, state = fake_async_line_server
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            line_client.push_message_async(
+                channel_access_token="token",
+                user_id="user",
+                message=f"hello {number}",
+                host=host,
+            )
+            for number in range(5)
+        )
+    )
+
+    # 5件 × 0.2 秒を直列に待たず、重ねて送信できている
+    assert time.perf_counter() - started < 0.8
+    assert state["max_active"] == 5
+
+
+async def test_push_message_async_maps_retryable_errors(fake_async_line_server: Any) -> None:
+    host, state = fake_async_line_server
+    state["status"] = 429
+
+    with pytest.raises(line_client.LineApiError) as exc_info:
+        await line_client.push_message_async(
+            channel_access_token="token",
+            user_id="user",
+            message="hello",
+            host=host,
+        )
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.retryable
+    assert exc_info.value.retry_after == 7.0
+    assert "Too many requests" in str(exc_info.value)
+
+
+async def test_push_messages_async_packs_five_messages_per_push(
+    fake_async_line_server: Any,
+) -> None:
+    host, state = fake_async_line_server
+
+    await line_client.push_messages_async(
+        channel_access_token="token",
+        user_id="user",
+        messages=[f"digest {number}" for number in range(7)],
+        host=host,
+    )
+
+    # 7件のメッセージは 5件 + 2件 の2回の Push にまとまる
+    assert state["message_counts"] == [5, 2]
@@ -0,0 +1,207 @@
+"""冪等キーによるレスポンス再送のテスト。"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from calendar_auto_register.app import create_app
+from calendar_auto_register.core.idempotency import (
+    InMemoryIdempotencyStore,
+    SqliteIdempotencyStore,
+    StoredResponse,
+    reset_idempotency_stores,
+)
+from calendar_auto_register.core.middleware import IdempotencyMiddleware
+from calendar_auto_register.core.settings import load_settings
+
+_PAYLOAD = {
+    "events": [
+        {
+            "summary": "営業会議",
+            "start": {"dateTime": "2024-12-25T14:00:00+09:00", "timeZone": "Asia/Tokyo"},
+            "end": {"dateTime": "2024-12-25T15:00:00+09:00", "timeZone": "Asia/Tokyo"},
+        }
+    ]
+}
+_RESPONSE = StoredResponse(status=200, headers=[("content-type", "application/json")], body=b"{}")
+
+
+@pytest.fixture(autouse=True)
+def idempotency_enabled(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setenv("IDEMPOTENCY_ENABLED", "true")
+    load_settings.cache_clear()
+    reset_idempotency_stores()
+    yield
+    reset_idempotency_stores()
+
+
+def test_sqlite_store_leases_completes_and_expires(tmp_path: Path) -> None:
+    now = [1000.0]
+    store = SqliteIdempotencyStore(tmp_path / "idempotency.sqlite3", clock=lambda: now[0])
+
+    assert store.acquire("k", lease_sec=10)
+    assert not store.acquire("k", lease_sec=10)
+    assert store.get("k") is None
+    store.release("k")
+    assert store.acquire("k", lease_sec=10)
+    now[0] += 11
+    # 実行中の印は lease を過ぎると取り直せる
+    assert store.acquire("k", lease_sec=10)
+    now[0] += 8
+    assert store.extend("k", lease_sec=10)
+    now[0] += 8
+    # 延長した印はまだ有効
+    assert not store.acquire("k", lease_sec=10)
+
+    store.complete("k", _RESPONSE, ttl_sec=60)
+    assert not store.extend("k", lease_sec=10)
+    store.release("k")
+    assert store.get("k") == _RESPONSE
+    assert not store.acquire("k", lease_sec=10)
+    now[0] += 61
+    assert store.get("k") is None
+    assert store.acquire("k", lease_sec=10)
+
+
+def test_in_memory_store_evicts_least_recently_used() -> None:
+    store = InMemoryIdempotencyStore(max_entries=2)
+    store.complete("a", _RESPONSE, ttl_sec=60)
+    store.complete("b", _RESPONSE, ttl_sec=60)
+    assert store.get("a") == _RESPONSE
+
+    store.complete("c", _RESPONSE, ttl_sec=60)
+
+    assert store.get("a") == _RESPONSE
+    assert store.get("b") is None
+    assert store.get("c") == _RESPONSE
+
+
+def test_in_memory_store_extends_only_in_flight_markers() -> None:
+    now = [1000.0]
+    store = InMemoryIdempotencyStore(max_entries=10, clock=lambda: now[0])
+
+    assert not store.extend("k", lease_sec=10)
+    assert store.acquire("k", lease_sec=10)
+    now[0] += 8
+    assert store.extend("k", lease_sec=10)
+    now[0] += 8
+    assert not store.acquire("k", lease_sec=10)
+
+    store.complete("k", _RESPONSE, ttl_sec=60)
+    assert not store.extend("k", lease_sec=10)
+    assert store.get("k") == _RESPONSE
+
+
+def test_retry_with_same_request_id_replays_stored_response() -> None:
+    service = MagicMock()
+    service.events.return_value.list.return_value.execute.return_value = {"items": []}
+    service.events.return_value.insert.return_value.execute.return_value = {"id": "event-1"}
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=service,
+    ):
+        client = TestClient(create_app())
+        headers = {"X-Request-Id": "sfn-exec-1"}
+        first = client.post("/calendar/events", json=_PAYLOAD, headers=headers)
+        second = client.post("/calendar/events", json=_PAYLOAD, headers=headers)
+        changed = client.post(
+            "/calendar/events",
+            json={"events": [{**_PAYLOAD["events"][0], "summary": "別の会議"}]},
+            headers=headers,
+        )
+
+    assert first.status_code == second.status_code == changed.status_code == 200
+    assert second.json() == first.json()
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.headers["X-Request-Id"] == "sfn-exec-1"
+    assert "Idempotent-Replayed" not in changed.headers
+    assert service.events.return_value.insert.call_count == 2
+
+
+async def test_concurrent_duplicates_wait_for_the_first_request() -> None:
+    calls = 0
+
+    async def slow_app(scope: Any, receive: Any, send: Any) -> None:
+        nonlocal calls
+        calls += 1
+        await receive()
+        await asyncio.sleep(0.3)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"done"})
+
+    middleware = IdempotencyMiddleware(slow_app, settings=load_settings())
+
+    async def post() -> list[dict[str, Any]]:
+        sent: list[dict[str, Any]] = []
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/llm/extract-event",
+            "headers": [(b"idempotency-key", b"key-1")],
+        }
+
+        async def receive() -> dict[str, Any]:
+            return {"type": "http.request", "body": b"{}", "more_body": False}
+
+        async def send(message: dict[str, Any]) -> None:
+            sent.append(message)
+
+        await middleware(scope, receive, send)
+        return sent
+
+    first, second = await asyncio.gather(post(), post())
+
+    assert calls == 1
+    assert first[-1]["body"] == second[-1]["body"] == b"done"
+    assert (b"idempotent-replayed", b"true") in first[0]["headers"] + second[0]["headers"]
+
+
+async def test_in_flight_marker_is_renewed_past_its_lease(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("IDEMPOTENCY_LEASE_SEC", "0.3")
+    monkeypatch.setenv("IDEMPOTENCY_WAIT_SEC", "5")
+    load_settings.cache_clear()
+    calls = 0
+
+    async def long_app(scope: Any, receive: Any, send: Any) -> None:
+        nonlocal calls
+        calls += 1
+        await receive()
+        await asyncio.sleep(1.0)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"done"})
+
+    middleware = IdempotencyMiddleware(long_app, settings=load_settings())
+
+    async def post(delay_sec: float) -> list[dict[str, Any]]:
+        await asyncio.sleep(delay_sec)
+        sent: list[dict[str, Any]] = []
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/llm/extract-event",
+            "headers": [(b"idempotency-key", b"key-1")],
+        }
+
+        async def receive() -> dict[str, Any]:
+            return {"type": "http.request", "body": b"{}", "more_body": False}
+
+        async def send(message: dict[str, Any]) -> None:
+            sent.append(message)
+
+        await middleware(scope, receive, send)
+        return sent
+
+    # 処理が lease より長引いても、途中で届いた再試行は二重に実行されない
+    first, retried = await asyncio.gather(post(0), post(0.6))
+
+    assert calls == 1
+    assert first[-1]["body"] == retried[-1]["body"] == b"done"
+    assert (b"idempotent-replayed", b"true") in retried[0]["headers"]
@@ -0,0 +1,36 @@
+"""処理済みメール台帳のテスト。"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from calendar_auto_register.core.ledger import SqliteMailLedger
+
+
+def test_ledger_records_stages_and_compacts_by_age_and_size(tmp_path: Path) -> None:
+    now = [1_000.0]
+    ledger = SqliteMailLedger(
+        tmp_path / "ledger.sqlite3",
+        retention_sec=100,
+        max_entries=2,
+        clock=lambda: now[0],
+    )
+    for number in range(3):
+        ledger.record_delivery(f"mail-{number}.eml", f"etag-{number}", f"mail-{number}")
+        ledger.record_stage(f"mail-{number}", "mail_parse", f'{{"n": {number}}}')
+        now[0] += 10
+
+    assert ledger.lookup_delivery("mail-0.eml", "etag-0") == "mail-0"
+    assert ledger.lookup_delivery("mail-0.eml", "other-etag") is None
+    assert ledger.stage_output("mail-2", "mail_parse") == '{"n": 2}'
+    assert ledger.stage_output("mail-2", "llm_extract") is None
+
+    # 上限を超えた最古の配信と、その配信だけが参照していたステージ記録が消える
+    assert ledger.compact() == 2
+    assert ledger.lookup_delivery("mail-0.eml", "etag-0") is None
+    assert ledger.stage_output("mail-0", "mail_parse") is None
+    assert ledger.lookup_delivery("mail-1.eml", "etag-1") == "mail-1"
+
+    now[0] += 100
+    assert ledger.compact() == 4
+    assert ledger.stage_output("mail-2", "mail_parse") is None
@@ -0,0 +1,71 @@
+"""JSON ロギング（キュー経由の書き出し）のテスト。"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Iterator
+
+import pytest
+
+from calendar_auto_register.core.logging import (
+    configure_logging,
+    flush_logs,
+    log_error,
+    log_request,
+)
+
+
+@pytest.fixture
+def async_logging() -> Iterator[None]:
+    configure_logging(level=logging.INFO, async_enabled=True)
+    yield
+    configure_logging(level=logging.INFO, async_enabled=False)
+
+
+def test_async_logging_writes_json_after_flush(
+    async_logging: None, capsys: pytest.CaptureFixture[str]
+) -> None:
+    log_request(path="/healthz", status=200, request_id="req-1", latency_ms=3)
+    log_request(path="/healthz", status=200, request_id="req-2", latency_ms=4)
+    flush_logs()
+
+    lines = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    assert [line["request_id"] for line in lines] == ["req-1", "req-2"]
+    assert lines[0] == {
+        "level": "INFO",
+        "path": "/healthz",
+        "status": 200,
+        "request_id": "req-1",
+        "latency_ms": 3,
+    }
+
+
+def test_log_error_captures_traceback_only_while_handling(
+    async_logging: None, capsys: pytest.CaptureFixture[str]
+) -> None:
+    log_error(path="/x", status=400, request_id="req-1", latency_ms=1, error="bad")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log_error(path="/x", status=500, request_id="req-2", latency_ms=1, error={"a": 1})
+    flush_logs()
+
+    first, second = (json.loads(line) for line in capsys.readouterr().err.splitlines())
+    assert first["traceback"] is None
+    assert first["error_json"] == '{"message": "bad"}'
+    assert "ValueError: boom" in second["traceback"]
+    assert second["error_json"] == '{"a": 1}'
+
+
+def test_sync_logging_defers_serialization_to_the_handler(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    configure_logging(level=logging.INFO, async_enabled=False)
+
+    with caplog.at_level(logging.INFO, logger="calendar_auto_register"):
+        log_request(path="/healthz", status=200, request_id="req-1", latency_ms=3)
+
+    record = caplog.records[-1]
+    assert not isinstance(record.msg, str)
+    assert json.loads(record.getMessage())["request_id"] == "req-1"
@@ -0,0 +1,87 @@
+"""EMF メトリクス送出のテスト。"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from calendar_auto_register.app import create_app
+from calendar_auto_register.core.metrics import InvocationMetrics
+from calendar_auto_register.features.calendar_events import daycache_calendar_events
+
+_PAYLOAD = {
+    "events": [
+        {
+            "summary": "営業会議",
+            "start": {"dateTime": "2024-12-25T14:00:00+09:00", "timeZone": "Asia/Tokyo"},
+            "end": {"dateTime": "2024-12-25T15:00:00+09:00", "timeZone": "Asia/Tokyo"},
+        }
+    ]
+}
+
+
+def _emf_documents(stdout: str) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in stdout.splitlines() if line.startswith('{"_aws"')]
+
+
+def _post_calendar_events() -> None:
+    service = MagicMock()
+    service.events.return_value.list.return_value.execute.return_value = {"items": []}
+    service.events.return_value.insert.return_value.execute.return_value = {"id": "event-1"}
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=service,
+    ):
+        response = TestClient(create_app()).post("/calendar/events", json=_PAYLOAD)
+    assert response.status_code == 200
+
+
+def test_request_flushes_one_emf_document(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setenv("METRICS_ENABLED", "true")
+    monkeypatch.setenv("METRICS_DIMENSIONS", '["Service", "Path"]')
+    monkeypatch.setenv("CALENDAR_DAY_CACHE_TTL_SEC", "60")
+    daycache_calendar_events.reset_caches()
+
+    _post_calendar_events()
+
+    (document,) = _emf_documents(capsys.readouterr().out)
+    (directive,) = document["_aws"]["CloudWatchMetrics"]
+    assert directive["Namespace"] == "CalendarAutoRegister"
+    assert directive["Dimensions"] == [["Service", "Path"]]
+    assert document["Path"] == "/calendar/events"
+    assert "Status" not in document
+    names = {metric["Name"]: metric["Unit"] for metric in directive["Metrics"]}
+    assert names["RequestLatency"] == "Milliseconds"
+    assert names["Latency.calendar.register"] == "Milliseconds"
+    assert document["CalendarDayCacheMisses"] == 1
+    assert document["CalendarDayCacheHits"] == 0
+    assert document["CalendarDayCacheHitRatio"] == 0
+
+
+def test_metrics_are_noop_for_local_runs(capsys: pytest.CaptureFixture[str]) -> None:
+    _post_calendar_events()
+
+    assert _emf_documents(capsys.readouterr().out) == []
+
+
+def test_invocation_metrics_sum_counts_and_keep_distributions() -> None:
+    metrics = InvocationMetrics()
+    metrics.count("GoogleApiCalls")
+    metrics.count("GoogleApiCalls", 2)
+    metrics.record("Latency.google.list", 12.5, "Milliseconds")
+    metrics.record("Latency.google.list", 7.5, "Milliseconds")
+
+    document = metrics.to_emf(
+        namespace="Test", dimensions={"Path": "/x"}, timestamp_ms=1_700_000_000_000
+    )
+
+    assert document["_aws"]["Timestamp"] == 1_700_000_000_000
+    assert document["GoogleApiCalls"] == 3
+    assert document["Latency.google.list"] == [12.5, 7.5]
+    assert document["Path"] == "/x"
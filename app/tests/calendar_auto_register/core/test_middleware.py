@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import json
+import logging
 import os
 from pathlib import Path
 
@@ -49,6 +51,31 @@ class TestApiKeyAuthenticationLocal:
         assert response.json()["env"] == "local"
 
 
+class TestRequestIdMiddleware:
+    """リクエスト ID・応答時間ヘッダーと、例外ハンドラーへの request.state の受け渡し"""
+
+    def test_echoes_request_id_and_adds_timing_headers(self) -> None:
+        response = TestClient(create_app()).get("/healthz", headers={"X-Request-Id": "req-1"})
+
+        assert response.headers["X-Request-Id"] == "req-1"
+        assert int(response.headers["X-Response-Time-Ms"]) >= 0
+        assert response.headers["Server-Timing"].startswith("total;dur=")
+
+    def test_exception_handlers_see_request_state(self, caplog: pytest.LogCaptureFixture) -> None:
+        with caplog.at_level(logging.INFO, logger="calendar_auto_register"):
+            response = TestClient(create_app()).post(
+                "/calendar/events", json={"events": "x"}, headers={"X-Request-Id": "req-2"}
+            )
+
+        assert response.status_code == 422
+        assert response.headers["X-Request-Id"] == "req-2"
+        logs = [json.loads(record.getMessage()) for record in caplog.records]
+        assert [(log["level"], log["status"], log["request_id"]) for log in logs] == [
+            ("ERROR", 422, "req-2"),
+            ("INFO", 422, "req-2"),
+        ]
+
+
 # class TestApiKeyAuthenticationProd:
 #     """本番環境（APP_ENV=prod）でのテスト - 認証必須"""
 #
@@ -0,0 +1,67 @@
+"""段階ごとの計測（span）のテスト。"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+
+from calendar_auto_register.core.timing import (
+    current_timings,
+    end_request,
+    span,
+    start_request,
+    timed,
+)
+
+
+@timed("work.async")
+async def _async_work() -> int:
+    await asyncio.sleep(0.01)
+    return 1
+
+
+async def test_spans_accumulate_across_tasks_and_threads() -> None:
+    timings, token = start_request()
+    try:
+        with span("work.sync"):
+            time.sleep(0.01)
+        assert await asyncio.gather(_async_work(), _async_work()) == [1, 1]
+
+        context = contextvars.copy_context()
+        worker = threading.Thread(target=context.run, args=(timed("work.thread")(time.sleep), 0))
+        worker.start()
+        worker.join()
+    finally:
+        end_request(token)
+
+    stages = timings.snapshot()
+    assert stages["work.sync"] >= 10
+    # 並行に走った2回分を合算する
+    assert stages["work.async"] >= 20
+    assert "work.thread" in stages
+    assert current_timings() is None
+    assert timings.server_timing(total_ms=42.0).endswith("total;dur=42.0")
+
+
+def test_span_costs_a_few_microseconds_and_is_noop_without_request() -> None:
+    iterations = 20_000
+
+    def run() -> float:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            with span("hot"):
+                pass
+        return (time.perf_counter() - started) / iterations * 1_000_000
+
+    disabled_us = run()
+    timings, token = start_request()
+    try:
+        enabled_us = run()
+    finally:
+        end_request(token)
+
+    assert disabled_us < 5
+    assert enabled_us < 5
+    assert list(timings.snapshot()) == ["hot"]
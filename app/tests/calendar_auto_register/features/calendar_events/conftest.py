@@ -0,0 +1,306 @@
+"""Calendar events テスト用のフェイク Google Calendar Service。"""
+
+from __future__ import annotations
+
+import copy
+import json
+import re
+import threading
+from datetime import datetime, time, timezone
+from typing import Any
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import httplib2
+import httpx
+import pytest
+from google.oauth2.credentials import Credentials
+from googleapiclient.errors import HttpError
+
+from calendar_auto_register.clients.google_async_client import AsyncCalendarClient
+
+
+def _to_utc(value: dict[str, Any]) -> datetime:
+    if "dateTime" in value:
+        return datetime.fromisoformat(value["dateTime"]).astimezone(timezone.utc)
+    return datetime.combine(
+        datetime.fromisoformat(value["date"]).date(), time.min, tzinfo=timezone.utc
+    )
+
+
+class _FakeRequest:
+    def __init__(self, func: Any) -> None:
+        self._func = func
+
+    def execute(self) -> Any:
+        return self._func()
+
+
+class _FakeEventsResource:
+    def __init__(self, service: FakeCalendarService) -> None:
+        self._service = service
+
+    def list(self, **kwargs: Any) -> _FakeRequest:
+        return _FakeRequest(lambda: self._service._list(**kwargs))
+
+    def insert(self, *, calendarId: str, body: dict[str, Any], **kwargs: Any) -> _FakeRequest:
+        return _FakeRequest(lambda: self._service._insert(calendarId, body, **kwargs))
+
+    def patch(
+        self, *, calendarId: str, eventId: str, body: dict[str, Any], **kwargs: Any
+    ) -> _FakeRequest:
+        return _FakeRequest(lambda: self._service._patch(eventId, body, **kwargs))
+
+
+class FakeCalendarService:
+    """events().list / insert / patch を模したスレッドセーフなインメモリ Calendar。
+
+    list は timeMin/timeMax と期間が重なるイベントを返し、insert は連番の ID を払い出す。
+    privateExtendedProperty を指定した list はその値が一致するイベントだけを返す。
+    timeMin なしの list は syncToken による増分同期として振る舞い、`expire_sync_tokens`
+    の後は 410 Gone を返す。`insert_errors` に例外を積むと、その順に insert が失敗する。
+    """
+
+    def __init__(self, items: list[dict[str, Any]] | None = None) -> None:
+        self._lock = threading.Lock()
+        self.items: list[dict[str, Any]] = []
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+        self.insert_errors: list[Exception] = []
+        self._next_id = 1
+        self._revisions: dict[str, int] = {}
+        self._revision = 0
+        self._min_valid_revision = 0
+        for item in items or []:
+            self._store(copy.deepcopy(item))
+
+    def events(self) -> _FakeEventsResource:
+        return _FakeEventsResource(self)
+
+    def cancel(self, event_id: str) -> None:
+        with self._lock:
+            for item in self.items:
+                if item["id"] == event_id:
+                    item["status"] = "cancelled"
+                    self._bump(event_id)
+
+    def expire_sync_tokens(self) -> None:
+        with self._lock:
+            self._min_valid_revision = self._revision + 1
+
+    def _list(self, **kwargs: Any) -> dict[str, Any]:
+        with self._lock:
+            self.calls.append(("list", kwargs))
+            if "privateExtendedProperty" in kwargs:
+                return self._find_by_property(kwargs["privateExtendedProperty"])
+            if "timeMin" not in kwargs:
+                return self._sync(kwargs.get("syncToken"))
+            time_min = datetime.fromisoformat(kwargs["timeMin"])
+            time_max = datetime.fromisoformat(kwargs["timeMax"])
+            items = [
+                copy.deepcopy(item)
+                for item in self.items
+                if item.get("status") != "cancelled"
+                and _to_utc(item["start"]) < time_max
+                and _to_utc(item["end"]) > time_min
+            ]
+        return {"items": items}
+
+    def _find_by_property(self, condition: str) -> dict[str, Any]:
+        name, _, value = condition.partition("=")
+        items = [
+            copy.deepcopy(item)
+            for item in self.items
+            if item.get("status") != "cancelled"
+            and item.get("extendedProperties", {}).get("private", {}).get(name) == value
+        ]
+        return {"items": items}
+
+    def _sync(self, sync_token: str | None) -> dict[str, Any]:
+        if sync_token is None:
+            items = [item for item in self.items if item.get("status") != "cancelled"]
+        else:
+            since = int(sync_token.removeprefix("sync-"))
+            if since < self._min_valid_revision:
+                raise HttpError(httplib2.Response({"status": 410}), b"Sync token is no longer valid")
+            items = [item for item in self.items if self._revisions[item["id"]] > since]
+        return {"items": copy.deepcopy(items), "nextSyncToken": f"sync-{self._revision}"}
+
+    def _insert(self, calendar_id: str, body: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        with self._lock:
+            self.calls.append(("insert", {"calendarId": calendar_id, "body": body, **kwargs}))
+            if self.insert_errors:
+                raise self.insert_errors.pop(0)
+            created = {**copy.deepcopy(body), "id": f"event-{self._next_id}"}
+            self._next_id += 1
+            self._store(created)
+        if kwargs.get("fields") == "id":
+            return {"id": created["id"]}
+        return copy.deepcopy(created)
+
+    def _patch(self, event_id: str, body: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        with self._lock:
+            self.calls.append(("patch", {"eventId": event_id, "body": body, **kwargs}))
+            for item in self.items:
+                if item["id"] == event_id:
+                    item.update(copy.deepcopy(body))
+                    self._bump(event_id)
+                    if kwargs.get("fields") == "id":
+                        return {"id": event_id}
+                    return copy.deepcopy(item)
+        raise HttpError(httplib2.Response({"status": 404}), b"Not Found")
+
+    def _store(self, item: dict[str, Any]) -> None:
+        self.items.append(item)
+        self._bump(item["id"])
+
+    def _bump(self, event_id: str) -> None:
+        self._revision += 1
+        self._revisions[event_id] = self._revision
+
+
+_EVENTS_PATH = re.compile(
+    r"^/calendar/v3/calendars/(?P<calendar>[^/]+)/events(?:/(?P<event>[^/]+))?$"
+)
+
+
+class FakeCalendarServer:
+    """FakeCalendarService を Calendar REST API（バッチを含む）として公開する httpx のハンドラ。"""
+
+    def __init__(self, service: FakeCalendarService) -> None:
+        self.service = service
+        self.requests: list[httpx.Request] = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.url.path == "/batch/calendar/v3":
+            return self._batch(request)
+        status, payload = self._dispatch(
+            request.method,
+            request.url.path,
+            dict(request.url.params),
+            json.loads(request.content) if request.content else None,
+        )
+        return httpx.Response(status, json=payload)
+
+    def _dispatch(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any],
+        body: dict[str, Any] | None,
+    ) -> tuple[int, dict[str, Any]]:
+        match = _EVENTS_PATH.match(path)
+        if match is None:
+            return 404, {"error": {"message": "Not Found"}}
+        calendar_id = unquote(match["calendar"])
+        event_id = unquote(match["event"]) if match["event"] else None
+        params = {key: _decode_param(value) for key, value in params.items()}
+        try:
+            if method == "GET" and event_id is None:
+                return 200, self.service._list(calendarId=calendar_id, **params)
+            if method == "POST" and event_id is None:
+                return 200, self.service._insert(calendar_id, body or {}, **params)
+            if method == "PATCH" and event_id is not None:
+                return 200, self.service._patch(event_id, body or {}, **params)
+        except HttpError as exc:
+            return exc.resp.status, {"error": {"message": exc.content.decode()}}
+        return 405, {"error": {"message": "Method Not Allowed"}}
+
+    def _batch(self, request: httpx.Request) -> httpx.Response:
+        boundary = request.headers["content-type"].split("boundary=")[1]
+        parts = []
+        for raw_part in request.content.decode().split(f"--{boundary}"):
+            raw_part = raw_part.strip()
+            if not raw_part or raw_part == "--":
+                continue
+            headers, _, message = raw_part.partition("\r\n\r\n")
+            content_id = re.search(r"Content-ID: <(.+)>", headers)
+            request_line, _, rest = message.partition("\r\n")
+            _, _, body = rest.partition("\r\n\r\n")
+            method, target, _ = request_line.split(" ")
+            url = urlsplit(target)
+            status, payload = self._dispatch(
+                method,
+                url.path,
+                dict(parse_qsl(url.query)),
+                json.loads(body) if body.strip() else None,
+            )
+            parts.append(
+                "\r\n".join(
+                    [
+                        "Content-Type: application/http",
+                        f"Content-ID: <response-{content_id[1] if content_id else ''}>",
+                        "",
+                        f"HTTP/1.1 {status} OK",
+                        "Content-Type: application/json; charset=UTF-8",
+                        "",
+                        json.dumps(payload),
+                    ]
+                )
+            )
+        # 実際の API と同様に、パートの並びはリクエスト順と一致するとは限らない
+        content = "".join(f"--batch_response\r\n{part}\r\n" for part in reversed(parts))
+        return httpx.Response(
+            200,
+            content=f"{content}--batch_response--\r\n".encode(),
+            headers={"Content-Type": "multipart/mixed; boundary=batch_response"},
+        )
+
+
+def _decode_param(value: str) -> Any:
+    return {"true": True, "false": False}.get(value, value)
+
+
+@pytest.fixture
+def fake_calendar_factory() -> type[FakeCalendarService]:
+    return FakeCalendarService
+
+
+@pytest.fixture
+def fake_calendar_service() -> FakeCalendarService:
+    return FakeCalendarService()
+
+
+@pytest.fixture(autouse=True)
+def reset_google_rate_limiters() -> None:
+    """テスト間で共有レートリミッタの状態を持ち越さない。"""
+
+    from calendar_auto_register.clients import google_client
+
+    google_client.reset_rate_limiters()
+
+
+@pytest.fixture(autouse=True)
+def reset_calendar_mirrors() -> None:
+    """テスト間で共有ミラーを持ち越さない。"""
+
+    from calendar_auto_register.features.calendar_events import mirror_calendar_events
+
+    mirror_calendar_events.reset_mirrors()
+
+
+@pytest.fixture(autouse=True)
+def reset_booking_key_indexes() -> None:
+    """テスト間で予約キーのインデックスを持ち越さない。"""
+
+    from calendar_auto_register.features.calendar_events import bookingkey_calendar_events
+
+    bookingkey_calendar_events.reset_indexes()
+
+
+@pytest.fixture(autouse=True)
+def reset_calendar_day_caches() -> None:
+    """テスト間で日単位キャッシュを持ち越さない。"""
+
+    from calendar_auto_register.features.calendar_events import daycache_calendar_events
+
+    daycache_calendar_events.reset_caches()
+
+
+@pytest.fixture
+async def fake_async_calendar() -> Any:
+    """FakeCalendarServer に接続した AsyncCalendarClient と、その裏の FakeCalendarService。"""
+
+    server = FakeCalendarServer(FakeCalendarService())
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server.handle)) as http:
+        client = AsyncCalendarClient(http, Credentials(token="test-token"))
+        yield client, server
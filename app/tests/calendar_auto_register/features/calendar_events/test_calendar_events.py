@@ -2,11 +2,34 @@
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock, patch
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+from unittest.mock import ANY, MagicMock, patch
 
+import httplib2
+import pytest
 from fastapi.testclient import TestClient
+from googleapiclient.errors import HttpError
 
 from calendar_auto_register.app import create_app
+from calendar_auto_register.clients.google_async_client import BatchRequest
+from calendar_auto_register.core.settings import load_settings
+from calendar_auto_register.core.timing import end_request, start_request
+from calendar_auto_register.features.calendar_events import (
+    bookingkey_calendar_events,
+    daycache_calendar_events,
+    index_calendar_events,
+    mirror_calendar_events,
+)
+from calendar_auto_register.features.calendar_events.schemas_calendar_events import (
+    CalendarEventModel,
+)
+from calendar_auto_register.features.calendar_events.usecase_calendar_events import (
+    create_calendar_events,
+    create_calendar_events_async,
+)
 
 
 def _build_service_mock(
@@ -156,3 +179,800 @@ def test_bulk_partial_failure() -> None:
         assert data["results"][1]["status"] == "FAILED"
         assert data["results"][1]["event"]["summary"] == "⚙️ 夕礼"
         assert data["results"][1]["error"]["code"] == "UNEXPECTED_ERROR"
+
+
+def test_bulk_concurrent_keeps_input_order_and_serializes_duplicates(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_calendar_service: Any,
+) -> None:
+    monkeypatch.setenv("CALENDAR_MAX_WORKERS", "4")
+
+    def _event(summary: str, start: str, end: str) -> dict[str, object]:
+        return {
+            "summary": summary,
+            "start": {"dateTime": start, "timeZone": "Asia/Tokyo"},
+            "end": {"dateTime": end, "timeZone": "Asia/Tokyo"},
+        }
+
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=fake_calendar_service,
+    ):
+        client = TestClient(create_app())
+        payload = {
+            "events": [
+                _event("朝礼", "2024-12-25T09:00:00+09:00", "2024-12-25T09:30:00+09:00"),
+                # 同一予定（UTC 表記）は API を呼ばず、先行分の結果を流用する
+                _event("朝礼", "2024-12-25T00:00:00Z", "2024-12-25T00:30:00Z"),
+                _event("夕礼", "2024-12-25T17:00:00+09:00", "2024-12-25T17:30:00+09:00"),
+            ]
+        }
+
+        res = client.post("/calendar/events", json=payload)
+
+    assert res.status_code == 200
+    results = res.json()["results"]
+    assert [result["status"] for result in results] == ["CREATED", "DUPLICATED", "CREATED"]
+    assert results[1]["google_event_id"] == results[0]["google_event_id"]
+    assert [result["event"]["summary"] for result in results] == [
+        "⚙️ 朝礼",
+        "⚙️ 朝礼",
+        "⚙️ 夕礼",
+    ]
+    assert len([call for call in fake_calendar_service.calls if call[0] == "insert"]) == 2
+
+
+def _http_error(status: int, headers: dict[str, str] | None = None) -> HttpError:
+    return HttpError(httplib2.Response({"status": status, **(headers or {})}), b"error")
+
+
+def test_bulk_retries_retryable_google_error(
+    fake_calendar_service: Any,
+) -> None:
+    fake_calendar_service.insert_errors = [_http_error(503, {"retry-after": "0"})]
+
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=fake_calendar_service,
+    ):
+        client = TestClient(create_app())
+        payload = {
+            "events": [
+                {
+                    "summary": "朝礼",
+                    "start": {"dateTime": "2024-12-25T09:00:00+09:00", "timeZone": "Asia/Tokyo"},
+                    "end": {"dateTime": "2024-12-25T09:30:00+09:00", "timeZone": "Asia/Tokyo"},
+                }
+            ]
+        }
+
+        res = client.post("/calendar/events", json=payload)
+
+    assert res.status_code == 200
+    result = res.json()["results"][0]
+    assert result["status"] == "CREATED"
+    assert result["metadata"] == {"retry_count": 1}
+    # 再試行は重複チェックからやり直す
+    assert [call[0] for call in fake_calendar_service.calls] == [
+        "list",
+        "insert",
+        "list",
+        "insert",
+    ]
+
+
+def test_bulk_gives_up_after_max_attempts(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_calendar_service: Any,
+) -> None:
+    monkeypatch.setenv("GOOGLE_RETRY_MAX_ATTEMPTS", "2")
+    monkeypatch.setenv("GOOGLE_RETRY_BASE_DELAY_SEC", "0")
+    fake_calendar_service.insert_errors = [_http_error(500), _http_error(500)]
+
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=fake_calendar_service,
+    ):
+        client = TestClient(create_app())
+        payload = {
+            "events": [
+                {
+                    "summary": "朝礼",
+                    "start": {"dateTime": "2024-12-25T09:00:00+09:00", "timeZone": "Asia/Tokyo"},
+                    "end": {"dateTime": "2024-12-25T09:30:00+09:00", "timeZone": "Asia/Tokyo"},
+                }
+            ]
+        }
+
+        res = client.post("/calendar/events", json=payload)
+
+    result = res.json()["results"][0]
+    assert result["status"] == "FAILED"
+    assert result["error"]["code"] == "GOOGLE_API_ERROR"
+    assert result["error"]["retryable"] is True
+    assert result["metadata"] == {"retry_count": 1}
+
+
+def test_bulk_does_not_retry_past_deadline(fake_calendar_service: Any) -> None:
+    fake_calendar_service.insert_errors = [_http_error(429, {"retry-after": "30"})]
+
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=fake_calendar_service,
+    ):
+        results = create_calendar_events(
+            [
+                CalendarEventModel(
+                    summary="朝礼",
+                    start={"dateTime": "2024-12-25T09:00:00+09:00", "timeZone": "Asia/Tokyo"},
+                    end={"dateTime": "2024-12-25T09:30:00+09:00", "timeZone": "Asia/Tokyo"},
+                )
+            ],
+            settings=load_settings(),
+            deadline=time.monotonic() + 5,
+        )
+
+    assert results[0].status == "FAILED"
+    assert results[0].error is not None and results[0].error.retryable is True
+    assert results[0].metadata.retry_count == 0
+
+
+def _morning_meeting() -> CalendarEventModel:
+    return CalendarEventModel(
+        summary="朝礼",
+        start={"dateTime": "2024-12-25T09:00:00+09:00", "timeZone": "Asia/Tokyo"},
+        end={"dateTime": "2024-12-25T09:30:00+09:00", "timeZone": "Asia/Tokyo"},
+    )
+
+
+def test_mirror_answers_duplicate_checks_without_list_calls(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    fake_calendar_factory: Any,
+) -> None:
+    monkeypatch.setenv("CALENDAR_MIRROR_ENABLED", "true")
+    monkeypatch.setenv("CALENDAR_MIRROR_DIR", str(tmp_path))
+    service = fake_calendar_factory(
+        items=[
+            {
+                "id": "event-existing",
+                "summary": "⚙️ 朝礼",
+                "start": {"dateTime": "2024-12-25T00:00:00Z"},
+                "end": {"dateTime": "2024-12-25T00:30:00Z"},
+            }
+        ]
+    )
+
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=service,
+    ):
+        first = create_calendar_events([_morning_meeting()], settings=load_settings())
+        second = create_calendar_events([_morning_meeting()], settings=load_settings())
+
+    assert first[0].status == "DUPLICATED"
+    assert first[0].google_event_id == "event-existing"
+    assert second[0].status == "DUPLICATED"
+    # 初回の全件同期のみで、重複チェックの timeMin/timeMax 検索は発生しない
+    assert [call for call in service.calls if call[0] == "list"] == [
+        ("list", {"calendarId": "primary", "singleEvents": True, "fields": ANY})
+    ]
+    assert list(tmp_path.glob("*.json.gz"))
+
+
+def test_mirror_syncs_incrementally_and_resyncs_on_410(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    fake_calendar_factory: Any,
+) -> None:
+    monkeypatch.setenv("CALENDAR_MIRROR_ENABLED", "true")
+    monkeypatch.setenv("CALENDAR_MIRROR_DIR", str(tmp_path))
+    monkeypatch.setenv("CALENDAR_MIRROR_TTL_SEC", "0")
+    service = fake_calendar_factory()
+
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=service,
+    ):
+        created = create_calendar_events([_morning_meeting()], settings=load_settings())
+        assert created[0].status == "CREATED"
+
+        # 増分同期で削除が反映され、同じ予定を再登録できる
+        assert created[0].google_event_id is not None
+        service.cancel(created[0].google_event_id)
+        recreated = create_calendar_events([_morning_meeting()], settings=load_settings())
+        assert recreated[0].status == "CREATED"
+
+        # syncToken が失効しても全件を取り直して重複を検出する
+        service.expire_sync_tokens()
+        duplicated = create_calendar_events([_morning_meeting()], settings=load_settings())
+        assert duplicated[0].status == "DUPLICATED"
+        assert duplicated[0].google_event_id == recreated[0].google_event_id
+
+    mirror = mirror_calendar_events.mirror_from_settings(load_settings())
+    assert mirror is not None
+    assert (mirror.full_syncs, mirror.incremental_syncs) == (2, 1)
+    assert len(mirror) == 1
+
+
+def test_mirror_saves_only_after_changes() -> None:
+    saved: list[bytes] = []
+    store = MagicMock()
+    store.load.return_value = None
+    store.save.side_effect = saved.append
+    mirror = mirror_calendar_events.CalendarMirror(store, ttl_sec=60)
+
+    mirror.refresh(lambda **params: {"items": [], "nextSyncToken": "sync-1"})
+    assert len(saved) == 1
+    # 同期せず変更もない呼び出しでは書き直さない
+    mirror.refresh(lambda **params: pytest.fail("TTL 内は同期しない"))
+    mirror.save()
+    assert len(saved) == 1
+
+    mirror.apply(
+        {
+            "id": "event-1",
+            "summary": "朝礼",
+            "start": {"dateTime": "2024-12-25T00:00:00Z"},
+            "end": {"dateTime": "2024-12-25T00:30:00Z"},
+        }
+    )
+    mirror.save()
+    assert len(saved) == 2
+
+
+def test_interval_index_long_event_does_not_widen_short_event_scans() -> None:
+    index = index_calendar_events.IntervalIndex()
+    base = datetime(2024, 12, 1, tzinfo=timezone.utc)
+    for day in range(30):
+        start = base + timedelta(days=day, hours=9)
+        index.add(
+            {
+                "id": f"standup-{day}",
+                "start": {"dateTime": start.isoformat()},
+                "end": {"dateTime": (start + timedelta(minutes=30)).isoformat()},
+            }
+        )
+    index.add(
+        {
+            "id": "trip",
+            "start": {"dateTime": base.isoformat()},
+            "end": {"dateTime": (base + timedelta(days=20)).isoformat()},
+        }
+    )
+
+    window_min = base + timedelta(days=10, hours=9)
+    window_max = window_min + timedelta(hours=1)
+    assert [event.id for event in index.overlapping(window_min, window_max)] == [
+        "trip",
+        "standup-10",
+    ]
+    # 長い予定のバケット以外は、直前の短い予定の分しか窓を広げない
+    candidates = index._timed.candidate_ids(window_min.timestamp(), window_max.timestamp())
+    assert list(candidates) == ["trip", "standup-10"]
+
+    index.remove("trip")
+    assert [event.id for event in index.overlapping(window_min, window_max)] == ["standup-10"]
+
+
+def test_interval_index_separates_all_day_and_timed_events() -> None:
+    index = index_calendar_events.IntervalIndex()
+    index.add(
+        {
+            "id": "timed",
+            "summary": "⚙️ 朝礼",
+            "start": {"dateTime": "2024-12-25T09:00:00+09:00"},
+            "end": {"dateTime": "2024-12-25T09:30:00+09:00"},
+        }
+    )
+    index.add(
+        {
+            "id": "all-day",
+            "summary": "⚙️ 休暇",
+            "start": {"date": "2024-12-24"},
+            "end": {"date": "2024-12-26"},
+        }
+    )
+    index.add({"id": "broken", "start": {"dateTime": "invalid"}, "end": {}})
+
+    window_min = datetime(2024, 12, 25, 0, 0, tzinfo=timezone.utc)
+    window_max = datetime(2024, 12, 25, 1, 0, tzinfo=timezone.utc)
+    assert len(index) == 2
+    assert {event.id for event in index.overlapping(window_min, window_max)} == {
+        "timed",
+        "all-day",
+    }
+    assert [event.id for event in index.overlapping(window_min, window_max, all_day=False)] == [
+        "timed"
+    ]
+
+    index.remove("timed")
+    assert [event.id for event in index.overlapping(window_min, window_max)] == ["all-day"]
+
+
+def test_rank_candidates_orders_by_similarity_then_start_distance() -> None:
+    events = [
+        index_calendar_events.to_indexed_event(
+            {
+                "id": event_id,
+                "summary": summary,
+                "start": {"dateTime": start},
+                "end": {"dateTime": "2024-12-25T11:00:00+09:00"},
+            }
+        )
+        for event_id, summary, start in (
+            ("other", "⚙️ 請求書送付", "2024-12-25T10:00:00+09:00"),
+            ("far", "⚙️ 営業会議 第3回", "2024-12-25T10:10:00+09:00"),
+            ("near", "⚙️ 営業会議（第３回）", "2024-12-25T10:05:00+09:00"),
+        )
+    ]
+
+    ranked = index_calendar_events.rank_candidates(
+        [event for event in events if event is not None],
+        summary="営業会議　第3回",
+        start_ts=datetime(2024, 12, 25, 1, 0, tzinfo=timezone.utc).timestamp(),
+        all_day=False,
+        min_similarity=0.8,
+    )
+
+    assert [candidate.event.id for candidate in ranked] == ["near", "far"]
+    assert ranked[0].similarity == 1.0
+
+
+def test_bulk_fuzzy_duplicate_when_similarity_enabled(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_calendar_factory: Any,
+) -> None:
+    monkeypatch.setenv("CALENDAR_DUPLICATE_SIMILARITY", "0.8")
+    service = fake_calendar_factory(
+        items=[
+            {
+                "id": "event-rescheduled",
+                "summary": "⚙️ 営業会議（第3回）",
+                "start": {"dateTime": "2024-12-25T14:10:00+09:00", "timeZone": "Asia/Tokyo"},
+                "end": {"dateTime": "2024-12-25T15:10:00+09:00", "timeZone": "Asia/Tokyo"},
+            },
+            {
+                "id": "event-next-week",
+                "summary": "⚙️ 営業会議 第3回",
+                "start": {"dateTime": "2025-01-01T14:00:00+09:00", "timeZone": "Asia/Tokyo"},
+                "end": {"dateTime": "2025-01-01T15:00:00+09:00", "timeZone": "Asia/Tokyo"},
+            },
+        ]
+    )
+
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=service,
+    ):
+        results = create_calendar_events(
+            [
+                CalendarEventModel(
+                    summary="営業会議 第3回",
+                    start={"dateTime": "2024-12-25T14:00:00+09:00", "timeZone": "Asia/Tokyo"},
+                    end={"dateTime": "2024-12-25T15:00:00+09:00", "timeZone": "Asia/Tokyo"},
+                )
+            ],
+            settings=load_settings(),
+        )
+
+    assert results[0].status == "DUPLICATED"
+    assert results[0].google_event_id == "event-rescheduled"
+    # ミラーなしでも、順位付けするのは期間で絞り込んだ list の結果だけ
+    [(_, list_kwargs)] = [call for call in service.calls if call[0] == "list"]
+    assert list_kwargs["timeMin"] == "2024-12-25T13:45:00+09:00"
+    assert list_kwargs["timeMax"] == "2024-12-25T15:15:00+09:00"
+
+
+def test_bulk_collapses_in_batch_duplicates_without_api_calls(
+    fake_calendar_service: Any,
+) -> None:
+    prefixed = _morning_meeting().model_copy(update={"summary": "⚙️ 朝礼"})
+
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=fake_calendar_service,
+    ):
+        results = create_calendar_events(
+            [_morning_meeting(), prefixed, _morning_meeting()],
+            settings=load_settings(),
+        )
+
+    assert [result.status for result in results] == ["CREATED", "DUPLICATED", "DUPLICATED"]
+    assert {result.google_event_id for result in results} == {"event-1"}
+    assert [call[0] for call in fake_calendar_service.calls] == ["list", "insert"]
+    # 重複チェックと登録では必要なフィールドだけを受け取る
+    list_call, insert_call = (call[1] for call in fake_calendar_service.calls)
+    assert list_call["fields"] == "items(id,summary,start,end),nextPageToken"
+    assert insert_call["fields"] == "id"
+
+
+def test_bulk_collapsed_duplicates_share_survivor_failure(fake_calendar_service: Any) -> None:
+    fake_calendar_service.insert_errors = [_http_error(403)]
+
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=fake_calendar_service,
+    ):
+        results = create_calendar_events(
+            [_morning_meeting(), _morning_meeting()],
+            settings=load_settings(),
+        )
+
+    assert [result.status for result in results] == ["FAILED", "FAILED"]
+    assert results[1].error == results[0].error
+    assert [call[0] for call in fake_calendar_service.calls] == ["list", "insert"]
+
+
+def test_day_cache_fetches_only_missing_days_and_writes_through(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_calendar_service: Any,
+) -> None:
+    monkeypatch.setenv("CALENDAR_DAY_CACHE_TTL_SEC", "60")
+
+    def _event(summary: str, day: int) -> CalendarEventModel:
+        return CalendarEventModel(
+            summary=summary,
+            start={"dateTime": f"2024-12-{day}T10:00:00+00:00", "timeZone": "UTC"},
+            end={"dateTime": f"2024-12-{day}T11:00:00+00:00", "timeZone": "UTC"},
+        )
+
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=fake_calendar_service,
+    ):
+        first = create_calendar_events(
+            [_event("朝礼", 25), _event("夕礼", 25), _event("朝礼", 26)],
+            settings=load_settings(),
+        )
+        # 書き込み済みの日はキャッシュから重複を検出する
+        second = create_calendar_events([_event("夕礼", 25)], settings=load_settings())
+
+    assert [result.status for result in first] == ["CREATED", "CREATED", "CREATED"]
+    assert second[0].status == "DUPLICATED"
+    assert second[0].google_event_id == first[1].google_event_id
+    list_calls = [call[1] for call in fake_calendar_service.calls if call[0] == "list"]
+    assert [(call["timeMin"], call["timeMax"]) for call in list_calls] == [
+        ("2024-12-25T00:00:00+00:00", "2024-12-26T00:00:00+00:00"),
+        ("2024-12-26T00:00:00+00:00", "2024-12-27T00:00:00+00:00"),
+    ]
+
+    cache = daycache_calendar_events.cache_from_settings(load_settings())
+    assert cache is not None
+    assert cache.stats() == {"hits": 2, "misses": 2, "hit_ratio": 0.5, "days": 2}
+
+
+def test_day_cache_refetches_expired_days_and_evicts_lru() -> None:
+    now = [0.0]
+    cache = daycache_calendar_events.DayWindowCache(
+        ttl_sec=10, max_days=2, clock=lambda: now[0]
+    )
+    fetched: list[tuple[str, str]] = []
+
+    def _list_range(range_min: datetime, range_max: datetime) -> list[dict[str, Any]]:
+        fetched.append((range_min.date().isoformat(), range_max.date().isoformat()))
+        return []
+
+    def _lookup(day: int) -> None:
+        window_min = datetime(2024, 12, day, 9, tzinfo=timezone.utc)
+        cache.find_overlapping(window_min, window_min.replace(hour=10), _list_range)
+
+    _lookup(24)
+    _lookup(25)
+    _lookup(26)  # 最も古い 24 日が追い出される
+    _lookup(25)
+    _lookup(24)
+    now[0] = 11.0
+    _lookup(24)
+
+    assert fetched == [
+        ("2024-12-24", "2024-12-25"),
+        ("2024-12-25", "2024-12-26"),
+        ("2024-12-26", "2024-12-27"),
+        ("2024-12-24", "2024-12-25"),
+        ("2024-12-24", "2024-12-25"),
+    ]
+
+
+async def test_async_bulk_registers_concurrently_and_detects_duplicates(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_async_calendar: Any,
+) -> None:
+    monkeypatch.setenv("CALENDAR_MAX_WORKERS", "4")
+    client, server = fake_async_calendar
+    server.service.items.append(
+        {
+            "id": "existing-1",
+            "summary": "夕礼",
+            "start": {"dateTime": "2024-12-25T18:00:00+09:00", "timeZone": "Asia/Tokyo"},
+            "end": {"dateTime": "2024-12-25T18:30:00+09:00", "timeZone": "Asia/Tokyo"},
+        }
+    )
+    evening = CalendarEventModel(
+        summary="夕礼",
+        start={"dateTime": "2024-12-25T18:00:00+09:00", "timeZone": "Asia/Tokyo"},
+        end={"dateTime": "2024-12-25T18:30:00+09:00", "timeZone": "Asia/Tokyo"},
+    )
+    invalid = _morning_meeting().model_copy(update={"end": _morning_meeting().start})
+
+    results = await create_calendar_events_async(
+        [_morning_meeting(), evening, invalid, _morning_meeting()],
+        settings=load_settings(),
+        client=client,
+    )
+
+    assert [result.status for result in results] == [
+        "CREATED",
+        "DUPLICATED",
+        "FAILED",
+        "DUPLICATED",
+    ]
+    assert results[1].google_event_id == "existing-1"
+    assert results[3].google_event_id == results[0].google_event_id
+    assert results[2].error is not None and results[2].error.code == "INVALID_EVENT"
+    assert sorted(call[0] for call in server.service.calls) == ["insert", "list", "list"]
+    assert all(
+        request.headers["authorization"] == "Bearer test-token"
+        and "gzip" in request.headers["user-agent"]
+        for request in server.requests
+    )
+
+
+async def test_async_bulk_retries_google_error(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_async_calendar: Any,
+) -> None:
+    monkeypatch.setenv("GOOGLE_RETRY_BASE_DELAY_SEC", "0")
+    client, server = fake_async_calendar
+    server.service.insert_errors = [_http_error(503)]
+
+    results = await create_calendar_events_async(
+        [_morning_meeting()],
+        settings=load_settings(),
+        client=client,
+    )
+
+    assert results[0].status == "CREATED"
+    assert results[0].metadata.retry_count == 1
+    assert [call[0] for call in server.service.calls] == ["list", "insert", "list", "insert"]
+
+
+def test_create_app_warns_when_async_path_ignores_sync_only_features(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("CALENDAR_ASYNC_CLIENT_ENABLED", "true")
+    monkeypatch.setenv("CALENDAR_MIRROR_ENABLED", "true")
+    monkeypatch.setenv("CALENDAR_UPSERT_ENABLED", "true")
+
+    with patch("calendar_auto_register.app.log_warning") as warn:
+        create_app()
+
+    warn.assert_called_once_with(
+        event="calendar_async_features_ignored",
+        error={"settings": ["CALENDAR_MIRROR_ENABLED", "CALENDAR_UPSERT_ENABLED"]},
+    )
+
+    monkeypatch.setenv("CALENDAR_ASYNC_CLIENT_ENABLED", "false")
+    load_settings.cache_clear()
+    with patch("calendar_auto_register.app.log_warning") as warn:
+        create_app()
+    warn.assert_not_called()
+
+
+async def test_async_client_batch_round_trip(fake_async_calendar: Any) -> None:
+    client, server = fake_async_calendar
+    created = await client.insert_event(
+        "primary",
+        {
+            "summary": "朝礼",
+            "start": {"date": "2024-12-25"},
+            "end": {"date": "2024-12-26"},
+        },
+        fields="id",
+    )
+    assert created == {"id": "event-1"}
+
+    responses = await client.batch(
+        [
+            BatchRequest(
+                method="PATCH",
+                path="/calendars/primary/events/event-1",
+                body={"summary": "夕礼"},
+            ),
+            BatchRequest(method="PATCH", path="/calendars/primary/events/missing", body={}),
+            BatchRequest(
+                method="GET",
+                path="/calendars/primary/events",
+                params={
+                    "timeMin": "2024-12-25T00:00:00+00:00",
+                    "timeMax": "2024-12-26T00:00:00+00:00",
+                    "singleEvents": True,
+                },
+            ),
+        ]
+    )
+
+    # レスポンスのパート順に関わらず、リクエスト順に並べ直して返す
+    assert [response.status for response in responses] == [200, 404, 200]
+    assert responses[0].body["summary"] == "夕礼"
+    assert [item["summary"] for item in responses[2].body["items"]] == ["夕礼"]
+    assert len(server.requests) == 2
+
+    with pytest.raises(HttpError) as exc_info:
+        await client.patch_event("primary", "missing", {"summary": "x"})
+    assert exc_info.value.resp.status == 404
+
+
+def _booked_concert(start_hour: int) -> CalendarEventModel:
+    return CalendarEventModel(
+        summary="コンサート",
+        start={"dateTime": f"2024-12-25T{start_hour}:00:00+09:00", "timeZone": "Asia/Tokyo"},
+        end={"dateTime": f"2024-12-25T{start_hour + 2}:00:00+09:00", "timeZone": "Asia/Tokyo"},
+        description="予約変更のお知らせ\n予約番号：ＡＢ－１２３４５\n",
+    )
+
+
+def test_extract_booking_key_normalizes_width_and_case() -> None:
+    assert bookingkey_calendar_events.extract_booking_key(_booked_concert(18)) == "AB-12345"
+    english = _booked_concert(18).model_copy(
+        update={"description": "Your booking reference: xk9-77a2 is confirmed"}
+    )
+    assert bookingkey_calendar_events.extract_booking_key(english) == "XK9-77A2"
+    assert bookingkey_calendar_events.extract_booking_key(_morning_meeting()) is None
+
+
+def test_upsert_patches_existing_event_when_booking_changes(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_calendar_service: Any,
+) -> None:
+    monkeypatch.setenv("CALENDAR_UPSERT_ENABLED", "true")
+
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=fake_calendar_service,
+    ):
+        created = create_calendar_events([_booked_concert(18)], settings=load_settings())
+        changed = create_calendar_events([_booked_concert(19)], settings=load_settings())
+        repeated = create_calendar_events([_booked_concert(19)], settings=load_settings())
+
+    assert created[0].status == "CREATED"
+    assert changed[0].status == "UPDATED"
+    assert repeated[0].status == "DUPLICATED"
+    assert {created[0].google_event_id, changed[0].google_event_id} == {"event-1"}
+    [stored] = fake_calendar_service.items
+    assert stored["start"]["dateTime"] == "2024-12-25T19:00:00+09:00"
+    assert stored["extendedProperties"] == {"private": {"bookingKey": "AB-12345"}}
+    # 初回は予約キーと期間で list する。2回目以降はインデックスから引くため list しない
+    assert [call[0] for call in fake_calendar_service.calls] == [
+        "list",
+        "list",
+        "insert",
+        "patch",
+    ]
+
+
+def test_upsert_looks_up_booking_key_once_and_reinserts_deleted_event(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_calendar_factory: Any,
+) -> None:
+    monkeypatch.setenv("CALENDAR_UPSERT_ENABLED", "true")
+    service = fake_calendar_factory(
+        [
+            {
+                "id": "booked-1",
+                "summary": "⚙️ コンサート",
+                "start": {"dateTime": "2024-12-25T18:00:00+09:00", "timeZone": "Asia/Tokyo"},
+                "end": {"dateTime": "2024-12-25T20:00:00+09:00", "timeZone": "Asia/Tokyo"},
+                "extendedProperties": {"private": {"bookingKey": "AB-12345"}},
+            }
+        ]
+    )
+
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=service,
+    ):
+        changed = create_calendar_events([_booked_concert(19)], settings=load_settings())
+        service.items.clear()
+        moved_again = create_calendar_events([_booked_concert(20)], settings=load_settings())
+
+    assert changed[0].status == "UPDATED"
+    assert changed[0].google_event_id == "booked-1"
+    assert service.calls[0][1]["privateExtendedProperty"] == "bookingKey=AB-12345"
+    # 手動で削除されていた場合は新規に登録し直す
+    assert moved_again[0].status == "CREATED"
+    assert moved_again[0].google_event_id != "booked-1"
+
+
+def _booked_leg(summary: str, day: int) -> CalendarEventModel:
+    return CalendarEventModel(
+        summary=summary,
+        start={"dateTime": f"2024-12-{day}T09:00:00+09:00", "timeZone": "Asia/Tokyo"},
+        end={"dateTime": f"2024-12-{day}T11:00:00+09:00", "timeZone": "Asia/Tokyo"},
+        description="予約番号: AB-12345",
+    )
+
+
+def test_upsert_keeps_distinct_events_that_share_a_booking_key(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_calendar_service: Any,
+) -> None:
+    monkeypatch.setenv("CALENDAR_UPSERT_ENABLED", "true")
+    outbound = _booked_leg("新幹線 往路", 25)
+    inbound = _booked_leg("新幹線 復路", 27)
+    deadline = _booked_leg("支払い期限 23:59@新幹線 往路", 20)
+
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=fake_calendar_service,
+    ):
+        first = create_calendar_events([outbound, inbound, deadline], settings=load_settings())
+        moved = create_calendar_events(
+            [outbound, _booked_leg("新幹線 復路", 28)], settings=load_settings()
+        )
+
+    # 往路・復路・支払い期限はそれぞれ別のイベントとして残る
+    assert [result.status for result in first] == ["CREATED", "CREATED", "CREATED"]
+    assert len({result.google_event_id for result in first}) == 3
+    assert sorted(item["summary"] for item in fake_calendar_service.items) == [
+        "⚙️ 支払い期限 23:59@新幹線 往路",
+        "⚙️ 新幹線 往路",
+        "⚙️ 新幹線 復路",
+    ]
+    # 予約変更は同じ種類・summary のイベントだけを更新する
+    assert [result.status for result in moved] == ["DUPLICATED", "UPDATED"]
+    assert moved[1].google_event_id == first[1].google_event_id
+    starts = {item["summary"]: item["start"]["dateTime"] for item in fake_calendar_service.items}
+    assert starts["⚙️ 新幹線 往路"] == "2024-12-25T09:00:00+09:00"
+    assert starts["⚙️ 新幹線 復路"] == "2024-12-28T09:00:00+09:00"
+
+
+def test_upsert_does_not_patch_an_event_registered_earlier_in_the_batch(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_calendar_service: Any,
+) -> None:
+    monkeypatch.setenv("CALENDAR_UPSERT_ENABLED", "true")
+
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=fake_calendar_service,
+    ):
+        results = create_calendar_events(
+            [_booked_concert(18), _booked_concert(19)], settings=load_settings()
+        )
+
+    assert [result.status for result in results] == ["CREATED", "CREATED"]
+    assert len(fake_calendar_service.items) == 2
+    assert not [call for call in fake_calendar_service.calls if call[0] == "patch"]
+
+
+def test_server_timing_header_reports_stages(monkeypatch: pytest.MonkeyPatch) -> None:
+    service = _build_service_mock()
+    with patch(
+        "calendar_auto_register.features.calendar_events.usecase_calendar_events.google_client.service_from_settings",
+        return_value=service,
+    ):
+        payload = {"events": [_morning_meeting().model_dump(mode="json")]}
+        enabled = TestClient(create_app()).post("/calendar/events", json=payload)
+        monkeypatch.setenv("TIMING_ENABLED", "false")
+        load_settings.cache_clear()
+        disabled = TestClient(create_app()).post("/calendar/events", json=payload)
+
+    # スレッドプールで動くユースケースの span もリクエストの計測に載る
+    assert "calendar.register;dur=" in enabled.headers["Server-Timing"]
+    assert "total;dur=" in enabled.headers["Server-Timing"]
+    assert "Server-Timing" not in disabled.headers
+
+
+async def test_async_client_records_google_stages(fake_async_calendar: Any) -> None:
+    client, _ = fake_async_calendar
+
+    timings, token = start_request()
+    try:
+        await create_calendar_events_async(
+            [_morning_meeting()], settings=load_settings(), client=client
+        )
+    finally:
+        end_request(token)
+
+    assert {"calendar.register", "google.list", "google.insert"} <= set(timings.snapshot())
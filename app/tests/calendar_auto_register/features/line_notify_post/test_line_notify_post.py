@@ -2,17 +2,55 @@
 
 from __future__ import annotations
 
+from pathlib import Path
 from unittest.mock import patch
 
+import pytest
 from fastapi.testclient import TestClient
 
 from calendar_auto_register.app import create_app
 from calendar_auto_register.clients.line_client import LineApiError
+from calendar_auto_register.core.settings import load_settings
+from calendar_auto_register.features.line_notify_post import (
+    digest_line_notify_post,
+    outbox_line_notify_post,
+)
+from calendar_auto_register.features.line_notify_post.digest_line_notify_post import (
+    DigestBuffer,
+    FileDigestQueue,
+)
+from calendar_auto_register.features.line_notify_post.outbox_line_notify_post import (
+    SqliteNotificationOutbox,
+)
+from calendar_auto_register.features.line_notify_post.usecase_line_notify_post import (
+    drain_line_outbox,
+    render_line_messages,
+)
+from calendar_auto_register.shared.schemas.calendar_events import CalendarEventResult
+
+
+@pytest.fixture(autouse=True)
+def reset_digests() -> None:
+    digest_line_notify_post.reset_digests()
+    outbox_line_notify_post.reset_outboxes()
+
+
+def _result(summary: str) -> dict[str, object]:
+    return {
+        "status": "CREATED",
+        "event": {
+            "summary": summary,
+            "start": {"dateTime": "2024-12-25T14:00:00+09:00", "timeZone": "Asia/Tokyo"},
+            "end": {"dateTime": "2024-12-25T15:00:00+09:00", "timeZone": "Asia/Tokyo"},
+            "eventType": "default",
+        },
+        "google_event_id": f"id-{summary}",
+    }
 
 
 def test_line_notify_success() -> None:
     with patch(
-        "calendar_auto_register.features.line_notify_post.usecase_line_notify_post.line_client.push_message"
+        "calendar_auto_register.features.line_notify_post.usecase_line_notify_post.line_client.push_messages_async"
     ) as mock_push:
         client = TestClient(create_app())
         payload = {
@@ -52,7 +90,7 @@ def test_line_notify_success() -> None:
         assert res.status_code == 200
         assert res.json()["status"] == "SENT"
         assert mock_push.called
-        message = mock_push.call_args.kwargs["message"]
+        (message,) = mock_push.call_args.kwargs["messages"]
         assert "カレンダー自動登録 結果" in message
         assert "🧾 サマリ" in message
         assert "登録 1件 / 重複 0件 / 失敗 0件" in message
@@ -62,7 +100,7 @@ def test_line_notify_success() -> None:
 
 def test_line_notify_failure() -> None:
     with patch(
-        "calendar_auto_register.features.line_notify_post.usecase_line_notify_post.line_client.push_message",
+        "calendar_auto_register.features.line_notify_post.usecase_line_notify_post.line_client.push_messages_async",
         side_effect=LineApiError("boom", 500),
     ):
         client = TestClient(create_app())
@@ -98,3 +136,188 @@ def test_line_notify_failure() -> None:
         assert res.status_code == 502
         data = res.json()
         assert data["detail"]["error"]["code"] == "LINE_API_ERROR"
+
+
+def test_line_notify_skips_mail_already_notified(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setenv("MAIL_LEDGER_PATH", str(tmp_path / "ledger.sqlite3"))
+    with patch(
+        "calendar_auto_register.features.line_notify_post.usecase_line_notify_post.line_client.push_messages_async"
+    ) as mock_push:
+        client = TestClient(create_app())
+        payload = {"results": [], "mail_id": "mail-1"}
+
+        first = client.post("/line/notify", json=payload)
+        second = client.post("/line/notify", json=payload)
+
+    assert first.json() == second.json() == {"status": "SENT"}
+    assert mock_push.call_count == 1
+
+
+def test_line_notify_digest_sends_once_threshold_reached(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LINE_DIGEST_ENABLED", "true")
+    monkeypatch.setenv("LINE_DIGEST_MAX_RESULTS", "3")
+    with patch(
+        "calendar_auto_register.features.line_notify_post.usecase_line_notify_post.line_client.push_messages_async"
+    ) as mock_push:
+        client = TestClient(create_app())
+
+        statuses = [
+            client.post("/line/notify", json={"results": [_result(f"会議{number}")]}).json()
+            for number in range(3)
+        ]
+
+    assert [status["status"] for status in statuses] == ["BUFFERED", "BUFFERED", "SENT"]
+    assert mock_push.call_count == 1
+    (message,) = mock_push.call_args.kwargs["messages"]
+    assert "登録 3件 / 重複 0件 / 失敗 0件" in message
+
+
+def test_line_notify_flush_sends_buffered_results(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LINE_DIGEST_ENABLED", "true")
+    monkeypatch.setenv("LINE_DIGEST_MAX_RESULTS", "100")
+    with patch(
+        "calendar_auto_register.features.line_notify_post.usecase_line_notify_post.line_client.push_messages_async"
+    ) as mock_push:
+        client = TestClient(create_app())
+        payload = {"results": [_result(f"会議{number}") for number in range(12)]}
+
+        buffered = client.post("/line/notify", json=payload)
+        flushed = client.post("/line/notify/flush")
+        empty = client.post("/line/notify/flush")
+
+    assert buffered.json() == {"status": "BUFFERED"}
+    assert flushed.json() == {"status": "SENT", "count": 12}
+    assert empty.json() == {"status": "EMPTY", "count": 0}
+    (message,) = mock_push.call_args.kwargs["messages"]
+    assert "登録 12件 / 重複 0件 / 失敗 0件" in message
+
+
+def test_digest_buffer_file_queue_survives_restart_and_flushes_on_age(tmp_path: Path) -> None:
+    now = [1000.0]
+    path = tmp_path / "digest.jsonl"
+    result = CalendarEventResult.model_validate(_result("会議"))
+
+    first = DigestBuffer(
+        FileDigestQueue(path), max_results=10, max_wait_sec=60, clock=lambda: now[0]
+    )
+    assert first.add([result]) is None
+
+    # 別プロセス（コールドスタート後）のバッファでも、最も古い投入時刻から経過時間を判定する
+    second = DigestBuffer(
+        FileDigestQueue(path), max_results=10, max_wait_sec=60, clock=lambda: now[0]
+    )
+    now[0] += 30
+    assert second.add([]) is None
+    now[0] += 31
+    drained = second.add([result])
+
+    assert drained == [result, result]
+    assert second.flush() == []
+
+
+def test_line_notify_digest_skips_empty_drain(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    path = tmp_path / "digest.jsonl"
+    monkeypatch.setenv("LINE_DIGEST_ENABLED", "true")
+    monkeypatch.setenv("LINE_DIGEST_PATH", str(path))
+    monkeypatch.setenv("LINE_DIGEST_MAX_RESULTS", "1")
+    other = FileDigestQueue(path)
+
+    class _RacingQueue(FileDigestQueue):
+        def append(self, results: list[CalendarEventResult], *, enqueued_at: float) -> None:
+            super().append(results, enqueued_at=enqueued_at)
+            # 投入直後に、別プロセスがしきい値に達したキューを先に取り出す
+            other.drain()
+
+    with (
+        patch.object(digest_line_notify_post, "FileDigestQueue", _RacingQueue),
+        patch(
+            "calendar_auto_register.features.line_notify_post.usecase_line_notify_post.line_client.push_messages_async"
+        ) as mock_push,
+    ):
+        client = TestClient(create_app())
+        response = client.post("/line/notify", json={"results": [_result("会議")]})
+
+    # 取り出せる結果が残っていなければ、0件のダイジェストを送らない
+    assert response.json() == {"status": "BUFFERED"}
+    mock_push.assert_not_called()
+
+
+def test_render_line_messages_splits_at_event_boundaries() -> None:
+    results = [
+        CalendarEventResult.model_validate(_result(f"会議{number:03}")) for number in range(500)
+    ]
+
+    messages = render_line_messages(results, max_length=5000)
+
+    assert len(messages) > 1
+    assert all(len(message.encode("utf-16-le")) // 2 <= 5000 for message in messages)
+    assert "登録 500件 / 重複 0件 / 失敗 0件" in messages[0]
+    assert all(message.startswith("🔍 詳細（続き）") for message in messages[1:])
+    # イベントの途中で分割せず、すべてのイベントが1回ずつ日時付きで含まれる
+    joined = "\n".join(messages)
+    for number in range(500):
+        assert joined.count(f"登録　会議{number:03}\n日時　2024-12-25 14:00-15:00") == 1
+
+
+def test_render_line_messages_truncates_long_fields() -> None:
+    payload = _result("長" * 300)
+    payload["event"]["location"] = "場" * 300  # type: ignore[index]
+    result = CalendarEventResult.model_validate(payload)
+
+    (message,) = render_line_messages([result])
+
+    assert f"登録　{'長' * 99}…" in message
+    assert f"場所　{'場' * 99}…" in message
+
+
+def test_line_notify_queues_in_outbox_and_drain_delivers(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setenv("LINE_OUTBOX_PATH", str(tmp_path / "outbox.sqlite3"))
+    with patch(
+        "calendar_auto_register.features.line_notify_post.usecase_line_notify_post.line_client.push_messages_async"
+    ) as mock_push:
+        client = TestClient(create_app())
+
+        queued = client.post("/line/notify", json={"results": [_result("会議")]})
+        assert mock_push.call_count == 0
+        drained = client.post("/line/notify/drain")
+
+    assert queued.json() == {"status": "QUEUED"}
+    assert drained.json() == {"sent": 1, "retried": 0, "failed": 0, "pending": 0}
+    (message,) = mock_push.call_args.kwargs["messages"]
+    assert "登録　会議" in message
+
+
+async def test_drain_line_outbox_honours_retry_after_then_dead_letters(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("LINE_OUTBOX_PATH", "registered-outbox")
+    now = [1000.0]
+    outbox = SqliteNotificationOutbox(":memory:", clock=lambda: now[0])
+    outbox_line_notify_post.register_outbox("registered-outbox", outbox)
+    outbox.enqueue(["hello"])
+    settings = load_settings()
+
+    with patch(
+        "calendar_auto_register.features.line_notify_post.usecase_line_notify_post.line_client.push_messages_async",
+        side_effect=LineApiError("busy", 429, retry_after=30.0),
+    ):
+        first = await drain_line_outbox(settings=settings)
+        now[0] += 29
+        too_early = await drain_line_outbox(settings=settings)
+    now[0] += 2
+    with patch(
+        "calendar_auto_register.features.line_notify_post.usecase_line_notify_post.line_client.push_messages_async",
+        side_effect=LineApiError("bad request", 400),
+    ) as mock_push:
+        dead = await drain_line_outbox(settings=settings)
+
+    assert (first.retried, first.pending) == (1, 1)
+    assert (too_early.sent, too_early.retried, too_early.failed) == (0, 0, 0)
+    assert mock_push.call_args.kwargs["messages"] == ["hello"]
+    assert (dead.failed, dead.pending) == (1, 0)
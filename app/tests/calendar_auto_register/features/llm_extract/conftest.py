@@ -0,0 +1,63 @@
+"""LLM 抽出テスト用のフェイク Bedrock Runtime。"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+from botocore.exceptions import ClientError
+
+
+class FakeBedrockRuntime:
+    """Converse API を模したローカルのフェイク Bedrock Runtime クライアント。
+
+    受け取ったリクエストを記録し、指定された usage フィールドをそのまま返す。
+    `throttle_next` を指定すると、その回数だけ ThrottlingException を返す。
+    """
+
+    def __init__(self, response_dict: dict[str, Any], usage: dict[str, int]) -> None:
+        self.response_dict = response_dict
+        self.usage = usage
+        self.requests: list[dict[str, Any]] = []
+        self.throttle_next = 0
+
+    def converse(self, **kwargs: Any) -> dict[str, Any]:
+        self.requests.append(kwargs)
+        if self.throttle_next > 0:
+            self.throttle_next -= 1
+            raise ClientError(
+                {"Error": {"Code": "ThrottlingException", "Message": "Too many requests"}},
+                "Converse",
+            )
+        return {
+            "output": {
+                "message": {
+                    "role": "assistant",
+                    "content": [{"text": json.dumps(self.response_dict, ensure_ascii=False)}],
+                }
+            },
+            "stopReason": "end_turn",
+            "usage": {
+                "inputTokens": self.usage.get("inputTokens", 0),
+                "outputTokens": self.usage.get("outputTokens", 0),
+                "totalTokens": sum(self.usage.values()),
+                "cacheReadInputTokens": self.usage.get("cacheReadInputTokens", 0),
+                "cacheWriteInputTokens": self.usage.get("cacheWriteInputTokens", 0),
+            },
+            "metrics": {"latencyMs": 1},
+        }
+
+
+@pytest.fixture
+def fake_bedrock_factory() -> type[FakeBedrockRuntime]:
+    return FakeBedrockRuntime
+
+
+@pytest.fixture(autouse=True)
+def reset_bedrock_throttles() -> None:
+    """テスト間で共有スロットルの状態を持ち越さない。"""
+
+    from calendar_auto_register.clients import bedrock_throttle
+
+    bedrock_throttle.reset_throttles()
@@ -4,9 +4,10 @@ from __future__ import annotations
 
 import json
 import os
+import time
 from pathlib import Path
 from typing import Any
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
 from dotenv import load_dotenv
@@ -511,3 +512,317 @@ def test_支払い期限イベントを抽出できる() -> None:
         assert payment_event["start"]["dateTime"] == "2025-12-30T20:00:00+09:00"
         assert payment_event["end"]["dateTime"] == "2025-12-30T23:59:00+09:00"
         assert payment_event.get("location") is None
+
+
+def test_システムプロンプトをキャッシュ対象としてusageを記録する(
+    monkeypatch: pytest.MonkeyPatch, fake_bedrock_factory: Any
+) -> None:
+    """キャッシュ対応モデルでは cachePoint 付きで送信し、キャッシュトークン数を記録することを検証する。"""
+
+    from calendar_auto_register.core.models import NormalizedMail
+    from calendar_auto_register.features.llm_extract import usecase_llm_extract
+
+    monkeypatch.setenv("BEDROCK_MODEL_ID", "anthropic.claude-haiku-4-5-20251001-v1:0")
+    load_settings.cache_clear()
+    settings = load_settings()
+
+    fake_bedrock = fake_bedrock_factory(
+        {"events": []},
+        {"inputTokens": 120, "outputTokens": 8, "cacheReadInputTokens": 3500},
+    )
+    mail = NormalizedMail(
+        from_addr="alice@example.com",
+        reply_to=None,
+        subject="雑談メール",
+        received_at=None,
+        text="最近どうですか？",
+        html=None,
+    )
+
+    with patch.object(
+        usecase_llm_extract.boto3, "client", return_value=fake_bedrock
+    ), patch.object(usecase_llm_extract, "log_llm_usage") as mock_log_usage:
+        events = usecase_llm_extract.extract_events(mail, settings=settings)
+
+    assert events == []
+    system_blocks = fake_bedrock.requests[0]["system"]
+    assert system_blocks[-1] == {"cachePoint": {"type": "default"}}
+    assert "予定情報を抽出" in system_blocks[0]["text"]
+    mock_log_usage.assert_called_once_with(
+        model_id="anthropic.claude-haiku-4-5-20251001-v1:0",
+        tier=0,
+        accepted=True,
+        latency_ms=ANY,
+        input_tokens=120,
+        output_tokens=8,
+        cache_read_tokens=3500,
+        cache_write_tokens=0,
+    )
+
+
+def test_キャッシュ非対応モデルではcachePointを付けない() -> None:
+    """キャッシュ非対応モデルではシステムプロンプトを文字列のまま送ることを検証する。"""
+
+    from calendar_auto_register.features.llm_extract.usecase_llm_extract import (
+        _build_system_message,
+        supports_prompt_caching,
+    )
+
+    assert supports_prompt_caching("apac.anthropic.claude-haiku-4-5-20251001-v1:0")
+    assert not supports_prompt_caching("meta.llama3-70b-instruct-v1:0")
+    assert isinstance(_build_system_message(use_prompt_cache=False).content, str)
+
+
+def test_高速モデルの結果が構造チェックに失敗したら上位モデルへ昇格する(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """カスケードの1段目が end <= start を返した場合、最終段のモデル結果を採用することを検証する。"""
+
+    from calendar_auto_register.features.llm_extract import cascade_llm_extract
+
+    monkeypatch.setenv("BEDROCK_MODEL_ID", "large-model")
+    monkeypatch.setenv("BEDROCK_CASCADE_MODEL_IDS", '["fast-model"]')
+    load_settings.cache_clear()
+    cascade_llm_extract.reset_cascade_stats()
+
+    def _event(start: str, end: str) -> dict[str, Any]:
+        return {
+            "summary": "外食@焼肉レストラン サンプル",
+            "start": {"dateTime": start, "timeZone": "Asia/Tokyo"},
+            "end": {"dateTime": end, "timeZone": "Asia/Tokyo"},
+        }
+
+    invalid = {"events": [_event("2024-12-25T19:00:00+09:00", "2024-12-25T18:00:00+09:00")]}
+    valid = {"events": [_event("2024-12-25T19:00:00+09:00", "2024-12-25T21:00:00+09:00")]}
+
+    with patch(
+        "calendar_auto_register.features.llm_extract.usecase_llm_extract.ChatBedrock"
+    ) as mock_chat_class, patch(
+        "calendar_auto_register.features.llm_extract.usecase_llm_extract.boto3.client"
+    ):
+        mock_chat_instance = _mock_bedrock_chain(invalid)
+        mock_chat_instance.__or__.return_value.with_retry.return_value.invoke.side_effect = [
+            invalid,
+            valid,
+        ]
+        mock_chat_class.return_value = mock_chat_instance
+
+        client = TestClient(create_app())
+        payload = {
+            "normalized_mail": {
+                "from_addr": "shop@example.com",
+                "subject": "ご予約確認",
+                "text": "12/25 19:00 から2時間のご予約です。",
+            }
+        }
+        res = client.post("/llm/extract-event", json=payload)
+
+    assert res.status_code == 200
+    assert res.json()["events"][0]["end"]["dateTime"] == "2024-12-25T21:00:00+09:00"
+    assert [call.kwargs["model"] for call in mock_chat_class.call_args_list] == [
+        "fast-model",
+        "large-model",
+    ]
+    stats = cascade_llm_extract.get_cascade_stats()
+    assert stats["fast-model"]["escalated"] == 1
+    assert stats["large-model"]["hit_rate"] == 1.0
+
+
+def test_構造チェックはプロンプトの書式規則を検出する() -> None:
+    """支払い期限の書式違い・location 付与・@ 直後の空白を検出することを検証する。"""
+
+    from calendar_auto_register.features.llm_extract.cascade_llm_extract import (
+        validate_extracted_events,
+    )
+    from calendar_auto_register.shared.schemas.calendar import GoogleCalendarEventModel
+
+    event = GoogleCalendarEventModel(
+        summary="支払い期限 23:59@ サンプル",
+        start={"date": "2025-12-30"},
+        end={"date": "2025-12-31"},
+        location="コンビニ",
+    )
+
+    issues = validate_extracted_events([event])
+
+    assert len(issues) == 3
+
+
+def test_チェーン経由で全角文字が1回の検証で半角正規化される(
+    monkeypatch: pytest.MonkeyPatch, fake_bedrock_factory: Any
+) -> None:
+    """Bedrock 出力の全角英数字・記号が、検証済みモデルとして半角正規化されて返ることを検証する。"""
+
+    from calendar_auto_register.core.models import NormalizedMail
+    from calendar_auto_register.features.llm_extract import usecase_llm_extract
+
+    monkeypatch.setenv("BEDROCK_MODEL_ID", "anthropic.claude-haiku-4-5-20251001-v1:0")
+    load_settings.cache_clear()
+
+    fake_bedrock = fake_bedrock_factory(
+        {
+            "events": [
+                {
+                    "summary": "宿泊@ＨＯＴＥＬ ＢＬＵＥ（ホテル ブルー）",
+                    "start": {"dateTime": "2026-01-20T15:00:00+09:00", "timeZone": "Asia/Tokyo"},
+                    "end": {"dateTime": "2026-01-21T10:00:00+09:00", "timeZone": "Asia/Tokyo"},
+                    "location": "Tokyo",
+                    "description": "金額: ９,２００円",
+                }
+            ]
+        },
+        {"inputTokens": 10, "outputTokens": 10},
+    )
+    mail = NormalizedMail(
+        from_addr="hotel@example.com",
+        reply_to=None,
+        subject="ご予約確認",
+        received_at=None,
+        text="ご宿泊のご予約を承りました。",
+        html=None,
+    )
+
+    with patch.object(usecase_llm_extract.boto3, "client", return_value=fake_bedrock):
+        events = usecase_llm_extract.extract_events(mail, settings=load_settings())
+
+    assert events[0].summary == "宿泊@HOTEL BLUE(ホテル ブルー)"
+    assert events[0].location == "Tokyo"
+    assert events[0].description == "金額: 9,200円"
+
+
+def test_スロットリング時はレートを下げて再試行する(
+    monkeypatch: pytest.MonkeyPatch, fake_bedrock_factory: Any
+) -> None:
+    """フェイク Bedrock が ThrottlingException を返しても、レートを下げた再試行で抽出できることを検証する。"""
+
+    from calendar_auto_register.clients import bedrock_throttle
+    from calendar_auto_register.core.models import NormalizedMail
+    from calendar_auto_register.features.llm_extract import usecase_llm_extract
+
+    monkeypatch.setenv("BEDROCK_MODEL_ID", "anthropic.claude-haiku-4-5-20251001-v1:0")
+    monkeypatch.setenv("BEDROCK_RATE_LIMIT_PER_SEC", "100")
+    load_settings.cache_clear()
+
+    fake_bedrock = fake_bedrock_factory({"events": []}, {"inputTokens": 10, "outputTokens": 5})
+    fake_bedrock.throttle_next = 2
+    mail = NormalizedMail(
+        from_addr="alice@example.com",
+        reply_to=None,
+        subject="雑談メール",
+        received_at=None,
+        text="最近どうですか？",
+        html=None,
+    )
+
+    with patch.object(usecase_llm_extract.boto3, "client", return_value=fake_bedrock):
+        events = usecase_llm_extract.extract_events(mail, settings=load_settings())
+
+    assert events == []
+    assert len(fake_bedrock.requests) == 3
+    state = bedrock_throttle.get_throttle_states()["ap-northeast-1"]
+    assert state["limiter"]["throttled"] == 2
+    assert state["limiter"]["rate"] < 100
+    assert state["breaker"]["state"] == "closed"
+
+
+def test_同一メールの同時リクエストは1回のBedrock呼び出しに集約される() -> None:
+    """同じメールを同時に抽出した場合、チェーン呼び出しが1回で全員が同じ結果を受け取ることを検証する。"""
+
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from calendar_auto_register.core.models import NormalizedMail
+    from calendar_auto_register.features.llm_extract import usecase_llm_extract
+
+    response_dict = {
+        "events": [
+            {
+                "summary": "営業会議",
+                "start": {"dateTime": "2024-12-25T14:00:00+09:00", "timeZone": "Asia/Tokyo"},
+                "end": {"dateTime": "2024-12-25T15:00:00+09:00", "timeZone": "Asia/Tokyo"},
+            }
+        ]
+    }
+    started = threading.Event()
+
+    def _slow_invoke(*args: Any, **kwargs: Any) -> dict[str, Any]:
+        started.set()
+        time.sleep(0.2)
+        return json.loads(json.dumps(response_dict))
+
+    mail = NormalizedMail(
+        from_addr="alice@example.com",
+        reply_to=None,
+        subject="会議",
+        received_at=None,
+        text="営業会議を12月25日14:00から15:00で開催します。",
+        html=None,
+    )
+
+    with patch(
+        "calendar_auto_register.features.llm_extract.usecase_llm_extract.ChatBedrock"
+    ) as mock_chat_class, patch(
+        "calendar_auto_register.features.llm_extract.usecase_llm_extract.boto3.client"
+    ):
+        mock_chat_instance = _mock_bedrock_chain(response_dict)
+        invoke = mock_chat_instance.__or__.return_value.with_retry.return_value.invoke
+        invoke.side_effect = _slow_invoke
+        mock_chat_class.return_value = mock_chat_instance
+        settings = load_settings()
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            first = pool.submit(usecase_llm_extract.extract_events, mail, settings=settings)
+            started.wait(timeout=5)
+            others = [
+                pool.submit(usecase_llm_extract.extract_events, mail, settings=settings)
+                for _ in range(2)
+            ]
+            results = [first.result(), *(future.result() for future in others)]
+
+    assert invoke.call_count == 1
+    assert all(result[0].summary == "営業会議" for result in results)
+
+
+def test_ファイルリースで他プロセスの抽出結果を共有する(tmp_path: Path) -> None:
+    """リース保持中は他のバックエンドが取得できず、解放後は保存された結果を読めることを検証する。"""
+
+    from calendar_auto_register.features.llm_extract.singleflight_llm_extract import (
+        FileLeaseBackend,
+    )
+
+    # 別プロセスを想定し、同じディレクトリを指す独立したバックエンドを2つ用意する
+    holder = FileLeaseBackend(tmp_path, result_ttl_sec=60)
+    follower = FileLeaseBackend(tmp_path, result_ttl_sec=60)
+
+    assert holder.try_acquire("mail-key")
+    assert follower.is_held("mail-key")
+    assert not follower.try_acquire("mail-key")
+    assert follower.read_result("mail-key") is None
+
+    holder.release("mail-key", '[{"summary": "営業会議"}]')
+
+    assert not follower.is_held("mail-key")
+    assert follower.read_result("mail-key") == '[{"summary": "営業会議"}]'
+
+
+def test_ファイルリースは解放後と期限切れのファイルを残さない(tmp_path: Path) -> None:
+    """解放でロックファイルが消え、掃除で期限切れの結果と残されたロックファイルが消えることを検証する。"""
+
+    from calendar_auto_register.features.llm_extract.singleflight_llm_extract import (
+        FileLeaseBackend,
+    )
+
+    now = [time.time()]
+    backend = FileLeaseBackend(tmp_path, result_ttl_sec=60, clock=lambda: now[0])
+    assert backend.try_acquire("mail-key")
+    backend.release("mail-key", "[]")
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["mail-key.json"]
+
+    # 落ちたプロセスが残したロックファイル
+    (tmp_path / "crashed.lock").touch()
+    now[0] += 61
+
+    assert backend.sweep() == 2
+    assert list(tmp_path.iterdir()) == []
+    assert backend.read_result("mail-key") is None
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import io
 from email.message import EmailMessage
+from pathlib import Path
+from typing import Any
 
 import pytest
 from fastapi.testclient import TestClient
@@ -42,3 +44,43 @@ def test_S3取得で正規化できる(monkeypatch: pytest.MonkeyPatch) -> None:
     assert res.status_code == 200
     normalized = res.json()["normalized_mail"]
     assert normalized["subject"] == "FromS3"
+
+
+def test_台帳に記録済みのメールは取得し直さない(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """重複配信（同じキー + ETag）と別キーへの再アップロードは記録済みの結果を返す。"""
+
+    monkeypatch.setenv("MAIL_LEDGER_PATH", str(tmp_path / "ledger.sqlite3"))
+    eml = _build_eml("Ledger", "body")
+    calls: list[tuple[str, str]] = []
+
+    def fake_head_object(bucket: str, key: str, *, region: str) -> dict[str, Any]:
+        calls.append(("head", key))
+        return {"ETag": '"etag-1"'}
+
+    def fake_get_object(*, bucket: str, key: str, region: str) -> dict[str, Any]:
+        calls.append(("get", key))
+        return {"Body": io.BytesIO(eml), "ETag": '"etag-1"'}
+
+    monkeypatch.setattr(s3_client, "head_object", fake_head_object)
+    monkeypatch.setattr(s3_client, "get_object", fake_get_object)
+
+    client = TestClient(create_app())
+    first = client.post("/mail/parse", json={"s3_key": "mail.eml"}).json()
+    redelivered = client.post("/mail/parse", json={"s3_key": "mail.eml"}).json()
+    reuploaded = client.post("/mail/parse", json={"s3_key": "copy.eml"}).json()
+
+    assert first["replayed"] is False
+    assert first["mail_id"]
+    assert redelivered["replayed"] is True
+    assert reuploaded["replayed"] is True
+    assert first["mail_id"] == redelivered["mail_id"] == reuploaded["mail_id"]
+    assert reuploaded["normalized_mail"]["subject"] == "Ledger"
+    assert calls == [
+        ("head", "mail.eml"),
+        ("get", "mail.eml"),
+        ("head", "mail.eml"),
+        ("head", "copy.eml"),
+        ("get", "copy.eml"),
+    ]
@@ -0,0 +1,123 @@
+"""重複候補検索（区間インデックス + 件名類似度）のマイクロベンチマーク。
+
+1年分に散らばった合成イベントを 10k / 100k 件登録し、重複チェック1回分の
+検索（±15分の重なり検索と類似度による順位付け）を全件走査と比較する。
+
+    PYTHONPATH=app/src python scripts/bench_calendar_index.py [--sizes 10000 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from calendar_auto_register.features.calendar_events.index_calendar_events import (
+    IndexedEvent,
+    IntervalIndex,
+    rank_candidates,
+)
+
+_BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+_SUMMARIES = ("営業会議", "朝礼", "支払い期限 23:59@ サンプル", "歯科検診", "1on1", "夕礼")
+_WINDOW = timedelta(minutes=15)
+
+
+def _synthetic_items(size: int, rng: random.Random) -> list[dict[str, Any]]:
+    items = []
+    for number in range(size):
+        if number % 10 == 0:
+            day = (_BASE + timedelta(days=rng.randrange(365))).date()
+            start: dict[str, str] = {"date": day.isoformat()}
+            end: dict[str, str] = {"date": (day + timedelta(days=1)).isoformat()}
+        else:
+            start_at = _BASE + timedelta(minutes=15 * rng.randrange(365 * 96))
+            end_at = start_at + timedelta(minutes=rng.choice((30, 60, 90)))
+            start = {"dateTime": start_at.isoformat()}
+            end = {"dateTime": end_at.isoformat()}
+        summary = f"⚙️ {rng.choice(_SUMMARIES)} {number % 50}"
+        items.append({"id": f"event-{number}", "summary": summary, "start": start, "end": end})
+    return items
+
+
+def _queries(count: int, rng: random.Random) -> list[tuple[datetime, datetime, str]]:
+    queries = []
+    for _ in range(count):
+        start_at = _BASE + timedelta(minutes=15 * rng.randrange(365 * 96))
+        summary = f"{rng.choice(_SUMMARIES)} {rng.randrange(50)}"
+        queries.append((start_at, start_at + timedelta(hours=1), summary))
+    return queries
+
+
+def _bench(
+    size: int,
+    items: list[dict[str, Any]],
+    queries: list[tuple[datetime, datetime, str]],
+) -> None:
+    index = IntervalIndex()
+    load_sec = timeit.timeit(lambda: index.bulk_load(items), number=1)
+    all_events = list(index)
+
+    def indexed_overlap() -> list[list[IndexedEvent]]:
+        return [
+            index.overlapping(start_at - _WINDOW, end_at + _WINDOW, all_day=False)
+            for start_at, end_at, _ in queries
+        ]
+
+    def linear_overlap() -> list[list[IndexedEvent]]:
+        found = []
+        for start_at, end_at, _ in queries:
+            min_ts = (start_at - _WINDOW).timestamp()
+            max_ts = (end_at + _WINDOW).timestamp()
+            found.append(
+                [
+                    event
+                    for event in all_events
+                    if not event.all_day and event.start_ts < max_ts and event.end_ts > min_ts
+                ]
+            )
+        return found
+
+    overlaps = indexed_overlap()
+    assert [sorted(e.id for e in found) for found in overlaps] == [
+        sorted(e.id for e in found) for found in linear_overlap()
+    ]
+
+    def ranked() -> None:
+        for (start_at, _, summary), found in zip(queries, overlaps, strict=True):
+            rank_candidates(
+                found,
+                summary=summary,
+                start_ts=start_at.timestamp(),
+                all_day=False,
+                min_similarity=0.8,
+            )
+
+    per_query = 1_000_000 / len(queries)
+    indexed_us = timeit.timeit(indexed_overlap, number=1) * per_query
+    linear_us = timeit.timeit(linear_overlap, number=1) * per_query
+    rank_us = timeit.timeit(ranked, number=1) * per_query
+    candidates = sum(len(found) for found in overlaps) / len(queries)
+    print(
+        f"{size:>7} events: bulk_load {load_sec * 1000:7.1f} ms | "
+        f"overlap indexed {indexed_us:7.2f} us, linear {linear_us:9.2f} us | "
+        f"rank {rank_us:6.2f} us for {candidates:.1f} candidates"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    queries = _queries(args.queries, rng)
+    for size in args.sizes:
+        _bench(size, _synthetic_items(size, rng), queries)
+
+
+if __name__ == "__main__":
+    main()
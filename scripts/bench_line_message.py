@@ -0,0 +1,75 @@
+"""LINE 通知本文のレンダリング（文字数上限での分割）のマイクロベンチマーク。
+
+1 / 50 / 500 件の登録結果について、`render_line_messages` の所要時間と
+分割後のテキストメッセージ数・Push 回数・最長メッセージの文字数を計測する。
+
+    PYTHONPATH=app/src python scripts/bench_line_message.py [--sizes 1 50 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import timeit
+
+from calendar_auto_register.clients.line_client import MAX_MESSAGES_PER_PUSH, MAX_TEXT_LENGTH
+from calendar_auto_register.features.line_notify_post.usecase_line_notify_post import (
+    render_line_messages,
+)
+from calendar_auto_register.shared.schemas.calendar_events import CalendarEventResult
+
+
+def _results(size: int) -> list[CalendarEventResult]:
+    results: list[CalendarEventResult] = []
+    for number in range(size):
+        failed = number % 10 == 9
+        payload = {
+            "status": "FAILED" if failed else "CREATED",
+            "event": {
+                "summary": f"🎫 公演 {number} 〜 " + "長いタイトル" * (number % 30),
+                "start": {"dateTime": "2025-03-01T18:00:00+09:00", "timeZone": "Asia/Tokyo"},
+                "end": {"dateTime": "2025-03-01T21:00:00+09:00", "timeZone": "Asia/Tokyo"},
+                "location": f"ホール {number}" if number % 2 else None,
+                "eventType": "default",
+            },
+            "google_event_id": None if failed else f"event-{number}",
+        }
+        if failed:
+            payload["error"] = {
+                "code": "GOOGLE_API_ERROR",
+                "message": "Rate Limit Exceeded " * 30,
+                "retryable": True,
+            }
+        results.append(CalendarEventResult.model_validate(payload))
+    return results
+
+
+def _length(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _bench(size: int, repeat: int) -> None:
+    results = _results(size)
+    messages = render_line_messages(results)
+    per_call_ms = timeit.timeit(lambda: render_line_messages(results), number=repeat) / repeat
+    pushes = math.ceil(len(messages) / MAX_MESSAGES_PER_PUSH)
+    longest = max(_length(message) for message in messages)
+    assert longest <= MAX_TEXT_LENGTH
+    print(
+        f"{size:>4} results: render {per_call_ms * 1000:7.2f} ms | "
+        f"{len(messages):>2} messages / {pushes} push(es) | longest {longest:>4} chars"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        _bench(size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
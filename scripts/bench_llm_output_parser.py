@@ -0,0 +1,72 @@
+"""LLM 出力の検証・半角正規化処理のマイクロベンチマーク。
+
+記録済みの LLM 出力コーパス（1行1件の JSONL、`{"text": "<LLM 出力>"}`）を使い、
+旧実装（イベントごとにモデル生成 → model_copy → model_dump → 再検証）と
+現行の単一パス実装を比較する。
+
+    PYTHONPATH=app/src python scripts/bench_llm_output_parser.py [--corpus PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+import unicodedata
+from pathlib import Path
+from typing import Any
+
+from calendar_auto_register.features.llm_extract.usecase_llm_extract import (
+    EventExtractionResponse,
+    _validate_extraction_output,
+)
+from calendar_auto_register.shared.schemas.calendar import GoogleCalendarEventModel
+
+_DEFAULT_CORPUS = Path(__file__).parent / "bench_data" / "llm_outputs.jsonl"
+
+
+def _legacy_parse(text: str) -> list[GoogleCalendarEventModel]:
+    parsed = json.loads(text)
+    normalized_events = []
+    for event_data in parsed["events"]:
+        event = GoogleCalendarEventModel(**event_data)
+        update: dict[str, Any] = {"summary": unicodedata.normalize("NFKC", event.summary)}
+        if event.location:
+            update["location"] = unicodedata.normalize("NFKC", event.location)
+        if event.description:
+            update["description"] = unicodedata.normalize("NFKC", event.description)
+        normalized_events.append(event.model_copy(update=update).model_dump())
+    parsed["events"] = normalized_events
+    return EventExtractionResponse(**parsed).events
+
+
+def _single_pass_parse(text: str) -> list[GoogleCalendarEventModel]:
+    return _validate_extraction_output(json.loads(text)).events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", type=Path, default=_DEFAULT_CORPUS)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    texts = [
+        json.loads(line)["text"]
+        for line in args.corpus.read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    ]
+    for text in texts:
+        assert _legacy_parse(text) == _single_pass_parse(text)
+
+    print(f"corpus: {len(texts)} outputs ({args.corpus})")
+    for name, func in (("legacy", _legacy_parse), ("single-pass", _single_pass_parse)):
+        elapsed = timeit.timeit(
+            lambda func=func: [func(text) for text in texts],  # type: ignore[misc]
+            number=args.number,
+        )
+        per_output_us = elapsed / (args.number * len(texts)) * 1_000_000
+        print(f"{name:>12}: {per_output_us:8.2f} us/output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""JSON ロギングのスループットのマイクロベンチマーク。
+
+リクエストログ（`stages` 付き）と、例外の捕捉中に出すエラーログを交互に N 件書き、
+従来の実装（呼び出し元で `json.dumps` と `traceback.format_exc` をしてから書く）、
+キューを使わない現在の実装、`QueueListener` 経由の現在の実装を比べる。
+キュー経由は呼び出し元の所要時間と、`flush_logs` で書き切るまでの所要時間を分けて出す。
+出力先はいずれも /dev/null。
+
+    PYTHONPATH=app/src python scripts/bench_logging.py [--sizes 1000 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import time
+import traceback
+from collections.abc import Callable
+from typing import Any
+
+from calendar_auto_register.core.logging import (
+    configure_logging,
+    flush_logs,
+    log_error,
+    log_request,
+)
+
+_STAGES = {
+    "s3.get": 12.3,
+    "mail.mime": 1.4,
+    "bedrock.invoke": 812.5,
+    "llm.extract": 815.0,
+    "google.insert": 95.2,
+    "line.push": 40.1,
+}
+
+_LEGACY_LOGGER = logging.getLogger("bench.legacy")
+
+
+def _legacy_log_request(**payload: Any) -> None:
+    _LEGACY_LOGGER.info(json.dumps({"level": "INFO", **payload}, ensure_ascii=False))
+
+
+def _legacy_log_error(*, error: Any, **payload: Any) -> None:
+    body = {
+        "level": "ERROR",
+        **payload,
+        "error_json": json.dumps({"message": str(error)}, ensure_ascii=False),
+        "traceback": traceback.format_exc(),
+    }
+    _LEGACY_LOGGER.error(json.dumps(body, ensure_ascii=False))
+
+
+def _write(
+    size: int,
+    request: Callable[..., None],
+    error: Callable[..., None],
+) -> None:
+    for number in range(size):
+        request_id = f"req-{number}"
+        if number % 2:
+            try:
+                raise ValueError("upstream failed")
+            except ValueError as exc:
+                error(path="/x", status=502, request_id=request_id, latency_ms=9, error=exc)
+        else:
+            request(path="/x", status=200, request_id=request_id, latency_ms=9, stages=_STAGES)
+
+
+def _per_call_us(started: float, size: int) -> float:
+    return (time.perf_counter() - started) / size * 1_000_000
+
+
+def _bench(size: int) -> None:
+    started = time.perf_counter()
+    _write(size, _legacy_log_request, _legacy_log_error)
+    legacy = _per_call_us(started, size)
+
+    configure_logging(level=logging.INFO, async_enabled=False)
+    started = time.perf_counter()
+    _write(size, log_request, log_error)
+    deferred = _per_call_us(started, size)
+
+    configure_logging(level=logging.INFO, async_enabled=True)
+    started = time.perf_counter()
+    _write(size, log_request, log_error)
+    queued_caller = _per_call_us(started, size)
+    flush_logs(timeout=60.0)
+    queued_total = _per_call_us(started, size)
+    configure_logging(level=logging.INFO, async_enabled=False)
+
+    print(
+        f"{size:>6} records: legacy {legacy:6.1f} us | sync {deferred:6.1f} us | "
+        f"queued caller {queued_caller:6.1f} us (incl. flush {queued_total:6.1f} us) per record"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+        logging.basicConfig(stream=devnull, format="%(message)s")
+        _LEGACY_LOGGER.addHandler(logging.StreamHandler(devnull))
+        _LEGACY_LOGGER.propagate = False
+        _LEGACY_LOGGER.setLevel(logging.INFO)
+        for size in args.sizes:
+            _bench(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""処理済みメール台帳（SQLite）のルックアップ・記録・compaction のマイクロベンチマーク。
+
+10k / 100k 通分の配信とステージ記録を入れた台帳に対し、`/mail/parse` の重複判定
+1回分（S3 キー + ETag → mail_id → mail_parse の出力）の所要時間を計測する。
+
+    PYTHONPATH=app/src python scripts/bench_mail_ledger.py [--sizes 10000 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import random
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+from calendar_auto_register.core.ledger import SqliteMailLedger
+
+_OUTPUT = '{"normalized_mail": {"subject": "予約確認", "text": "' + "本文" * 500 + '"}}'
+
+
+def _mail_id(number: int) -> str:
+    return hashlib.sha256(str(number).encode()).hexdigest()
+
+
+def _bench(size: int, directory: Path, lookups: int, rng: random.Random) -> None:
+    now = [time.time()]
+    ledger = SqliteMailLedger(
+        directory / f"ledger-{size}.sqlite3",
+        retention_sec=7 * 24 * 3600,
+        max_entries=size,
+        clock=lambda: now[0],
+    )
+    started = time.perf_counter()
+    for number in range(size):
+        ledger.record_delivery(f"2025/01/{number}.eml", f"etag-{number}", _mail_id(number))
+        ledger.record_stage(_mail_id(number), "mail_parse", _OUTPUT)
+    record_us = (time.perf_counter() - started) / size * 1_000_000
+
+    hit_keys = [rng.randrange(size) for _ in range(lookups)]
+
+    def hits() -> None:
+        for number in hit_keys:
+            mail_id = ledger.lookup_delivery(f"2025/01/{number}.eml", f"etag-{number}")
+            assert mail_id is not None
+            assert ledger.stage_output(mail_id, "mail_parse") is not None
+
+    def misses() -> None:
+        for number in hit_keys:
+            assert ledger.lookup_delivery(f"2025/02/{number}.eml", "etag") is None
+
+    per_lookup = 1_000_000 / lookups
+    hit_us = timeit.timeit(hits, number=1) * per_lookup
+    miss_us = timeit.timeit(misses, number=1) * per_lookup
+
+    # 削除対象がない状態での compaction（保持期間・上限件数の走査だけのコスト）
+    compact_sec = timeit.timeit(ledger.compact, number=1)
+    ledger.close()
+    print(
+        f"{size:>7} mails: record {record_us:6.1f} us/stage | "
+        f"lookup hit {hit_us:5.1f} us, miss {miss_us:5.1f} us | "
+        f"compact {compact_sec * 1000:6.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            _bench(size, Path(directory), args.lookups, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""共通ミドルウェアのリクエストあたりのオーバーヘッドのマイクロベンチマーク。
+
+`create_app()` のアプリに `/healthz` の ASGI リクエストを直接 N 回送り、ミドルウェアを
+外した同じアプリとの1リクエストあたりの所要時間の差をオーバーヘッドとして出す。
+リクエストログは /dev/null へ捨てる（APP_ENV=local なので EMF は出さない）。
+
+    PYTHONPATH=app/src python scripts/bench_middleware.py [--sizes 1000 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from typing import Any
+
+os.environ.setdefault("APP_ENV", "local")
+os.environ.setdefault("REGION", "ap-northeast-1")
+os.environ.setdefault("CALENDAR_ID", "bench-calendar-id")
+os.environ.setdefault("GOOGLE_CREDENTIALS", "dummy")
+os.environ.setdefault("ALLOWLIST_SENDERS", "[]")
+os.environ.setdefault("S3_RAW_MAIL_BUCKET", "bench-bucket")
+
+from calendar_auto_register.app import create_app  # noqa: E402
+
+_SCOPE: dict[str, Any] = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/healthz",
+    "raw_path": b"/healthz",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"localhost"), (b"x-request-id", b"bench")],
+    "client": ("127.0.0.1", 50000),
+    "server": ("localhost", 80),
+}
+
+
+async def _receive() -> dict[str, Any]:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message: dict[str, Any]) -> None:
+    return None
+
+
+async def _per_request_us(app: Any, size: int) -> float:
+    for _ in range(100):
+        await app(dict(_SCOPE), _receive, _send)
+    started = time.perf_counter()
+    for _ in range(size):
+        await app(dict(_SCOPE), _receive, _send)
+    return (time.perf_counter() - started) / size * 1_000_000
+
+
+async def _bench(size: int) -> None:
+    app = create_app()
+    bare = create_app()
+    bare.user_middleware.clear()
+    with_middleware = await _per_request_us(app, size)
+    without = await _per_request_us(bare, size)
+    print(
+        f"{size:>6} requests: with middleware {with_middleware:6.1f} us | "
+        f"without {without:6.1f} us | overhead {with_middleware - without:6.1f} us per request"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+        logging.basicConfig(stream=devnull, format="%(message)s")
+        for size in args.sizes:
+            asyncio.run(_bench(size))
+
+
+if __name__ == "__main__":
+    main()